@@ -0,0 +1,88 @@
+"""Bucle asyncio: tirones de frame mientras se autoguarda, en linea, con executor y con fork.
+
+Uso: python -m src.bench.aio [--people 3000] [--seconds 10] [--every 2] [--seed 7]
+El motor corre con run_async y una tarea que guarda cada --every segundos. "en linea" hace
+pickle y gzip dentro del bucle (como la tecla S en el motor con hilos); "executor" hace el
+pickle en el bucle y la compresion fuera; "fork" lo hace todo en un proceso hijo. Compara
+los frames en los que empieza un guardado con el resto, y cuenta los que pasan de dos veces
+su tiempo (tirones visibles).
+Comprueba que cada partida guardada se carga y tiene la poblacion del mundo.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from statistics import mean
+
+from ..core import aio, persistence
+from ..core.batch import WorldConfig, populate
+from ..core.engine import SimulationEngine
+from ..core.persistence import PersistenceManager
+from ..core.scenarios.nature import NatureScenario
+from ..core.state import WorldState
+
+def new_engine(args) -> SimulationEngine:
+    world = WorldState(NatureScenario(seed=args.seed), seed=args.seed)
+    populate(world, WorldConfig(args.seed, people=args.people, wolves=max(1, args.people // 50),
+                                towns=max(1, args.people // 20)))
+    engine = SimulationEngine(world)
+    engine.step(15) # Arranque (primeras rutas y chunks) fuera de la medida
+    return engine
+
+async def autosave(engine, every: float, filename: str, mode: str, starts):
+    """Como aio.autosave, apuntando cuándo empieza cada guardado."""
+    while True:
+        await asyncio.sleep(every)
+        starts.append(time.perf_counter())
+        if mode == "en linea": PersistenceManager.write(PersistenceManager.save_path(filename), engine.world_state)
+        else: await aio.save(engine.world_state, filename, fork=mode == "fork")
+
+def run(args, mode: str):
+    """Huecos entre frames que contienen el inicio de un guardado, el resto y la partida cargada."""
+    engine = new_engine(args)
+    frames, starts = [], []
+    def on_frame(world):
+        now = time.perf_counter()
+        frames.append(now)
+        if now > deadline: engine.stop()
+    engine.register_render_callback(on_frame)
+    filename = f"{mode}.dat"
+    deadline = time.perf_counter() + args.seconds
+    asyncio.run(engine.run_async(autosave(engine, args.every, filename, mode, starts)))
+    saving, other = [], []
+    for before, after in zip(frames, frames[1:]):
+        (saving if any(before <= s < after for s in starts) else other).append(after - before)
+    return engine, saving, other, PersistenceManager.load_game(filename)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=3000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--every", type=float, default=2.0, help="Segundos entre autoguardados")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    modes = ["en linea", "executor"] + (["fork"] if aio.CAN_FORK else [])
+    ok = True
+    saved_dir = persistence.SAVE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        persistence.SAVE_DIR = tmp
+        try:
+            for mode in modes:
+                engine, saving, other, loaded = run(args, mode)
+                hitches = sum(gap > 2 * engine.frame_time for gap in saving)
+                size = os.path.getsize(os.path.join(tmp, f"{mode}.dat")) / 1e6
+                good = loaded is not None and len(loaded.people) == len(engine.world_state.people)
+                ok &= good
+                print(f"{mode:<9} guardados {len(saving):2d}  frame con guardado {mean(saving) * 1000:6.1f} ms"
+                      f" (max {max(saving) * 1000:6.1f}, tirones {hitches})  resto {mean(other) * 1000:5.1f} ms"
+                      f"  partida {size:4.1f} MB {'se carga' if good else 'NO SE CARGA'}")
+        finally:
+            persistence.SAVE_DIR = saved_dir
+    print(f"PARTIDAS: {'OK' if ok else 'FALLO'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Lote de mundos sin ventana en paralelo: un resumen por mundo según van terminando.
+
+Uso: python -m src.bench.batch [--worlds 8] [--seed 1] [--people 100,400] [--hours 6]
+                               [--scenario NatureScenario] [--workers N] [--timeout S]
+                               [--world-timeout S] [--out resultados.jsonl] [--population]
+Cada semilla se cruza con cada tamaño de --people. Al final compara el tiempo de CPU sumado
+de los mundos con el tiempo real del lote (aceleracion frente a correrlos uno tras otro).
+"""
+import argparse
+import json
+import sys
+import time
+
+from ..core.batch import BatchRunner, WorldConfig
+from ..core.replay import SCENARIOS
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--worlds", type=int, default=8, help="Semillas distintas")
+    parser.add_argument("--seed", type=int, default=1, help="Primera semilla")
+    parser.add_argument("--people", default="100", help="Tamaños de poblacion, separados por comas")
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument("--scenario", default="NatureScenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, uno por nucleo)")
+    parser.add_argument("--timeout", type=float, default=None, help="Segundos para el lote entero")
+    parser.add_argument("--world-timeout", type=float, default=None, help="Segundos por mundo")
+    parser.add_argument("--population", action="store_true", help="Personas en columnas (NumPy)")
+    parser.add_argument("--out", help="Añade cada resumen como una linea JSON a este fichero")
+    args = parser.parse_args(argv)
+
+    configs = [WorldConfig(seed, args.scenario, people, wolves=max(1, people // 50), towns=max(1, people // 100),
+                           hours=args.hours, pooled=args.population, timeout=args.world_timeout)
+               for seed in range(args.seed, args.seed + args.worlds)
+               for people in (int(size) for size in args.people.split(","))]
+    runner = BatchRunner(args.workers)
+    out = open(args.out, "a") if args.out else None
+    print(f"{len(configs)} mundos en {runner.workers} procesos")
+    start = time.perf_counter()
+    busy, failed = 0.0, 0
+    try:
+        for result in runner.run(configs, timeout=args.timeout):
+            busy += result.get("cpu_s", 0.0)
+            failed += result["status"] != "ok"
+            if out: out.write(json.dumps(result) + "\n"); out.flush()
+            if "ticks" not in result:
+                print(f"{result['label']:<28}{result['status']:>10}  {result.get('error', '')}")
+                continue
+            print(f"{result['label']:<28}{result['status']:>10} {result['elapsed_s']:6.1f}s  ticks {result['ticks']:5d}"
+                  f"  casas nv {result['town_level_max']}  madera {result['wood_stock']:5d}"
+                  f"  riqueza {result['wealth_mean']:6.1f}  caminos {result['roads']:4d}")
+    except KeyboardInterrupt:
+        runner.cancel()
+        print("lote cancelado")
+    finally:
+        if out: out.close()
+    wall = time.perf_counter() - start
+    print(f"lote: {wall:.1f}s reales, {busy:.1f}s de CPU en los mundos (x{busy / wall if wall else 0:.1f}), {failed} sin terminar")
+    return 0 if not failed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Campos de flujo: muchos hacia el mismo sitio, el campo tras editar el mapa y el mundo con y sin campos.
+
+Uso: python -m src.bench.flow [--agents 300] [--edits 200] [--people 300] [--hours 20] [--seed 5]
+                              [--world-seed 4]
+1. --agents salidas alrededor de un mismo destino: un A* por cabeza frente a un campo. Todas las
+   rutas del campo se validan y deben medir lo mismo que la del A* (las dos son minimas).
+2. Vallas y puentes dentro de la ventana del campo: el campo reparado en el sitio debe ser
+   igual, celda a celda, que uno montado de cero.
+3. El mundo corriendo con y sin campos: tiempo, A* lanzados y rutas servidas por campo (las
+   vueltas a casa y al origen). Gente y casas en celdas transitables, con una semilla cuyo origen
+   es tierra: la gente vuelve cuando baja su energía, a partir de unas 12 horas de juego.
+"""
+import argparse
+import sys
+import time
+
+from ..core.entities.town import Town
+from ..core.flow import FlowField
+from ..core.pathfinding import Pathfinder
+from ..core.profiler import profiler
+from ..core.replay import new_engine
+from ..core.scenarios.nature import NatureScenario
+from ..core.state import WorldState
+from .hpa import valid
+
+def pick_goal(world):
+    """Primera celda transitable en diagonal desde el origen."""
+    d = 0
+    while not world.is_walkable(d, d): d += 1
+    return d, d
+
+def starts_around(world, goal, count: int, radius: int):
+    rng = world.rng.stream("bench")
+    starts = []
+    while len(starts) < count:
+        x, y = goal[0] + rng.randint(-radius, radius), goal[1] + rng.randint(-radius, radius)
+        if world.is_walkable(x, y): starts.append((x, y))
+    return starts
+
+def queries(args) -> bool:
+    world = WorldState(NatureScenario(seed=args.seed), seed=args.seed)
+    pathfinder = Pathfinder(world)
+    goal = pick_goal(world)
+    starts = starts_around(world, goal, args.agents, 40) # Dentro de lo que resuelve el A* de 400
+    t = time.perf_counter()
+    astar = [pathfinder.search(s, goal)[0] for s in starts]
+    t_astar = time.perf_counter() - t
+    flows = world.enable_flow_fields()
+    flows.add_goal(*goal) # Como una casa
+    t = time.perf_counter()
+    served = [pathfinder.get_path(s, goal) for s in starts]
+    t_flow = time.perf_counter() - t
+    first = flows.served
+    reached = [s for s, p in zip(starts, served) if p] # Sin ruta, el campo no basta y se cae al A*
+    t = time.perf_counter()
+    again = [pathfinder.get_path(s, goal) for s in reached]
+    t_again = time.perf_counter() - t
+    invalid = sum(1 for p, s in zip(served, starts) if p and not valid(world, p, s)) + (again != [p for p in served if p])
+    longer = sum(1 for p, a in zip(served, astar) if a and p and len(p) != len(a))
+    missed = sum(1 for p, a in zip(served, astar) if a and not p)
+    print(f"A* por cabeza {sum(bool(p) for p in astar):4d} rutas  {t_astar * 1000 / len(starts):6.2f} ms/ruta")
+    print(f"campo         {sum(bool(p) for p in served):4d} rutas  {t_flow * 1000 / len(starts):6.2f} ms/ruta"
+          f"  (montando el campo; campos {flows.built}, servidas {first})")
+    print(f"campo montado {sum(bool(p) for p in again):4d} rutas  {t_again * 1000 / max(1, len(reached)):6.2f} ms/ruta"
+          f"  (solo las que tienen ruta)")
+    print(f"rutas invalidas {invalid}  de otra longitud {longer}  sin ruta {missed}")
+    return invalid == 0 and longer == 0 and missed == 0
+
+def edits(args) -> bool:
+    world = WorldState(NatureScenario(seed=args.seed), seed=args.seed)
+    pathfinder = Pathfinder(world)
+    goal = pick_goal(world)
+    flows = world.enable_flow_fields()
+    flows.add_goal(*goal)
+    for start in starts_around(world, goal, flows.min_demand, 5): pathfinder.get_path(start, goal)
+    field = flows.fields[goal]
+    rng = world.rng.stream("edits")
+    fences = bridges = 0
+    start = time.perf_counter()
+    for _ in range(args.edits):
+        x, y = goal[0] + rng.randint(-60, 60), goal[1] + rng.randint(-60, 60)
+        if (x, y) == goal or (x, y) in world.built_structures: continue
+        if world.is_walkable(x, y):
+            world.add_structure(x, y, "FENCE")
+            fences += 1
+        else:
+            world.add_structure(x, y, "BRIDGE")
+            bridges += 1
+    repair = time.perf_counter() - start
+    start = time.perf_counter()
+    fresh = FlowField(world, goal, flows.radius)
+    build_time = time.perf_counter() - start
+    same = goal in flows.fields and field.dist == fresh.dist and field.walkable == fresh.walkable
+    print(f"{fences} vallas y {bridges} puentes: reparar {repair * 1000 / max(1, fences + bridges):.2f} ms/celda"
+          f"  montar de cero {build_time * 1000:.1f} ms  igual que de cero {'si' if same else 'NO'}")
+    return same
+
+def build_homes(args):
+    """Mundo con la gente y las casas sobre tierra (populate las pone donde caigan, tambien en el agua)."""
+    engine = new_engine("NatureScenario", args.world_seed, 1.0 / 15)
+    world = engine.world_state
+    rng = world.rng.stream("setup")
+    side = max(10.0, args.people ** 0.5 * 3)
+    def spot(margin: int = 0):
+        while True:
+            x, y = int(rng.uniform(-side, side)), int(rng.uniform(-side, side))
+            if all(world.is_walkable(x + dx, y + dy) for dx in range(-margin, margin + 1) for dy in range(-margin, margin + 2)):
+                return x, y
+    for i in range(args.people): world.spawn_person(f"P{i}", *spot())
+    towns = max(1, args.people // 20)
+    for i in range(towns):
+        town = Town(f"Casa{i}", *spot(1), owner_name=f"P{i}")
+        world.add_entity(town)
+        town.add_resident(f"P{towns + i}")
+    return engine
+
+def simulation(args):
+    for name, flows in (("sin campos", False), ("con campos", True)):
+        engine = build_homes(args)
+        world = engine.world_state
+        if flows: world.enable_flow_fields()
+        profiler.enable()
+        start = time.perf_counter()
+        engine.step(round(args.hours * 10 * 15))
+        elapsed = time.perf_counter() - start
+        counters = profiler.counters
+        print(f"mundo {name:<11}{elapsed:6.1f}s  A* {counters.get('astar.calls', 0):6d}"
+              f"  nodos {counters.get('astar.nodes', 0):9d}  servidas por campo {counters.get('flow.served', 0):6d}"
+              f"  campos montados {counters.get('flow.built', 0):4d}")
+        profiler.disable()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=300)
+    parser.add_argument("--edits", type=int, default=200, help="Celdas cambiadas dentro de la ventana")
+    parser.add_argument("--people", type=int, default=300)
+    parser.add_argument("--hours", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--world-seed", type=int, default=4, help="Semilla del mundo de la simulacion")
+    args = parser.parse_args(argv)
+
+    ok = queries(args)
+    print(f"RUTAS: {'OK' if ok else 'FALLO'}")
+    incremental = edits(args)
+    print(f"INCREMENTAL: {'OK' if incremental else 'FALLO'}")
+    simulation(args)
+    return 0 if ok and incremental else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Avance rapido sin ventana: cuantos frames y ticks de logica por segundo da el motor.
+
+Uso: python -m src.bench.headless [--people 500] [--hours 6] [--population]
+Simula --hours horas de juego con dt fijo (SimulationEngine.step) y sin renderer.
+"""
+import argparse
+import random
+import sys
+import time
+
+from ..core.state import WorldState
+from ..core.scenarios.nature import NatureScenario
+from ..core.engine import SimulationEngine
+from ..core import population
+
+def build_world(people: int, seed: int, pooled: bool) -> WorldState:
+    random.seed(seed)
+    world = WorldState(NatureScenario(seed=seed), population=population.Population() if pooled else None)
+    side = people ** 0.5 * 3
+    for i in range(people):
+        world.spawn_person(f"P{i}", random.uniform(-side, side), random.uniform(-side, side))
+    return world
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--hours", type=float, default=6.0, help="Horas de juego a simular")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--population", action="store_true", help="Personas en columnas (NumPy)")
+    args = parser.parse_args(argv)
+
+    if args.population and population.np is None:
+        print("numpy no instalado: Population no disponible")
+        return 1
+    world = build_world(args.people, args.seed, args.population)
+    engine = SimulationEngine(world)
+    frames = round(args.hours * 10 / engine.fixed_dt) # El reloj del mundo avanza 0.1h por segundo simulado
+
+    start = time.perf_counter()
+    engine.step(frames)
+    elapsed = time.perf_counter() - start
+    print(f"{args.hours:g}h de juego ({engine.sim_time:.0f}s simulados, {frames} frames, "
+          f"{world.tick_count} ticks) en {elapsed:.1f}s")
+    print(f"{frames / elapsed:8.0f} frames/s  {world.tick_count / elapsed:8.1f} ticks/s  "
+          f"x{engine.sim_time / elapsed:.1f} tiempo real")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
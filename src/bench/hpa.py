@@ -0,0 +1,108 @@
+"""HPA*: viajes largos con A* acotado frente al grafo de clusters, y el grafo tras editar el mapa.
+
+Uso: python -m src.bench.hpa [--pairs 80] [--people 300] [--hours 1] [--seed 3]
+1. Pares salida/meta a hasta 100 celdas (como los objetivos de SEARCHING): cuántos resuelve
+   el A* de siempre (400 expansiones), cuántos HPA* (en frio y con clusters ya hechos) y
+   cuántos tienen ruta de verdad (A* sin limite). Todas las rutas de HPA* se validan.
+2. Vallas y puentes sobre esas rutas: el grafo actualizado por celdas debe dar lo mismo que
+   uno calculado de cero.
+3. El mundo corriendo con y sin HPA*: busquedas fallidas y tiempo.
+"""
+import argparse
+import sys
+import time
+
+from ..core.hpa import ClusterGraph
+from ..core.pathfinding import Pathfinder
+from ..core.profiler import profiler
+from ..core.scenarios.nature import NatureScenario
+from ..core.state import WorldState
+from .paths import build
+
+def valid(world, path, start) -> bool:
+    if path[0] != start: return False
+    if any(abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1 for a, b in zip(path, path[1:])): return False
+    return all(world.is_walkable(x, y) for x, y in path[1:])
+
+def make_pairs(world, count: int):
+    rng = world.rng.stream("bench")
+    pairs = []
+    while len(pairs) < count:
+        sx, sy = rng.randint(-150, 150), rng.randint(-150, 150)
+        if world.is_walkable(sx, sy): pairs.append(((sx, sy), (sx + rng.randint(-100, 100), sy + rng.randint(-100, 100))))
+    return pairs
+
+def timed(fn, pairs):
+    start = time.perf_counter()
+    out = [fn(a, b) for a, b in pairs]
+    return out, time.perf_counter() - start
+
+def queries(args) -> bool:
+    world = WorldState(NatureScenario(seed=args.seed), seed=args.seed)
+    pathfinder = Pathfinder(world)
+    pairs = make_pairs(world, args.pairs)
+    plain, t_plain = timed(pathfinder.get_path, pairs)
+    truth, t_truth = timed(lambda a, b: pathfinder.search(a, b, args.truth_steps)[0], pairs)
+    world.enable_hierarchical_paths()
+    cold, t_cold = timed(pathfinder.get_path, pairs)
+    warm, t_warm = timed(pathfinder.get_path, pairs)
+    reachable = sum(bool(p) for p in truth)
+    print(f"A* 400        {sum(bool(p) for p in plain):4d}/{reachable} rutas  {t_plain * 1000 / len(pairs):7.2f} ms/busqueda")
+    print(f"HPA* en frio  {sum(bool(p) for p in cold):4d}/{reachable} rutas  {t_cold * 1000 / len(pairs):7.2f} ms/busqueda"
+          f"  (clusters {len(world.hpa.clusters)})")
+    print(f"HPA*          {sum(bool(p) for p in warm):4d}/{reachable} rutas  {t_warm * 1000 / len(pairs):7.2f} ms/busqueda")
+    print(f"A* sin limite {reachable:4d}/{reachable} rutas  {t_truth * 1000 / len(pairs):7.2f} ms/busqueda")
+    ratios = [len(p) / len(t) for p, t in zip(warm, truth) if p and t]
+    invalid = sum(1 for p, (a, b) in zip(warm, pairs) if p and not valid(world, p, a))
+    missed = sum(1 for p, t in zip(warm, truth) if t and not p)
+    if ratios: print(f"longitud frente a la optima: media x{sum(ratios) / len(ratios):.3f}, peor x{max(ratios):.3f}")
+    print(f"rutas invalidas {invalid}  alcanzables sin ruta {missed}")
+
+    # 2. Ediciones: vallas en mitad de rutas, puentes en celdas cerradas junto a ellas
+    rng = world.rng.stream("edits")
+    edits = 0
+    for path in [p for p in warm if p][:args.pairs // 2]:
+        x, y = path[len(path) // 2]
+        world.add_structure(x, y, "FENCE")
+        bx, by = x + rng.randint(-8, 8), y + rng.randint(-8, 8)
+        if not world.is_walkable(bx, by): world.add_structure(bx, by, "BRIDGE")
+        edits += 1
+    updated = [pathfinder.get_path(a, b) for a, b in pairs]
+    world.hpa = ClusterGraph()
+    fresh = [pathfinder.get_path(a, b) for a, b in pairs]
+    same = updated == fresh
+    invalid = sum(1 for p, (a, b) in zip(updated, pairs) if p and not valid(world, p, a))
+    print(f"tras {edits} vallas (y puentes): rutas {sum(bool(p) for p in updated)}  invalidas {invalid}"
+          f"  iguales que de cero {'si' if same else 'NO'}")
+    return invalid == 0 and missed == 0 and same
+
+def simulation(args):
+    for name, hierarchical in (("A*", False), ("HPA*", True)):
+        engine = build(args)
+        if hierarchical: engine.world_state.enable_hierarchical_paths()
+        profiler.enable()
+        start = time.perf_counter()
+        engine.step(round(args.hours * 10 * 15))
+        elapsed = time.perf_counter() - start
+        counters = profiler.counters
+        failed = counters.get("astar.failed", 0) + counters.get("hpa.failed", 0)
+        print(f"mundo {name:<5}{elapsed:6.1f}s  busquedas {counters.get('astar.calls', 0):6d}  fallidas {failed:6d}"
+              f"  nodos A* {counters.get('astar.nodes', 0):8d}  entradas HPA* {counters.get('hpa.nodes', 0):8d}")
+        profiler.disable()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=80)
+    parser.add_argument("--truth-steps", type=int, default=20000, help="Limite del A* de referencia")
+    parser.add_argument("--people", type=int, default=300)
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    ok = queries(args)
+    print(f"HPA: {'OK' if ok else 'FALLO'}")
+    simulation(args)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
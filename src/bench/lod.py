@@ -0,0 +1,85 @@
+"""Nivel de detalle: coste y resultados con y sin LOD en un mundo grande y disperso.
+
+Uso: python -m src.bench.lod [--people 2000] [--side 1500] [--hours 1] [--seed 4] [--sweep]
+La camara está en el origen (con --sweep cruza el mundo de punta a punta mientras corre).
+Compara el tiempo por frame y medias del mundo (energia, estres, riqueza, madera) que el
+nivel agregado debe conservar en promedio, y cuenta quién acaba en una celda no transitable.
+"""
+import argparse
+import sys
+import time
+
+from ..core.engine import SimulationEngine
+from ..core.entities.components import PersonState
+from ..core.entities.town import Town
+from ..core.lod import LevelOfDetail, TIER_NAMES
+from ..core.scenarios.nature import NatureScenario
+from ..core.state import WorldState
+
+class Camera:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0):
+        self.x, self.y = x, y
+
+def build(people: int, side: float, seed: int) -> WorldState:
+    world = WorldState(NatureScenario(seed=seed), seed=seed)
+    rng = world.rng.stream("setup")
+    for i in range(people):
+        world.spawn_person(f"P{i}", rng.uniform(-side, side), rng.uniform(-side, side))
+    for i in range(max(1, people // 50)):
+        world.spawn_wolf(f"W{i}", rng.uniform(-side, side), rng.uniform(-side, side))
+    # Hogares junto a sus dueños: hay entregas en todo el mapa, no solo cerca de la camara
+    for i, person in enumerate(list(world.people.values())[:max(1, people // 20)]):
+        world.add_entity(Town(f"Casa{i}", int(person.x), int(person.y), owner_name=person.name))
+    return world
+
+def summary(world: WorldState):
+    people = list(world.people.values())
+    n = len(people) or 1
+    wood = sum(p.inventory["wood"] for p in people) + sum(t.wood_stock for t in world.towns)
+    stuck = sum(not world.is_walkable(p.x, p.y) for p in people)
+    gathering = sum(p.state == PersonState.GATHERING for p in people)
+    return {"energia": sum(p.energy for p in people) / n, "estres": sum(p.stress for p in people) / n,
+            "riqueza": sum(p.wealth for p in people) / n, "madera": wood, "recogiendo": gathering,
+            "caminos": len(world.built_structures), "atascados": stuck}
+
+def run(args, lod: bool):
+    world = build(args.people, args.side, args.seed)
+    engine = SimulationEngine(world)
+    camera = Camera()
+    if lod: engine.lod = LevelOfDetail(camera)
+    frames = round(args.hours * 10 * 15)
+    engine.step(15) # Arranque (primeras rutas y chunks) fuera de la medida
+    start = time.perf_counter()
+    for frame in range(frames):
+        if args.sweep: camera.x = -args.side + 2 * args.side * frame / frames
+        engine.step()
+    elapsed = time.perf_counter() - start
+    tiers = engine.lod.counts if lod else [len(world.people) + len(world.wolves), 0, 0]
+    return elapsed / frames, summary(world), tiers
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--side", type=float, default=1500.0, help="Semilado del cuadrado poblado")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=4)
+    parser.add_argument("--sweep", action="store_true", help="La camara cruza el mundo durante la prueba")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, lod in (("completo", False), ("LOD", True)):
+        per_frame, stats, tiers = run(args, lod)
+        results[name] = (per_frame, stats)
+        print(f"{name:<9}{per_frame * 1000:8.2f} ms/frame  niveles "
+              + " ".join(f"{label} {count}" for label, count in zip(TIER_NAMES, tiers)))
+    full, lod = results["completo"], results["LOD"]
+    print(f"aceleracion x{full[0] / lod[0]:.1f}")
+    print(f"{'':<12}{'completo':>10}{'LOD':>10}")
+    for key in full[1]:
+        print(f"{key:<12}{full[1][key]:>10.1f}{lod[1][key]:>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Benchmark de memoria por Person: disposicion antigua (__dict__, uuid4, dict, listas) frente a la compacta.
+
+Uso: python -m src.bench.memory [--people 20000] [--path 20]
+Mide con tracemalloc los bytes por persona (objeto + inventario + ruta + id) y el coste de
+buscar entidades por id en un dict (uuid4 frente a enteros).
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+from ..core.entities.person import Person
+from ..core.entities.components import Path
+from ..core import population
+
+class LegacyPerson:
+    """Copia de la Person anterior: mismos campos, en __dict__ y con tipos de Python."""
+
+    def __init__(self, name: str, x: float = 0.0, y: float = 0.0, goal: str = "BUILDER", traits: list = None):
+        self.id = uuid.uuid4()
+        self.name = name
+        self.x = x
+        self.y = y
+        self.energy = 100
+        self.wealth = random.randint(20, 50)
+        self.stress = 0
+        self.goal = goal
+        self.traits = traits if traits else []
+        self.state = "IDLE"
+        self.inventory = {"wood": 0, "food": 0, "medkit": 0}
+        self.base_speed = 8.0
+        self.speed = self.base_speed
+        self.target_x, self.target_y = x, y
+        self.path = []
+        self.pathfinder = None
+        self.action_timer = 0.0
+        self.social_cooldown = 0.0
+        self.path_retry_timer = 0.0
+        self.current_biome = "MEADOW"
+        self.home_reference = None
+        self.last_road_pos = (None, None)
+        self.is_constructing = False
+
+def make_legacy(i: int, path_len: int):
+    person = LegacyPerson(f"P{i}", i * 0.5, i * 0.25, traits=["BRAVE"])
+    person.path = [(i + k, i) for k in range(path_len)]
+    return person
+
+def make_compact(i: int, path_len: int):
+    person = Person(f"P{i}", i * 0.5, i * 0.25, traits=["BRAVE"])
+    person.path = Path((i + k, i) for k in range(path_len))
+    return person
+
+def make_pooled(pop, i: int, path_len: int):
+    person = pop.spawn(f"P{i}", i * 0.5, i * 0.25, traits=["BRAVE"])
+    person.path = [(i + k, i) for k in range(path_len)]
+    return person
+
+def build_pooled(people: int, path_len: int):
+    pop = population.Population(capacity=people) # Sus columnas cuentan en la medicion
+    return [pop] + [make_pooled(pop, i, path_len) for i in range(people)]
+
+def bytes_per_person(build, people: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(kept)) / people
+
+def lookup_time(keys, rounds: int = 20) -> float:
+    table = {key: None for key in keys}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys: table[key]
+    return (time.perf_counter() - start) / (rounds * len(keys))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=20000)
+    parser.add_argument("--path", type=int, default=20, help="Nodos de ruta por persona")
+    args = parser.parse_args(argv)
+
+    people, path_len = args.people, args.path
+    base = bytes_per_person(lambda: [make_legacy(i, path_len) for i in range(people)], people)
+    print(f"antigua      {base:8.0f} bytes/persona")
+    compact = bytes_per_person(lambda: [make_compact(i, path_len) for i in range(people)], people)
+    print(f"compacta     {compact:8.0f} bytes/persona  x{base / compact:.1f}")
+    if population.np is not None:
+        pooled = bytes_per_person(lambda: build_pooled(people, path_len), people)
+        print(f"population   {pooled:8.0f} bytes/persona  x{base / pooled:.1f}")
+
+    uuid_keys = [uuid.uuid4() for _ in range(args.people)]
+    int_keys = list(range(1, args.people + 1))
+    uuid_ns, int_ns = lookup_time(uuid_keys) * 1e9, lookup_time(int_keys) * 1e9
+    print(f"busqueda por id: uuid4 {uuid_ns:.0f} ns, entero {int_ns:.0f} ns")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
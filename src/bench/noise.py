@@ -0,0 +1,55 @@
+"""Benchmark del nucleo de ruido de NatureScenario: escalar vs rejilla Python vs NumPy.
+
+Uso: python -m src.bench.noise [--size 256] [--tiles 4] [--seed 1234]
+Que las tres rutas dan exactamente los mismos biomas lo comprueba tests/test_noise.py.
+"""
+import argparse
+import sys
+import time
+from array import array
+
+from ..core.scenarios import nature
+from ..core.scenarios.nature import NatureScenario
+
+def scalar_tile(scenario: NatureScenario, x0: int, y0: int, size: int) -> array:
+    index = {name: i for i, name in enumerate(scenario.biome_table())}
+    return array('B', (index[scenario.get_biome_id(x, y)]
+                       for y in range(y0, y0 + size) for x in range(x0, x0 + size)))
+
+def python_tile(scenario: NatureScenario, x0: int, y0: int, size: int) -> array:
+    numpy_module, nature.np = nature.np, None
+    try:
+        return scenario.get_biome_ids(x0, y0, size, size)
+    finally:
+        nature.np = numpy_module
+
+def numpy_tile(scenario: NatureScenario, x0: int, y0: int, size: int) -> array:
+    return scenario.get_biome_ids(x0, y0, size, size)
+
+def measure(func, scenario, origins, size: int) -> float:
+    start = time.perf_counter()
+    for x0, y0 in origins: func(scenario, x0, y0, size)
+    return (time.perf_counter() - start) / len(origins)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--tiles", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    scenario = NatureScenario(seed=args.seed)
+    origins = [(i * args.size - 1000, (i % 2) * args.size - 300) for i in range(args.tiles)]
+
+    base = measure(scalar_tile, scenario, origins, args.size)
+    print(f"escalar      {base * 1000:9.1f} ms/tile")
+    for label, func in [("rejilla py", python_tile), ("numpy", numpy_tile)]:
+        if func is numpy_tile and nature.np is None:
+            print("numpy        (no instalado)")
+            continue
+        elapsed = measure(func, scenario, origins, args.size)
+        print(f"{label:<12} {elapsed * 1000:9.1f} ms/tile  x{base / elapsed:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Rutas compartidas: aciertos, A* ahorrados y validez de la cache con vallas y ampliaciones.
+
+Uso: python -m src.bench.paths [--people 500] [--hours 2] [--quantum 8] [--seed 5]
+Mismo mundo tres veces (misma semilla): sin cache, con quantum=1 (solo viajes exactos, debe
+dar el mismo estado que sin cache) y con --quantum. Despues, con la cache puesta, planta
+vallas sobre rutas guardadas, puentes donde miraron busquedas fallidas y amplia casas, y
+comprueba que ninguna ruta guardada pisa una celda no transitable y que los fallos guardados
+siguen fallando.
+"""
+import argparse
+import sys
+import time
+
+from ..core.batch import WorldConfig, populate
+from ..core.pathfinding import BLOCK_BITS, BLOCK_SIZE, Pathfinder
+from ..core.profiler import profiler
+from ..core.replay import new_engine, state_hash
+from .sleep import summary
+
+def build(args, quantum=None):
+    engine = new_engine("NatureScenario", args.seed, 1.0 / 15)
+    world = engine.world_state
+    populate(world, WorldConfig(args.seed, people=args.people, wolves=max(1, args.people // 50),
+                                towns=max(1, args.people // 20)))
+    if quantum is not None: world.enable_path_cache(quantum)
+    return engine
+
+def run(args, quantum=None):
+    engine = build(args, quantum)
+    frames = round(args.hours * 10 * 15)
+    profiler.enable() # Vacia contadores: cada pasada cuenta solo lo suyo
+    start = time.perf_counter()
+    engine.step(frames)
+    elapsed = time.perf_counter() - start
+    nodes = profiler.counters.get("astar.nodes", 0)
+    searches = profiler.counters.get("astar.calls", 0)
+    profiler.disable()
+    return engine, elapsed, searches, nodes
+
+def invalid_paths(world) -> int:
+    """Rutas guardadas que pisan alguna celda no transitable."""
+    return sum(not all(world.is_walkable(x, y) for x, y in entry.decode()) for entry in world.paths.entries.values())
+
+def stale_failures(world, rng, sample: int = 20) -> int:
+    """Fallos guardados que, buscados de nuevo sin cache, ya encuentran ruta."""
+    keys = list(world.paths.failures)
+    pathfinder = Pathfinder(world)
+    stale = 0
+    for _ in range(min(sample, len(keys))):
+        sx, sy, ex, ey, max_steps = rng.choice(keys)
+        stale += bool(pathfinder.search((sx, sy), (ex, ey), max_steps)[0])
+    return stale
+
+def edit_check(args) -> bool:
+    """Vallas sobre rutas guardadas y casas ampliadas mientras corre: la cache nunca queda mal."""
+    engine = build(args, args.quantum)
+    world = engine.world_state
+    rng = world.rng.stream("bench")
+    bad = fences = bridges = upgrades = 0
+    for round_ in range(args.edits):
+        engine.step(30)
+        entries = list(world.paths.entries.values())
+        for _ in range(min(5, len(entries))):
+            path = rng.choice(entries).decode()
+            x, y = path[len(path) // 2]
+            if world.is_walkable(x, y) and (x, y) not in world.built_structures:
+                world.add_structure(x, y, "FENCE")
+                fences += 1
+        failures = list(world.paths.failures.values())
+        for _ in range(min(5, len(failures))): # Puentes donde miraron busquedas fallidas
+            bx, by = rng.choice(sorted(rng.choice(failures)[1]))
+            x, y = (bx << BLOCK_BITS) + rng.randint(0, BLOCK_SIZE - 1), (by << BLOCK_BITS) + rng.randint(0, BLOCK_SIZE - 1)
+            if not world.is_walkable(x, y) and (x, y) not in world.built_structures:
+                world.add_structure(x, y, "BRIDGE")
+                bridges += 1
+        if world.towns and round_ % 3 == 0:
+            rng.choice(world.towns).upgrade()
+            upgrades += 1
+        bad += invalid_paths(world) + stale_failures(world, rng)
+    stats = world.paths.stats()
+    print(f"ediciones  vallas {fences}  puentes {bridges}  ampliaciones {upgrades}  tiradas {stats['invalidated']}"
+          f"  invalidas {bad}")
+    return bad == 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--quantum", type=int, default=8, help="Celdas por lado del cuadro de salida/meta")
+    parser.add_argument("--edits", type=int, default=20, help="Rondas de vallas en la comprobacion")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results, hashes = {}, {}
+    for name, quantum in (("sin cache", None), ("exacta", 1), (f"quantum {args.quantum}", args.quantum)):
+        engine, elapsed, searches, nodes = run(args, quantum)
+        world = engine.world_state
+        results[name] = summary(world)
+        hashes[name] = state_hash(world)
+        line = f"{name:<11}{elapsed:6.1f}s  A* {searches:6d}  nodos {nodes:9d}"
+        if world.paths is not None:
+            stats = world.paths.stats()
+            line += (f"  aciertos {stats['hit_rate']:5.1%}  nodos ahorrados {stats['saved_nodes']:8d}"
+                     f"  empalmes fallidos {stats['stitch_failed']}  rutas {stats['entries']}")
+        print(line)
+    names = list(results)
+    print(f"{'':<12}" + "".join(f"{name:>12}" for name in names))
+    for key in results[names[0]]:
+        print(f"{key:<12}" + "".join(f"{results[name][key]:>12.1f}" for name in names))
+
+    parity = hashes["sin cache"] == hashes["exacta"]
+    print(f"PARIDAD (exacta): {'OK' if parity else 'DISTINTO'}")
+    valid = edit_check(args)
+    print(f"RUTAS VALIDAS: {'OK' if valid else 'FALLO'}")
+    return 0 if parity and valid else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
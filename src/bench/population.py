@@ -0,0 +1,85 @@
+"""Benchmark de Population (columnas NumPy) frente a Person.update persona a persona.
+
+Uso: python -m src.bench.population [--people 50000] [--frames 10]
+Mide metabolismo y movimiento por frame: las rutas se fijan de antemano y la IA se aplaza,
+para no medir A* ni _logic_tick (que siguen siendo Python por entidad en ambos casos).
+Antes comprueba con pocas personas y la simulacion completa que ambas rutas coinciden.
+"""
+import argparse
+import random
+import sys
+import time
+
+from ..core.state import WorldState
+from ..core.scenarios.urban import UrbanScenario
+from ..core.engine import SimulationEngine
+from ..core.entities.town import Town
+from ..core import population
+
+DT = 1.0 / 15
+
+def build_world(pooled: bool, people: int, seed: int) -> WorldState:
+    random.seed(seed)
+    world = WorldState(UrbanScenario(seed=seed), population=population.Population() if pooled else None)
+    world.add_entity(Town("Casa", 20, 20, "P1"))
+    side = people ** 0.5 * 2
+    for i in range(people):
+        person = world.spawn_person(f"P{i}", random.uniform(-side, side), random.uniform(-side, side))
+        if i % 3 == 0: person.inventory["wood"] = 12 # Vuelven a casa construyendo camino
+    return world
+
+def snapshot(world: WorldState):
+    return [(p.x, p.y, p.energy, p.stress, p.speed, p.state, tuple(p.path), p.current_biome)
+            for p in world.people.values()]
+
+def check_parity(people: int, frames: int, seed: int) -> bool:
+    results = []
+    for pooled in (False, True):
+        world = build_world(pooled, people, seed)
+        engine = SimulationEngine(world)
+        random.seed(seed + 1)
+        for _ in range(frames): engine._update_entities(DT, False, world.scenario)
+        results.append((snapshot(world), sorted(world.built_structures)))
+    return results[0] == results[1]
+
+def prepare(world: WorldState):
+    """Rutas rectas de 40 celdas y la IA aplazada: solo quedan metabolismo y movimiento."""
+    for person in world.people.values():
+        bx, by = int(person.x), int(person.y)
+        person.path = [(bx + k, by) for k in range(40)]
+        person.path_retry_timer = 1e9
+        person.action_timer = -1e9
+
+def measure(world: WorldState, frames: int) -> float:
+    engine = SimulationEngine(world)
+    start = time.perf_counter()
+    for _ in range(frames): engine._update_entities(DT, False, world.scenario)
+    return (time.perf_counter() - start) / frames
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=50000)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    if population.np is None:
+        print("numpy no instalado: Population no disponible")
+        return 1
+    if not check_parity(60, 300, args.seed):
+        print("PARIDAD: Population.step no coincide con Person.update")
+        return 1
+    print("PARIDAD: OK (60 personas, 300 frames con IA y rutas)")
+
+    timings = {}
+    for label, pooled in (("person", False), ("population", True)):
+        world = build_world(pooled, args.people, args.seed)
+        prepare(world)
+        timings[label] = measure(world, args.frames)
+    base = timings["person"]
+    print(f"person       {base * 1000:9.1f} ms/frame ({args.people} personas)")
+    print(f"population   {timings['population'] * 1000:9.1f} ms/frame  x{base / timings['population']:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Benchmark de los registros por tipo de WorldState frente a get_all_entities + isinstance.
+
+Uso: python -m src.bench.registries [--people 5000] [--frames 50]
+Mide, por frame, lo que cuesta obtener las colecciones que recorren el motor y los eventos
+(memoria reservada con tracemalloc y tiempo), sin ejecutar la logica de las entidades.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from ..core.state import WorldState
+from ..core.scenarios.urban import UrbanScenario
+from ..core.entities.person import Person
+from ..core.entities.wolf import Wolf
+from ..core.entities.shop import Shop
+from ..core.entities.town import Town
+
+def build_world(people: int, seed: int) -> WorldState:
+    rng = random.Random(seed)
+    world = WorldState(UrbanScenario())
+    side = people ** 0.5 * 2
+    for i in range(people):
+        world.add_entity(Person(f"P{i}", rng.uniform(-side, side), rng.uniform(-side, side)))
+    for i in range(max(1, people // 50)):
+        world.add_entity(Wolf(f"W{i}", rng.uniform(-side, side), rng.uniform(-side, side)))
+    for _ in range(5):
+        world.add_entity(Shop(rng.uniform(-side, side), rng.uniform(-side, side)))
+    for i in range(max(1, people // 100)):
+        world.add_entity(Town(f"Casa{i}", i * 40, 0, owner_name=f"P{i}"))
+    return world
+
+def frame_filtered(world: WorldState) -> int:
+    """Como antes: una lista nueva y varios filtros por frame."""
+    touched = 0
+    entities = world.get_all_entities()                                   # run(): fisica
+    for entity in entities:
+        touched += isinstance(entity, Person) or isinstance(entity, Wolf)
+    all_entities = world.get_all_entities()                               # interacciones
+    people = [e for e in all_entities if isinstance(e, Person)]
+    wolves = [e for e in all_entities if isinstance(e, Wolf)]
+    shops = [e for e in all_entities if isinstance(e, Shop)]
+    touched += len(people) + len(wolves) + len(shops)
+    touched += len([e for e in entities if isinstance(e, Person)])        # eventos contextuales
+    touched += len([e for e in world.get_all_entities() if isinstance(e, Person)]) # EventManager
+    for person in people[:20]:                                            # busqueda de hogar
+        for e in world.get_all_entities():
+            if isinstance(e, Town) and (e.owner_name == person.name or person.name in e.residents): break
+    return touched
+
+def frame_typed(world: WorldState) -> int:
+    """Con los registros: se recorren las vistas tal cual."""
+    touched = 0
+    for registry in (world.people, world.wolves, world.others):
+        for entity in registry.values(): touched += 1
+    touched += len(world.people) + len(world.wolves) + len(world.shops)
+    for person in world.people.values(): touched += 1
+    touched += bool(world.people)
+    for i, person in enumerate(world.people.values()):                   # busqueda de hogar
+        if i == 20: break
+        world.home_of(person.name)
+    return touched
+
+def measure(func, world: WorldState, frames: int):
+    start = time.perf_counter()
+    for _ in range(frames): func(world)
+    elapsed = (time.perf_counter() - start) / frames
+    # La memoria se mide aparte: tracemalloc ralentiza mucho las asignaciones
+    tracemalloc.start()
+    func(world)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    world = build_world(args.people, args.seed)
+    for person in list(world.people.values())[:200]:
+        expected = next((e for e in world.get_all_entities() if isinstance(e, Town)
+                         and (e.owner_name == person.name or person.name in e.residents)), None)
+        if world.home_of(person.name) is not expected:
+            print(f"PARIDAD: home_of({person.name}) no coincide con la busqueda lineal")
+            return 1
+    print(f"PARIDAD: OK ({len(world.entities)} entidades)")
+
+    base_time, base_peak = measure(frame_filtered, world, args.frames)
+    typed_time, typed_peak = measure(frame_typed, world, args.frames)
+    print(f"filtrado     {base_time * 1000:8.2f} ms/frame  pico {base_peak / 1024:8.1f} KB")
+    print(f"registros    {typed_time * 1000:8.2f} ms/frame  pico {typed_peak / 1024:8.1f} KB  "
+          f"x{base_time / typed_time:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
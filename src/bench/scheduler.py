@@ -0,0 +1,58 @@
+"""Benchmark del Scheduler: tiempos de frame con y sin presupuestos ante un pico de poblacion.
+
+Uso: python -m src.bench.scheduler [--people 1000] [--spike 4000] [--frames 120]
+A mitad de la corrida aparecen --spike personas de golpe. Con presupuestos la física, las
+interacciones y los eventos contextuales se trocean entre frames (siguen por donde iban en el
+frame siguiente) y la lógica aplazable espera si el frame va pasado. "pasadas" son las rondas
+completas: con presupuesto hay menos, cada una con más tiempo simulado.
+"""
+import argparse
+import random
+import sys
+import time
+
+from ..core.engine import SimulationEngine
+from .headless import build_world
+
+def run(people: int, spike: int, frames: int, seed: int, budgeted: bool):
+    world = build_world(people, seed, False)
+    engine = SimulationEngine(world)
+    random.seed(seed)
+    side = (people + spike) ** 0.5 * 3
+    times = []
+    for frame in range(frames):
+        if frame == frames // 2:
+            for i in range(spike):
+                world.spawn_person(f"S{i}", random.uniform(-side, side), random.uniform(-side, side))
+            engine.scheduler.reset_stats() # Solo cuenta desde el pico
+        start = time.perf_counter()
+        engine.scheduler.tick(engine.fixed_dt, budgeted=budgeted, exclude=("render",))
+        times.append(time.perf_counter() - start)
+    return times[frames // 2:], engine.scheduler
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=1000)
+    parser.add_argument("--spike", type=int, default=4000, help="Personas que aparecen a mitad")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    for budgeted in (False, True):
+        times, scheduler = run(args.people, args.spike, args.frames, args.seed, budgeted)
+        label = "con presupuesto" if budgeted else "sin presupuesto"
+        print(f"{label}: p50 {percentile(times, 0.5) * 1000:6.1f} ms  p90 {percentile(times, 0.9) * 1000:6.1f} ms"
+              f"  max {max(times) * 1000:6.1f} ms")
+        for name, stats in scheduler.stats().items():
+            if not stats["calls"]: continue
+            print(f"  {name:<13}{stats['time_avg'] * 1000:7.2f} ms/llamada  max {stats['time_max'] * 1000:6.1f} ms"
+                  f"  pasadas {stats['runs']:4d}"
+                  f"  excesos {stats['overruns']:4d}  aplazados {stats['deferred']:4d}  troceados {stats['carried']:4d}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
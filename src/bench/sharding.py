@@ -0,0 +1,81 @@
+"""Motor por regiones frente al motor de un proceso: tiempo, traspasos, fantasmas y conservacion.
+
+Uso: python -m src.bench.sharding [--people 400] [--hours 2] [--workers 2] [--region 64]
+                                  [--seed 3] [--save mundo.dat]
+La gente se reparte a lo ancho de todas las franjas. No se espera el mismo mundo que en un
+proceso (cada trabajador tira sus propios eventos); sí que no se pierda ni se duplique nadie,
+que la madera entregada llegue a las casas y que dos ejecuciones con la misma semilla coincidan.
+"""
+import argparse
+import sys
+import time
+
+from ..core.engine import SimulationEngine
+from ..core.entities.shop import Shop
+from ..core.entities.town import Town
+from ..core.replay import state_hash
+from ..core.scenarios.nature import NatureScenario
+from ..core.sharding import ShardedEngine
+from ..core.state import WorldState
+
+def build(people: int, width: float, seed: int) -> WorldState:
+    world = WorldState(NatureScenario(seed=seed), seed=seed)
+    rng = world.rng.stream("setup")
+    half = width / 2
+    for i in range(people):
+        world.spawn_person(f"P{i}", rng.uniform(-half, half), rng.uniform(-30, 30))
+    for i in range(max(1, people // 50)):
+        world.spawn_wolf(f"W{i}", rng.uniform(-half, half), rng.uniform(-30, 30))
+    for i in range(max(1, people // 100)):
+        world.add_entity(Town(f"Casa{i}", int(rng.uniform(-half, half)), int(rng.uniform(-30, 30)), owner_name=f"P{i}"))
+    world.add_entity(Shop(0.0, 0.0))
+    return world
+
+def sharded(args, frames: int):
+    world = build(args.people, args.region * args.workers * 2, args.seed)
+    ids = sorted(e.id for e in world.entities.values())
+    start = time.perf_counter()
+    with ShardedEngine(world, workers=args.workers, region_size=args.region) as engine:
+        engine.step(frames)
+        merged = engine.snapshot()
+        stats = dict(engine.stats)
+        if args.save: engine.save(args.save)
+    return merged, ids, stats, time.perf_counter() - start
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=400)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--region", type=int, default=64, help="Ancho de cada franja en celdas")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--save", help="Guarda el mundo unido con PersistenceManager (carpeta saves/)")
+    args = parser.parse_args(argv)
+
+    frames = round(args.hours * 10 * 15) # 0.1h de juego por segundo simulado a 15 fps
+    single = SimulationEngine(build(args.people, args.region * args.workers * 2, args.seed))
+    start = time.perf_counter()
+    single.step(frames)
+    single_s = time.perf_counter() - start
+    print(f"1 proceso:        {single_s:6.1f}s  ticks {single.world_state.tick_count}"
+          f"  madera {sum(t.wood_stock for t in single.world_state.towns)}")
+
+    merged, ids, stats, sharded_s = sharded(args, frames)
+    print(f"{args.workers} regiones:       {sharded_s:6.1f}s  ticks {merged.tick_count}"
+          f"  madera {sum(t.wood_stock for t in merged.towns)}  (x{single_s / sharded_s:.2f})")
+    print(f"  intercambios {stats['exchanges']}  traspasos {stats['handoffs']}"
+          f"  fantasmas/intercambio {stats['ghosts'] / max(1, stats['exchanges']):.1f}"
+          f"  personas por trabajador {stats['people']}")
+
+    again, _, _, _ = sharded(args, frames)
+    problems = []
+    merged_ids = sorted(e.id for e in merged.entities.values())
+    if merged_ids != ids: problems.append(f"entidades: {len(ids)} al empezar, {len(merged_ids)} al final")
+    if merged.tick_count != single.world_state.tick_count: problems.append("los relojes no coinciden")
+    if state_hash(again) != state_hash(merged): problems.append("dos ejecuciones con la misma semilla difieren")
+    for problem in problems: print(f"  {problem}")
+    print("CONSERVACION: OK" if not problems else f"CONSERVACION: FALLO ({len(problems)})")
+    return 0 if not problems else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Entidades dormidas: coste de la fisica y resultados con y sin rueda de temporizadores.
+
+Uso: python -m src.bench.sleep [--people 500] [--hours 2] [--seed 6]
+Mismo mundo dos veces (misma semilla). Con dormir, quien está quieto (descansando, esperando
+para reintentar ruta, lobo parado) no se visita hasta su hora y se pone al dia de golpe. Los
+resultados no salen bit a bit iguales, pero las medias del mundo deben quedar cerca.
+"""
+import argparse
+import sys
+import time
+
+from ..core.batch import WorldConfig, populate
+from ..core.entities.components import PersonState
+from ..core.profiler import profiler
+from ..core.replay import new_engine
+
+def summary(world):
+    people = list(world.people.values())
+    n = len(people) or 1
+    return {"energia": sum(p.energy for p in people) / n, "estres": sum(p.stress for p in people) / n,
+            "riqueza": sum(p.wealth for p in people) / n,
+            "madera": sum(p.inventory["wood"] for p in people) + sum(t.wood_stock for t in world.towns),
+            "descansando": sum(p.state == PersonState.RESTING for p in people),
+            "caminos": len(world.built_structures)}
+
+def run(args, sleep: bool):
+    engine = new_engine("NatureScenario", args.seed, 1.0 / 15)
+    world = engine.world_state
+    populate(world, WorldConfig(args.seed, people=args.people, wolves=max(1, args.people // 50),
+                                towns=max(1, args.people // 20)))
+    if sleep: engine.enable_sleep()
+    frames = round(args.hours * 10 * 15)
+    profiler.enable() # Vacia contadores: cada pasada cuenta solo lo suyo
+    start = time.perf_counter()
+    engine.step(frames)
+    elapsed = time.perf_counter() - start
+    physics = profiler.histograms["phase.physics"].total
+    asleep = profiler.counters.get("sleep.asleep", 0) / frames
+    woken = profiler.counters.get("sleep.woken", 0)
+    updates = profiler.histograms["update.Person"].count
+    searches = profiler.counters.get("astar.calls", 0)
+    profiler.disable()
+    return elapsed, physics, asleep, woken, updates, searches, summary(world)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, sleep in (("despiertos", False), ("dormir", True)):
+        elapsed, physics, asleep, woken, updates, searches, stats = run(args, sleep)
+        results[name] = stats
+        print(f"{name:<11}{elapsed:6.1f}s total  fisica {physics:6.1f}s  updates {updates:7d}  A* {searches:6d}"
+              f"  dormidos/frame {asleep:6.1f}  despertados antes de hora {woken}")
+    print(f"{'':<12}{'despiertos':>11}{'dormir':>10}")
+    for key in results["despiertos"]:
+        print(f"{key:<12}{results['despiertos'][key]:>11.1f}{results['dormir'][key]:>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Suite de benchmarks por escenario y tamaño, con linea base en JSON y modo comparacion.
+
+Uso: python -m src.bench.suite [--sizes 10,100,1000,10000] [--scenarios nature,urban,cave]
+                               [--cases step,path,walkable,render,save,events]
+                               [--save base.json] [--compare base.json --threshold 0.25]
+Cada medida es el mejor de --repeat intentos, en segundos por operacion. Con --compare se
+marcan como REGRESION las que empeoran más de --threshold y la salida es 1 si hay alguna.
+"""
+import argparse
+import contextlib
+import curses
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from ..core.state import WorldState
+from ..core.engine import SimulationEngine
+from ..core.pathfinding import Pathfinder
+from ..core import persistence
+from ..core.persistence import PersistenceManager
+from ..core.entities.wolf import Wolf
+from ..core.entities.shop import Shop
+from ..core.entities.town import Town
+from ..core.scenarios.nature import NatureScenario
+from ..core.scenarios.urban import UrbanScenario
+from ..core.scenarios.cave import CaveScenario
+from ..interfaces.cli.curses_renderer import CursesRenderer
+
+SCENARIOS = {"nature": NatureScenario, "urban": UrbanScenario, "cave": CaveScenario}
+
+def build_world(scenario: str, people: int, seed: int) -> WorldState:
+    """Mundo reproducible: mismas posiciones, rasgos y riqueza para la misma semilla."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    world = WorldState(SCENARIOS[scenario](seed=seed))
+    side = people ** 0.5 * 3
+    for i in range(people):
+        world.spawn_person(f"P{i}", rng.uniform(-side, side), rng.uniform(-side, side))
+    for i in range(max(1, people // 50)):
+        world.add_entity(Wolf(f"W{i}", rng.uniform(-side, side), rng.uniform(-side, side)))
+    for _ in range(max(1, people // 200)):
+        world.add_entity(Shop(rng.uniform(-side, side), rng.uniform(-side, side)))
+    for i in range(max(1, people // 100)):
+        world.add_entity(Town(f"Casa{i}", int(rng.uniform(-side, side)), int(rng.uniform(-side, side)),
+                              owner_name=f"P{i}"))
+    return world
+
+# --- PANTALLA FALSA PARA EL RENDERER ---
+class FakeWindow:
+    """Ventana de curses que solo cuenta las llamadas de pintado."""
+
+    def __init__(self, height: int, width: int):
+        self.height, self.width = height, width
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, *args): self.calls += 1
+    def addch(self, *args): self.calls += 1
+    def erase(self): pass
+    def box(self): pass
+    def refresh(self): pass
+    def noutrefresh(self): pass
+
+@contextlib.contextmanager
+def fake_curses():
+    saved = {name: getattr(curses, name) for name in ("has_colors", "newwin", "color_pair", "doupdate")}
+    curses.has_colors = lambda: False
+    curses.newwin = lambda h, w, y, x: FakeWindow(h, w)
+    curses.color_pair = lambda n: n << 8
+    curses.doupdate = lambda: None
+    try:
+        yield
+    finally:
+        for name, value in saved.items(): setattr(curses, name, value)
+
+# --- CASOS: cada uno devuelve (segundos, operaciones) ---
+def case_step(world, people, seed):
+    engine = SimulationEngine(world)
+    engine.step(2) # Calentamiento: rutas iniciales y chunks
+    frames = max(3, min(30, 3000 // max(1, people)))
+    start = time.perf_counter()
+    engine.step(frames)
+    return time.perf_counter() - start, frames
+
+def case_path(world, people, seed):
+    rng = random.Random(seed)
+    people_list = list(world.people.values())
+    pathfinder = Pathfinder(world)
+    queries = 50
+    pairs = [(rng.choice(people_list), rng.choice(people_list)) for _ in range(queries)]
+    for a, b in pairs: pathfinder.get_path((a.x, a.y), (b.x, b.y)) # Calentamiento: chunks del terreno
+    start = time.perf_counter()
+    for a, b in pairs: pathfinder.get_path((a.x, a.y), (b.x, b.y))
+    return time.perf_counter() - start, queries
+
+def case_walkable(world, people, seed):
+    rng = random.Random(seed)
+    side = people ** 0.5 * 3 + 16
+    points = [(rng.uniform(-side, side), rng.uniform(-side, side)) for _ in range(50_000)]
+    for x, y in points[:2000]: world.is_walkable(x, y) # Chunks ya cargados
+    start = time.perf_counter()
+    for x, y in points: world.is_walkable(x, y)
+    return time.perf_counter() - start, len(points)
+
+def case_render(world, people, seed):
+    frames = 10
+    with fake_curses():
+        renderer = CursesRenderer(FakeWindow(60, 200))
+        renderer.camera_focus = next(iter(world.people.values()))
+        renderer.render(world) # La primera llamada solo crea las ventanas
+        renderer.render(world)
+        start = time.perf_counter()
+        for _ in range(frames): renderer.render(world)
+        elapsed = time.perf_counter() - start
+    return elapsed, frames
+
+def case_save(world, people, seed):
+    saved_dir = persistence.SAVE_DIR
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        persistence.SAVE_DIR = tmp
+        try:
+            start = time.perf_counter()
+            PersistenceManager.save_game(world, "bench.dat")
+            loaded = PersistenceManager.load_game("bench.dat")
+            elapsed = time.perf_counter() - start
+        finally:
+            persistence.SAVE_DIR = saved_dir
+    if loaded is None: raise RuntimeError("no se pudo cargar la partida guardada")
+    return elapsed, 1
+
+def case_events(world, people, seed):
+    """Un tick de lógica completo: interacciones, EventManager y EventRegistry."""
+    engine = SimulationEngine(world)
+    ticks = 5
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine._interactions_system(0.0, None)
+        engine._events_system(0.0, None)
+        engine._contextual_system(0.0, None)
+    return time.perf_counter() - start, ticks
+
+CASES = {"step": case_step, "path": case_path, "walkable": case_walkable,
+         "render": case_render, "save": case_save, "events": case_events}
+
+def measure(case: str, scenario: str, people: int, seed: int, repeat: int) -> float:
+    """Mejor tiempo por operacion de repeat intentos, cada uno sobre un mundo recien construido."""
+    best = float("inf")
+    for _ in range(repeat):
+        world = build_world(scenario, people, seed)
+        random.seed(seed)
+        elapsed, ops = CASES[case](world, people, seed)
+        best = min(best, elapsed / ops)
+    return best
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3: return f"{seconds * 1e6:9.2f} us"
+    if seconds < 1.0: return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds:9.2f} s "
+
+def compare(results, baseline, threshold: float) -> int:
+    regressions = 0
+    print(f"{'caso':<28}{'actual':>12} {'base':>12} {'cambio':>8}")
+    for key, value in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            print(f"{key:<28}{format_time(value)}   (nuevo)")
+            continue
+        change = value / base - 1.0 if base else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESION"
+            regressions += 1
+        elif change < -threshold: flag = "  mejora"
+        print(f"{key:<28}{format_time(value)} {format_time(base)} {change * 100:+7.1f}%{flag}")
+    print(f"{regressions} regresiones por encima de {threshold * 100:.0f}%")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Personas por mundo, separadas por comas")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Escribe los resultados como linea base (JSON)")
+    parser.add_argument("--compare", help="Linea base con la que comparar")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Empeoramiento tolerado (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    scenarios = args.scenarios.split(",")
+    cases = args.cases.split(",")
+    for name in scenarios:
+        if name not in SCENARIOS: parser.error(f"escenario desconocido: {name}")
+    for name in cases:
+        if name not in CASES: parser.error(f"caso desconocido: {name}")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+
+    results = {}
+    for case in cases:
+        for scenario in scenarios:
+            for people in sizes:
+                key = f"{case}/{scenario}/{people}"
+                results[key] = measure(case, scenario, people, args.seed, args.repeat)
+                if baseline is None: print(f"{key:<28}{format_time(results[key])}")
+
+    if args.save:
+        data = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                "machine": platform.machine(), "seed": args.seed, "unit": "s/op", "results": results}
+        with open(args.save, "w") as f: json.dump(data, f, indent=2)
+        print(f"Linea base guardada en {args.save}")
+    if baseline is not None:
+        return 1 if compare(results, baseline, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Pintor en el mismo hilo frente a pintor en su hilo, con un terminal lento simulado.
+
+Uso: python -m src.bench.threads [--people 300] [--seconds 6] [--delay 0.15] [--seed 2]
+Cada pintado espera --delay segundos (terminal lento). En linea, esa espera sale del frame del
+simulador; con hilos, el simulador publica fotos a su ritmo y el pintor se salta las que no
+alcanza. Mide frames/s del simulador, ticks de logica y fotos pintadas y saltadas.
+"""
+import argparse
+import sys
+import time
+
+from ..core.batch import WorldConfig, populate
+from ..core.engine import SimulationEngine
+from ..core.snapshot import SnapshotBuffer
+from ..core.state import WorldState
+from ..core.scenarios.nature import NatureScenario
+from ..interfaces.cli.curses_renderer import CursesRenderer
+from .suite import FakeWindow, fake_curses
+
+def new_engine(args) -> SimulationEngine:
+    world = WorldState(NatureScenario(seed=args.seed), seed=args.seed)
+    populate(world, WorldConfig(args.seed, people=args.people, wolves=max(1, args.people // 50)))
+    return SimulationEngine(world)
+
+def slow_renderer(delay: float):
+    renderer = CursesRenderer(FakeWindow(60, 200))
+    draw = renderer.render
+    def render(view):
+        draw(view)
+        time.sleep(delay) # curses.doupdate contra un terminal lento
+    return renderer, render
+
+def inline(args):
+    engine = new_engine(args)
+    renderer, render = slow_renderer(args.delay)
+    painted = [0]
+    def callback(world):
+        render(world)
+        painted[0] += 1
+        if time.perf_counter() > deadline: engine.stop()
+    engine.register_render_callback(callback)
+    deadline = time.perf_counter() + args.seconds
+    engine.run()
+    return engine, painted[0], 0
+
+def threaded(args):
+    engine = new_engine(args)
+    engine.snapshots = SnapshotBuffer()
+    renderer, render = slow_renderer(args.delay)
+    thread = engine.start()
+    deadline = time.perf_counter() + args.seconds
+    seq = painted = 0
+    while time.perf_counter() < deadline:
+        snapshot = engine.snapshots.latest(after=seq, timeout=engine.frame_time)
+        if snapshot is None: continue
+        render(snapshot)
+        seq = snapshot.seq
+        painted += 1
+    engine.stop()
+    thread.join()
+    return engine, painted, engine.snapshots.dropped
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--delay", type=float, default=0.15, help="Segundos que tarda cada pintado")
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    with fake_curses():
+        for name, mode in (("en linea", inline), ("con hilos", threaded)):
+            start = time.perf_counter()
+            engine, painted, dropped = mode(args)
+            wall = time.perf_counter() - start
+            print(f"{name:<10} simulador {engine.scheduler['physics'].runs / wall:5.1f} frames/s"
+                  f"  ticks {engine.world_state.tick_count:4d}  pintadas {painted:4d}  saltadas {dropped:4d}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
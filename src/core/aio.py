@@ -0,0 +1,123 @@
+"""Tareas para SimulationEngine.run_async: pintor, teclado, autoguardado y volcado de métricas.
+
+Todas corren en el hilo del bucle de asyncio, el mismo que el simulador, así que entre dos
+frames ven el mundo quieto y pueden tocarlo sin cerrojos. Lo que bloquea va a un executor:
+el pintado de una foto (inmutable), la lectura del teclado, la compresión y escritura de
+partidas y el JSON del perfil. Uso:
+
+    await engine.run_async(aio.render(engine, renderer.render, executor=terminal),
+                           aio.keyboard(engine, stdscr.getch, handle_key, executor=terminal),
+                           aio.autosave(engine, 300), aio.export_metrics(engine, 60))
+
+Curses no admite dos hilos a la vez: el pintor y el teclado comparten un executor de un hilo.
+"""
+import asyncio
+import os
+import pickle
+import signal
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+from .logger import logger
+from .persistence import PersistenceManager
+from .profiler import profiler
+from .snapshot import WorldSnapshot
+
+CAN_FORK = hasattr(os, "fork")
+# Guardar desde un proceso hijo (copia del mundo sin pausar), solo si se pide: con los hilos de
+# los executors vivos, el hijo puede heredar un cerrojo cogido y quedarse colgado
+FORK_SAVE = False
+FORK_TIMEOUT = 120.0 # Segundos de espera al hijo antes de matarlo
+
+async def save(world_state, filename: Optional[str] = None, fork: bool = FORK_SAVE) -> Optional[str]:
+    """Guarda la partida sin parar el bucle. Devuelve la ruta, o None si falla.
+
+    Por defecto el pickle se hace aquí (es lo que necesita el mundo quieto) y la compresión y
+    escritura, lo más lento, van al executor. Con fork (opcional, solo en un proceso sin otros
+    hilos que puedan tener cerrojos), el hijo hereda el mundo tal como está en este instante
+    (copia al escribir del sistema) y hace pickle, gzip y escritura mientras el padre sigue
+    simulando; se le espera sin ocupar un hilo y, si pasa de FORK_TIMEOUT, se le mata.
+    """
+    loop = asyncio.get_running_loop()
+    filepath = PersistenceManager.save_path(filename)
+    try:
+        if fork:
+            pid = os.fork()
+            if pid == 0: # Hijo: nada de logs ni del bucle, solo escribir y salir sin limpiezas
+                code = 1
+                try:
+                    PersistenceManager.write(filepath, world_state)
+                    code = 0
+                finally:
+                    os._exit(code)
+            status = await _wait_child(pid, FORK_TIMEOUT)
+            if status != 0: raise OSError(f"el proceso de guardado terminó con estado {status}")
+        else:
+            data = pickle.dumps(world_state)
+            await loop.run_in_executor(None, PersistenceManager.write, filepath, None, data)
+        return filepath
+    except Exception as e:
+        logger.log(f"SAVE ERROR: {str(e)}")
+        return None
+
+async def _wait_child(pid: int, timeout: float, interval: float = 0.02) -> int:
+    """Estado de salida del hijo, mirando sin bloquear; TimeoutError (y el hijo muerto) si no acaba."""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done: return status
+        if loop.time() > end:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            raise TimeoutError(f"el proceso de guardado no terminó en {timeout:.0f} s")
+        await asyncio.sleep(interval)
+
+async def autosave(engine, every: float = 300.0, filename: str = "autosave.dat", fork: bool = FORK_SAVE):
+    """Guarda cada every segundos de reloj (siempre en el mismo fichero)."""
+    while True:
+        await asyncio.sleep(every)
+        if await save(engine.world_state, filename, fork): logger.log("SYS: Autoguardado.")
+
+async def export_metrics(engine, every: float = 60.0, filename: str = "metrics.json"):
+    """Vuelca el perfil cada every segundos mientras el profiler esté activo.
+
+    El resumen se toma aquí (entre frames) y el JSON/CSV se escribe en el executor.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(every)
+        if profiler.enabled:
+            await loop.run_in_executor(None, profiler.dump, filename, profiler.snapshot())
+
+async def render(engine, draw: Callable[[WorldSnapshot], None], fps: Optional[float] = None,
+                 executor: Optional[Executor] = None):
+    """Pinta una foto del mundo a fps (por defecto el del motor).
+
+    Con executor, draw corre fuera del bucle y el simulador sigue mientras tanto; si el
+    terminal va lento se pinta menos a menudo, nunca se encolan fotos viejas.
+    """
+    loop = asyncio.get_running_loop()
+    frame_time = 1.0 / fps if fps else engine.frame_time
+    seq = 0
+    while True:
+        start = loop.time()
+        seq += 1
+        snapshot = WorldSnapshot.capture(engine.world_state, engine.camera, seq, engine.sim_fps)
+        if executor is None: draw(snapshot)
+        else: await loop.run_in_executor(executor, draw, snapshot)
+        await asyncio.sleep(max(0.0, frame_time - (loop.time() - start)))
+
+async def keyboard(engine, read: Callable[[], int], handle: Callable[[int], None], interval: float = 0.02,
+                   executor: Optional[Executor] = None):
+    """Lee teclas sin bloquear (read devuelve -1 si no hay) y las pasa a handle.
+
+    handle corre en el hilo del bucle: puede tocar el mundo directamente o usar engine.post.
+    """
+    loop = asyncio.get_running_loop()
+    while engine.is_running:
+        key = read() if executor is None else await loop.run_in_executor(executor, read)
+        while key != -1: # Todas las pendientes de golpe, como el bucle con hilos
+            handle(key)
+            key = read() if executor is None else await loop.run_in_executor(executor, read)
+        await asyncio.sleep(interval)
@@ -0,0 +1,136 @@
+"""Muchos mundos sin ventana a la vez, repartidos en un pool de procesos.
+
+Cada proceso recibe solo un WorldConfig (semilla, escenario, poblacion, horas) y devuelve un
+resumen pequeño, así que no se copian mundos entre procesos y el reparto escala con los nucleos.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+from typing import Dict, Iterable, Iterator, Optional
+
+from .entities.shop import Shop
+from .entities.town import Town
+from .replay import new_engine, state_hash
+
+CHUNK_FRAMES = 50 # Cada cuantos frames mira el trabajador si debe pararse
+
+class WorldConfig:
+    """Parametros de un mundo del lote. Lo que sale igual con la misma semilla sale igual siempre."""
+
+    def __init__(self, seed: int, scenario: str = "NatureScenario", people: int = 100, wolves: int = 2,
+                 shops: int = 1, towns: int = 1, hours: float = 6.0, pooled: bool = False,
+                 timeout: Optional[float] = None, label: Optional[str] = None):
+        self.seed = seed
+        self.scenario = scenario
+        self.people = people
+        self.wolves = wolves
+        self.shops = shops
+        self.towns = towns
+        self.hours = hours
+        self.pooled = pooled
+        self.timeout = timeout # Segundos de reloj para este mundo; al pasarse devuelve lo que lleve
+        self.label = label or f"{scenario}:{seed}:{people}"
+
+    def __repr__(self):
+        return f"<WorldConfig {self.label} {self.hours:g}h>"
+
+def populate(world, config: WorldConfig):
+    """Altas iniciales del mundo, todas del stream "setup" de su semilla."""
+    rng = world.rng.stream("setup")
+    side = max(10.0, config.people ** 0.5 * 3)
+    for i in range(config.people):
+        world.spawn_person(f"P{i}", rng.uniform(-side, side), rng.uniform(-side, side))
+    for i in range(config.wolves):
+        world.spawn_wolf(f"W{i}", rng.uniform(-side, side), rng.uniform(-side, side))
+    for _ in range(config.shops):
+        world.add_entity(Shop(rng.uniform(-side, side), rng.uniform(-side, side)))
+    for i in range(config.towns):
+        world.add_entity(Town(f"Casa{i}", int(rng.uniform(-side, side)), int(rng.uniform(-side, side)),
+                              owner_name=f"P{i}"))
+
+def summarize(world, config: WorldConfig, status: str, frames: int, elapsed: float, cpu: float) -> Dict:
+    people = list(world.people.values())
+    wealth = [p.wealth for p in people] or [0]
+    levels = [town.level for town in world.towns]
+    structures: Dict[str, int] = {}
+    for data in world.built_structures.values():
+        structures[data.get("type", "?")] = structures.get(data.get("type", "?"), 0) + 1
+    return {"label": config.label, "seed": config.seed, "scenario": config.scenario, "people": len(people),
+            "status": status, "frames": frames, "ticks": world.tick_count, "elapsed_s": elapsed, "cpu_s": cpu,
+            "town_levels": levels, "town_level_max": max(levels, default=0),
+            "wood_stock": sum(town.wood_stock for town in world.towns),
+            "wealth_mean": sum(wealth) / len(wealth), "wealth_min": min(wealth), "wealth_max": max(wealth),
+            "structures": structures, "roads": structures.get("ROAD", 0), "hash": state_hash(world)}
+
+# --- TRABAJADOR ---
+_cancel_event = None # Evento compartido del lote: si se activa, cada mundo para en su siguiente bloque
+
+def _init_worker(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+def run_world(config: WorldConfig) -> Dict:
+    """Simula un mundo completo (o hasta timeout/cancelacion) y devuelve su resumen."""
+    start, cpu_start = time.perf_counter(), time.process_time()
+    engine = new_engine(config.scenario, config.seed, 1.0 / 15, config.pooled)
+    world = engine.world_state
+    populate(world, config)
+    frames = round(config.hours * 10 / engine.fixed_dt) # 0.1h de juego por segundo simulado
+    deadline = start + config.timeout if config.timeout else None
+    done, status = 0, "ok"
+    while done < frames:
+        if _cancel_event is not None and _cancel_event.is_set():
+            status = "cancelled"; break
+        if deadline is not None and time.perf_counter() > deadline:
+            status = "timeout"; break
+        chunk = min(CHUNK_FRAMES, frames - done)
+        engine.step(chunk)
+        done += chunk
+    return summarize(world, config, status, done, time.perf_counter() - start, time.process_time() - cpu_start)
+
+class BatchRunner:
+    """Lanza WorldConfigs en un ProcessPoolExecutor y devuelve los resumenes según terminan."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._cancel = multiprocessing.Event()
+        self._futures = []
+
+    def run(self, configs: Iterable[WorldConfig], timeout: Optional[float] = None) -> Iterator[Dict]:
+        """Genera un resumen por mundo en orden de llegada.
+
+        timeout es para el lote entero: al pasarse se cancela lo que quede y los mundos en
+        marcha devuelven su estado parcial. Cerrar el generador antes de tiempo tambien cancela.
+        """
+        self._cancel.clear()
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self._cancel,)) as pool:
+            futures = {pool.submit(run_world, config): config for config in configs}
+            self._futures = list(futures)
+            pending = set(futures)
+            try:
+                try:
+                    for future in as_completed(futures, timeout=timeout):
+                        pending.discard(future)
+                        yield self._result(future, futures[future])
+                except TimeoutError:
+                    self.cancel()
+                    for future in list(pending):
+                        pending.discard(future)
+                        yield self._result(future, futures[future])
+            finally:
+                if pending: self.cancel() # El consumidor dejo de leer: que los trabajadores paren ya
+
+    def _result(self, future, config: WorldConfig) -> Dict:
+        if future.cancelled():
+            return {"label": config.label, "seed": config.seed, "scenario": config.scenario, "status": "cancelled"}
+        try:
+            return future.result()
+        except Exception as e:
+            return {"label": config.label, "seed": config.seed, "scenario": config.scenario,
+                    "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    def cancel(self):
+        """Para el lote: los mundos sin empezar no arrancan y los que corren paran en su siguiente bloque."""
+        self._cancel.set()
+        for future in self._futures: future.cancel()
@@ -0,0 +1,50 @@
+from typing import Dict, Optional, Tuple
+from .terrain_cache import CHUNK_BITS, CHUNK_SIZE
+
+Chunk = Dict[Tuple[int, int], str]
+
+class DecorationLayer:
+    """Decoraciones (arboles, flores, puertas...) generadas por chunks la primera vez que se consultan.
+
+    Cada chunk sale del RNG de su escenario y sus coordenadas, asi que el mundo es el mismo
+    para la misma semilla sin importar por donde se explore, y no tiene borde.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.chunks: Dict[Tuple, Dict[Tuple[int, int], Chunk]] = {} # cache_key -> (cx, cy) -> decoraciones
+
+    def get_chunk(self, cx: int, cy: int) -> Chunk:
+        terrain = self.world.terrain
+        per_scenario = self.chunks.get(terrain.scenario.cache_key())
+        if per_scenario is None:
+            per_scenario = self.chunks[terrain.scenario.cache_key()] = {}
+        decorations = per_scenario.get((cx, cy))
+        if decorations is None:
+            codes = terrain.get_chunk(cx, cy).codes
+            decorations = per_scenario[(cx, cy)] = terrain.scenario.generate_chunk_decorations(cx, cy, CHUNK_SIZE, codes)
+        return decorations
+
+    def get(self, x: float, y: float) -> Optional[str]:
+        bx, by = int(x), int(y)
+        return self.get_chunk(bx >> CHUNK_BITS, by >> CHUNK_BITS).get((bx, by))
+
+    def __getitem__(self, pos: Tuple[int, int]) -> str:
+        char = self.get(*pos)
+        if char is None: raise KeyError(pos)
+        return char
+
+    def __contains__(self, pos: Tuple[int, int]) -> bool:
+        return self.get(*pos) is not None
+
+    def in_rect(self, x0: int, y0: int, width: int, height: int) -> Chunk:
+        """Decoraciones dentro del rectangulo [x0, x0+width) x [y0, y0+height)."""
+        found = {}
+        for cy in range(y0 >> CHUNK_BITS, ((y0 + height - 1) >> CHUNK_BITS) + 1):
+            for cx in range(x0 >> CHUNK_BITS, ((x0 + width - 1) >> CHUNK_BITS) + 1):
+                for (x, y), char in self.get_chunk(cx, cy).items():
+                    if x0 <= x < x0 + width and y0 <= y < y0 + height: found[(x, y)] = char
+        return found
+
+    def loaded_chunks(self) -> int:
+        return sum(len(chunks) for chunks in self.chunks.values())
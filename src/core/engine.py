@@ -1,16 +1,29 @@
 import time
 import math
+import asyncio
+import queue
+import threading
 from typing import Callable, List, Optional
 from .state import WorldState
 from .event_manager import EventManager
 from .entities.person import Person
+from .entities.components import PersonState
 from .entities.wolf import Wolf
 from .entities.town import Town
 from .entities.shop import Shop
 from .logger import logger
+from .scheduler import Scheduler
+from .profiler import profiler
+from .lod import LevelOfDetail, FULL, REDUCED, AGGREGATE, AGGREGATE_EVENT_EVERY
+from .sleep import Sleepers
+from .snapshot import SnapshotBuffer, WorldSnapshot
 
 from .event_registry import EventRegistry
 
+def _log_task_error(task: "asyncio.Future"):
+    if not task.cancelled() and task.exception() is not None:
+        logger.log(f"TASK ERROR: {str(task.exception())}")
+
 class SimulationEngine:
     def __init__(self, world_state: WorldState, fps: int = 15):
         self.world_state = world_state
@@ -20,13 +33,72 @@ class SimulationEngine:
         self.render_callbacks: List[Callable[[WorldState], None]] = []
         self.event_manager = EventManager(world_state)
         self.event_registry = EventRegistry() # NUEVO: Registro de eventos masivos
+        logger.storyteller.rng = world_state.rng.stream("storyteller") # Narracion reproducible con la semilla
         
-        self.last_logic_tick = 0
         self.logic_interval = 0.5 # TURBO: Decisiones cada medio segundo
+        self._context_queue = None # Personas que aun no han pasado por el EventRegistry en esta ronda
+        self._physics_pass = None # Pasada de física a medias (se retoma en el frame siguiente)
+        self._interactions_pass = None # Pasada de interacciones a medias
+        self.max_physics_dt = 0.5 # Una pasada que se alarga varios frames no simula más de esto
+        self._context_round = 0
+        self.lod: Optional[LevelOfDetail] = None # Con foco: menos detalle lejos de la camara (ver lod.py)
+        self.sleepers: Optional[Sleepers] = None # Entidades quietas que el motor se salta (ver sleep.py)
+        self.ghosts = None # Motor por regiones: ids de copias de otras regiones (se ven, no se simulan)
+
+        # Fases del bucle: cada una con su ritmo, prioridad y presupuesto por frame
+        self.scheduler = Scheduler(frame_budget=self.frame_time * 0.6)
+        logic_rate = 1.0 / self.logic_interval
+        self.scheduler.add("physics", self._physics_system, priority=0, budget=self.frame_time * 0.5)
+        self.scheduler.add("interactions", self._interactions_system, rate=logic_rate, priority=10,
+                           budget=0.010, deferrable=True)
+        self.scheduler.add("events", self._events_system, rate=logic_rate, priority=20,
+                           budget=0.002, deferrable=True)
+        self.scheduler.add("contextual", self._contextual_system, rate=logic_rate, priority=30,
+                           budget=0.005, deferrable=True)
+        self.scheduler.add("render", self._render_system, priority=100, budget=self.frame_time * 0.3)
+
+        # Modo sin ventana (step/run_until): reloj simulado con dt fijo, sin esperas ni render
+        self.fixed_dt = self.frame_time
+        self.sim_time = 0.0
+
+        # Pintor en otro hilo: fotos hacia fuera, comandos hacia dentro
+        self.snapshots: Optional[SnapshotBuffer] = None # Si está, la fase de render publica una foto
+        self.camera = None # Foco de las fotos (renderer.camera_focus)
+        self.commands = queue.SimpleQueue() # fn(world_state), se aplican al principio de cada frame
+        self.sim_fps = 0.0
+        self._snapshot_seq = 0
 
     def register_render_callback(self, callback: Callable[[WorldState], None]):
         self.render_callbacks.append(callback)
 
+    def enable_sleep(self) -> Sleepers:
+        """Activa el dormir de entidades quietas (cambia el resultado: la espera se aplica de golpe)."""
+        if self.sleepers is None: self.sleepers = Sleepers(self.frame_time)
+        return self.sleepers
+
+    def _wake(self, entity):
+        """Algo va a tocar a la entidad: si dormia, se pone al dia antes."""
+        if self.sleepers is not None: self.sleepers.wake(entity, self.sim_time)
+
+    def post(self, command: Callable[[WorldState], None]):
+        """Encola un cambio desde otro hilo (teclado, pintor); lo aplica el simulador entre frames."""
+        self.commands.put(command)
+
+    def _apply_commands(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                command(self.world_state)
+            except Exception as e:
+                logger.log(f"COMMAND ERROR: {str(e)}")
+
+    def _publish_snapshot(self):
+        self._snapshot_seq += 1
+        self.snapshots.publish(WorldSnapshot.capture(self.world_state, self.camera, self._snapshot_seq, self.sim_fps))
+
     def _notify_renderers(self):
         for callback in self.render_callbacks:
             try:
@@ -36,53 +108,295 @@ class SimulationEngine:
 
     def _handle_world_interactions(self):
         """Gestiona interacciones entre entidades (Peligros, Social, Town)."""
-        entities = self.world_state.get_all_entities()
-        people = [e for e in entities if isinstance(e, Person)]
-        wolves = [e for e in entities if isinstance(e, Wolf)]
-        towns = self.world_state.towns
-        shops = [e for e in entities if isinstance(e, Shop)]
-
-        # 1. PERSONAS vs LOBOS (Pánico)
-        for p in people:
-            # Proteccion: si está en un camino con vallas cercanas, el lobo no le ve
-            is_protected = False
-            px, py = int(p.x), int(p.y)
-            if (px, py) in self.world_state.built_structures:
-                # Comprobamos si hay vallas adyacentes (perímetro de seguridad)
-                for dx, dy in [(0,1), (0,-1), (1,0), (-1,0)]:
-                    if self.world_state.built_structures.get((px+dx, py+dy), {}).get("type") == "FENCE":
-                        is_protected = True; break
-            
-            if not is_protected:
-                for w in wolves:
-                    dist = math.sqrt((p.x - w.x)**2 + (p.y - w.y)**2)
-                    if dist < 5.0:
+        for _ in self._world_interactions(): pass
+
+    def _world_interactions(self):
+        """_handle_world_interactions por pasos: cede tras cada lobo, persona, tienda y Town.
+
+        Como _entity_updates, recorre copias de los registros y se salta a quien se elimina mientras
+        la pasada espera; un fallo en una entidad se registra y la pasada sigue con la siguiente.
+        """
+        ws = self.world_state
+        people, wolves = list(ws.people.values()), list(ws.wolves.values())
+        towns, shops = list(ws.towns), list(ws.shops.values())
+        spatial = ws.spatial
+        ghosts = self.ghosts # Cada efecto lo aplica la region dueña de la entidad afectada
+
+        # 1. PERSONAS vs LOBOS (Pánico): cada lobo solo mira a la gente de su zona
+        protected = {}
+        for w in wolves:
+            if ws.entities.get(w.id) is not w: continue # Eliminado mientras esperaba
+            try:
+                for p in spatial.query_radius(w.x, w.y, 5.0, Person):
+                    if ghosts and p.id in ghosts: continue
+                    if p.id not in protected: protected[p.id] = self._is_protected(p)
+                    if not protected[p.id]:
+                        self._wake(p)
                         p.react_to_danger(w.x, w.y)
+            except Exception as e:
+                logger.log(f"LOGIC ERROR ({w.name}): {str(e)}")
+            yield
 
-        # 2. PERSONAS vs PERSONAS (Social)
-        for i, p1 in enumerate(people):
-            for p2 in people[i+1:]:
-                dist = math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
-                if dist < 1.8:
-                    p1.social_interaction(p2)
-                    p2.social_interaction(p1)
+        # 2. PERSONAS vs PERSONAS (Social): cada pareja una vez, en el orden de siempre
+        for p1 in people:
+            if ws.entities.get(p1.id) is not p1: continue
+            try:
+                order = spatial.order[p1.id]
+                own1 = not ghosts or p1.id not in ghosts
+                for p2 in spatial.query_radius(p1.x, p1.y, 1.8, Person):
+                    if spatial.order[p2.id] > order:
+                        if own1: p1.social_interaction(p2)
+                        if not ghosts or p2.id not in ghosts: p2.social_interaction(p1)
+            except Exception as e:
+                logger.log(f"LOGIC ERROR ({p1.name}): {str(e)}")
+            yield
 
         # 3. PERSONAS vs SHOP (Compras)
-        for p in people:
-            for s in shops:
-                dist = math.sqrt((p.x - s.x)**2 + (p.y - s.y)**2)
-                if dist < 2.0:
+        for s in shops:
+            if ws.entities.get(s.id) is not s: continue
+            try:
+                for p in spatial.query_radius(s.x, s.y, 2.0, Person):
+                    if ghosts and p.id in ghosts: continue
+                    self._wake(p)
                     s.interact(p)
+            except Exception as e:
+                logger.log(f"LOGIC ERROR ({s.name}): {str(e)}")
+            yield
 
         # 4. PERSONAS vs TOWN (Entrega de recursos)
-        for p in people:
-            for t in towns:
-                dist = math.sqrt((p.x - t.x)**2 + (p.y - t.y)**2)
-                if dist < 1.0 and p.inventory["wood"] > 0:
-                    logger.log(f"BUILD: {p.name} entrego {p.inventory['wood']} de recursos a {t.name}.")
-                    t.add_wood(p.inventory["wood"])
-                    p.inventory["wood"] = 0
-                    p.state = "RESTING" 
+        for t in towns:
+            if ws.entities.get(t.id) is not t: continue
+            try:
+                for p in spatial.query_radius(t.x, t.y, 1.0, Person):
+                    if ghosts and p.id in ghosts: continue
+                    if p.inventory["wood"] > 0:
+                        self._wake(p)
+                        logger.log(f"BUILD: {p.name} entrego {p.inventory['wood']} de recursos a {t.name}.")
+                        t.add_wood(p.inventory["wood"])
+                        p.inventory["wood"] = 0
+                        p.state = PersonState.RESTING 
+            except Exception as e:
+                logger.log(f"LOGIC ERROR ({t.name}): {str(e)}")
+            yield
+
+    def _is_protected(self, p: Person) -> bool:
+        """Si está en un camino con vallas cercanas, el lobo no le ve."""
+        built = self.world_state.built_structures
+        px, py = int(p.x), int(p.y)
+        if (px, py) in built:
+            # Comprobamos si hay vallas adyacentes (perímetro de seguridad)
+            for dx, dy in [(0,1), (0,-1), (1,0), (-1,0)]:
+                if built.get((px+dx, py+dy), {}).get("type") == "FENCE":
+                    return True
+        return False
+
+    def _update_entities(self, dt: float, is_night: bool, scenario):
+        """Física de cada entidad, recorriendo los registros por tipo del mundo."""
+        for _ in self._entity_updates(dt, is_night, scenario): pass
+
+    def _entity_updates(self, dt: float, is_night: bool, scenario):
+        """_update_entities por pasos: cede tras cada entidad.
+
+        Recorre una copia de los registros: si la pasada se parte entre frames, quien se elimina
+        mientras espera se salta y quien aparece entra en la pasada siguiente.
+        """
+        ws = self.world_state
+        timed, clock = profiler.enabled, time.perf_counter # Coste por tipo de entidad, solo con el profiler activo
+        people = ws.people.values()
+        ghosts = self.ghosts
+        lod = self.lod if self.lod is not None and self.lod.focus is not None else None
+        if lod is not None: lod.begin_frame(ws)
+        sleepers, now = self.sleepers, self.sim_time
+        if sleepers is not None: sleepers.wake_due(now, dt, ws)
+        asleep = sleepers.asleep if sleepers is not None else ()
+        if ws.population is not None and len(ws.population):
+            if timed: start = clock()
+            try:
+                ws.population.step(dt, ws) # Personas en columnas: todas de una vez
+            except Exception as e:
+                logger.log(f"POPULATION ERROR: {str(e)}")
+                if timed: profiler.count("errors.population")
+            if timed: profiler.record("update.Population", clock() - start)
+            if len(ws.population) >= len(ws.people): people = () # No queda ninguna Person suelta
+        for entity in list(people):
+            if ws.entities.get(entity.id) is not entity: continue # Eliminada mientras esperaba
+            if entity.pooled or (ghosts and entity.id in ghosts) or entity.id in asleep: continue
+            step_dt, tier = (dt, FULL) if lod is None else lod.advance(entity, dt)
+            if step_dt is None: continue # Nivel reducido: acumula hasta su turno
+            if timed: start = clock()
+            try:
+                if tier == AGGREGATE:
+                    entity.update_aggregate(step_dt, ws)
+                else:
+                    biome = ws.get_biome_at(entity.x, entity.y)
+                    entity.update(step_dt, biome, scenario, ws, coarse=tier == REDUCED) # Pasamos world_state
+            except Exception as e:
+                logger.log(f"ENTITY ERROR ({entity.name}): {str(e)}")
+                if timed: profiler.count("errors.entity")
+            if timed: profiler.record("update.Person", clock() - start)
+            ws.spatial.move(entity)
+            if sleepers is not None: sleepers.consider(entity, now)
+            yield
+        for entity in list(ws.wolves.values()):
+            if ws.entities.get(entity.id) is not entity: continue
+            if (ghosts and entity.id in ghosts) or entity.id in asleep: continue
+            step_dt = dt if lod is None else lod.advance(entity, dt)[0]
+            if step_dt is None: continue
+            if timed: start = clock()
+            try:
+                entity.update(step_dt, is_night, ws)
+            except Exception as e:
+                logger.log(f"ENTITY ERROR ({entity.name}): {str(e)}")
+                if timed: profiler.count("errors.entity")
+            if timed: profiler.record("update.Wolf", clock() - start)
+            ws.spatial.move(entity)
+            if sleepers is not None: sleepers.consider(entity, now)
+            yield
+        for entity in list(ws.others.values()):
+            if ws.entities.get(entity.id) is not entity: continue
+            if timed: start = clock()
+            try:
+                entity.update(dt)
+            except Exception as e:
+                logger.log(f"ENTITY ERROR ({entity.name}): {str(e)}")
+                if timed: profiler.count("errors.entity")
+            if timed: profiler.record(f"update.{type(entity).__name__}", clock() - start)
+            ws.spatial.move(entity)
+            yield
+
+    def _physics_step(self, dt: float):
+        for _ in self._physics_steps(dt): pass
+
+    def _physics_steps(self, dt: float):
+        # 1. Movimiento (Física) y Tiempo Global
+        self.world_state.update_time(dt) 
+        is_night = self.world_state.is_night()
+        scenario = self.world_state.scenario # Obtenemos el escenario
+        
+        yield from self._entity_updates(dt, is_night, scenario)
+
+    def _resume(self, name: str, start, deadline) -> bool:
+        """Avanza la pasada guardada en self.<name> (o una nueva, start()) hasta acabar o pasar deadline.
+
+        True si queda a medias: se guarda y el frame siguiente sigue donde se quedo.
+        """
+        work = getattr(self, name)
+        if work is None: work = start()
+        setattr(self, name, None) # Si algo falla, la pasada se tira y la siguiente empieza de cero
+        for n, _ in enumerate(work, 1):
+            if deadline is not None and not n & 3 and time.perf_counter() > deadline:
+                setattr(self, name, work)
+                return True
+        return False
+
+    # --- SISTEMAS DEL SCHEDULER: fn(elapsed, deadline) -> True si queda trabajo ---
+    def _physics_system(self, elapsed: float, deadline) -> bool:
+        """Física troceable: con presupuesto, las entidades que no caben siguen en el frame siguiente.
+
+        Cada pasada simula el tiempo acumulado hasta que empieza (como mucho max_physics_dt);
+        mientras sigue a medias, el tiempo de los frames se acumula para la pasada siguiente.
+        """
+        dt = min(elapsed, self.max_physics_dt)
+        return self._resume("_physics_pass", lambda: self._physics_steps(dt), deadline)
+
+    def _interactions_system(self, elapsed: float, deadline) -> bool:
+        # 2. Lógica: cada pasada de interacciones es un tick (troceable como la física)
+        try:
+            if self._resume("_interactions_pass", self._world_interactions, deadline): return True
+        except Exception as e:
+            logger.log(f"LOGIC ERROR: {str(e)}")
+        self.world_state.tick_count += 1 # Como antes: el tick cuenta aunque la pasada falle
+        return False
+
+    def _events_system(self, elapsed: float, deadline):
+        self.event_manager.update(touch=self._wake)
+
+    def _contextual_system(self, elapsed: float, deadline) -> bool:
+        """Eventos contextuales por persona. Troceable: si se acaba el presupuesto sigue en el frame siguiente."""
+        ws = self.world_state
+        if self._context_queue is None:
+            self._context_queue = iter(list(ws.people.values()))
+            self._context_round += 1
+        lod = self.lod if self.lod is not None and self.lod.focus is not None else None
+        for n, p in enumerate(self._context_queue, 1):
+            if ws.people.get(p.id) is not p: continue # Eliminada mientras esperaba
+            if self.ghosts and p.id in self.ghosts: continue
+            scale = 1.0
+            if lod is not None and lod.tier(p) == AGGREGATE: # Lejos: menos tiradas, más probables
+                if (self._context_round + p.id) % AGGREGATE_EVENT_EVERY: continue
+                scale = AGGREGATE_EVENT_EVERY
+            events = self.event_registry.get_random_event(p, ws, scale) # Pasamos world_state
+            if events: self._wake(p)
+            for ev in events:
+                self.event_registry.apply_event(p, ev)
+            if deadline is not None and not n & 63 and time.perf_counter() > deadline:
+                return True
+        self._context_queue = None
+        return False
+
+    def _render_system(self, elapsed: float, deadline):
+        # 3. Render (con pintor en otro hilo, solo se publica la foto)
+        if self.snapshots is not None: self._publish_snapshot()
+        self._notify_renderers()
+
+    # --- MODO SIN VENTANA (tiempo simulado) ---
+    def step(self, frames: int = 1, dt: Optional[float] = None) -> int:
+        """Avanza frames de dt simulado (fixed_dt por defecto) sin dormir ni renderizar.
+
+        La lógica corre cada logic_interval de tiempo simulado, sin presupuestos (resultado
+        reproducible). Devuelve cuántos ticks de lógica se han ejecutado.
+        """
+        dt = self.fixed_dt if dt is None else dt
+        ws = self.world_state
+        start_ticks = ws.tick_count
+        for _ in range(frames):
+            self._apply_commands()
+            self.sim_time += dt
+            self.scheduler.tick(dt, budgeted=False, exclude=("render",))
+        return ws.tick_count - start_ticks
+
+    def run_until(self, tick: Optional[int] = None, hour: Optional[float] = None,
+                  max_frames: int = 10_000_000) -> int:
+        """Avanza hasta que world.tick_count llegue a tick o el reloj del mundo pase por hour.
+
+        Devuelve los frames simulados (se para también al llegar a max_frames).
+        """
+        if tick is None and hour is None: raise ValueError("run_until necesita tick u hour")
+        ws = self.world_state
+        for frame in range(max_frames):
+            if tick is not None and ws.tick_count >= tick: return frame
+            before = ws.time_of_day
+            self.step()
+            after = ws.time_of_day
+            # El reloj da la vuelta a las 24h: la hora se cruza antes o despues del salto
+            if hour is not None and (before < hour <= after or (after < before and (hour > before or hour <= after))):
+                return frame + 1
+        return max_frames
+
+    def start(self) -> threading.Thread:
+        """run() en un hilo aparte; el pintor lee self.snapshots desde el suyo."""
+        self.is_running = True
+        thread = threading.Thread(target=self.run, name="simulacion", daemon=True)
+        thread.start()
+        return thread
+
+    def _frame(self, dt: float):
+        """Un frame en tiempo real: dt medido desde el anterior."""
+        if dt > 0: self.sim_fps = 0.9 * self.sim_fps + 0.1 / dt # Media movil de frames/s
+
+        # Limitar dt para evitar saltos locos tras bloqueos
+        dt = min(dt, 0.1)
+
+        self._apply_commands()
+        self.sim_time += dt
+        self.scheduler.tick(dt) # Física, lógica (cada logic_interval) y render
+
+    def _crash(self):
+        # Guardar el error antes de salir
+        with open("crash_log.txt", "w") as f:
+            import traceback
+            f.write(traceback.format_exc())
+        self.stop()
 
     def run(self):
         self.is_running = True
@@ -91,51 +405,9 @@ class SimulationEngine:
         try:
             while self.is_running:
                 loop_start = time.time()
-                dt = loop_start - start_time
+                self._frame(loop_start - start_time)
                 start_time = loop_start
 
-                # Limitar dt para evitar saltos locos tras bloqueos
-                dt = min(dt, 0.1)
-
-                # 1. Movimiento (Física) y Tiempo Global
-                self.world_state.update_time(dt) 
-                is_night = self.world_state.is_night()
-                scenario = self.world_state.scenario # Obtenemos el escenario
-                
-                entities = self.world_state.get_all_entities()
-                for entity in entities:
-                    try:
-                        if isinstance(entity, Person):
-                            biome = self.world_state.get_biome_at(entity.x, entity.y)
-                            entity.update(dt, biome, scenario, self.world_state) # Pasamos world_state
-                        elif isinstance(entity, Wolf):
-                            entity.update(dt, is_night, self.world_state)
-                        else:
-                            entity.update(dt)
-                    except Exception as e:
-                        logger.log(f"ENTITY ERROR ({entity.name}): {str(e)}")
-
-                # 2. Lógica y Eventos
-                if loop_start - self.last_logic_tick > self.logic_interval:
-                    try:
-                        self._handle_world_interactions()
-                        self.event_manager.update()
-                        
-                        # NUEVO: Disparar eventos contextuales
-                        people = [e for e in entities if isinstance(e, Person)]
-                        for p in people:
-                            events = self.event_registry.get_random_event(p, self.world_state) # Pasamos self.world_state
-                            for ev in events:
-                                self.event_registry.apply_event(p, ev)
-                    except Exception as e:
-                        logger.log(f"LOGIC ERROR: {str(e)}")
-
-                    self.world_state.tick_count += 1
-                    self.last_logic_tick = loop_start
-
-                # 3. Render
-                self._notify_renderers()
-                
                 # Sleep dinámico pero seguro
                 elapsed = time.time() - loop_start
                 sleep_time = max(0.005, self.frame_time - elapsed)
@@ -144,11 +416,38 @@ class SimulationEngine:
         except KeyboardInterrupt:
             self.stop()
         except Exception as e:
-            # Guardar el error antes de salir
-            with open("crash_log.txt", "w") as f:
-                import traceback
-                f.write(traceback.format_exc())
+            self._crash()
+
+    async def run_async(self, *tasks):
+        """run() como corutina: entre frame y frame el bucle de asyncio atiende a tasks.
+
+        tasks son corutinas que cooperan con el simulador en el mismo hilo (ver aio.py: pintor,
+        teclado, autoguardado, volcado de métricas); lo que bloquea lo mandan a un executor.
+        Se cancelan al parar el motor; si una falla se anota en el log y el resto sigue.
+        """
+        self.is_running = True
+        running = [asyncio.ensure_future(task) for task in tasks]
+        for task in running: task.add_done_callback(_log_task_error)
+        start_time = time.time()
+
+        try:
+            while self.is_running:
+                loop_start = time.time()
+                self._frame(loop_start - start_time)
+                start_time = loop_start
+
+                # Ceder siempre algo de tiempo: sin esperar, las tareas no avanzarian
+                elapsed = time.time() - loop_start
+                await asyncio.sleep(max(0.001, self.frame_time - elapsed))
+
+        except KeyboardInterrupt:
             self.stop()
+        except Exception as e:
+            self._crash()
+        finally:
+            self.stop() # También si cancelan esta corutina
+            for task in running: task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
 
     def stop(self):
         self.is_running = False
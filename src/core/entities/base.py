@@ -1,12 +1,57 @@
-import uuid
+import random
 
 class Entity:
     """Clase base para todos los objetos del simulador."""
-    def __init__(self, name: str, x: int = 0, y: int = 0):
-        self.id = uuid.uuid4()
+    __slots__ = ("id", "name", "x", "y", "rng")
+    _last_id = 0 # Los ids son enteros crecientes (más baratos de guardar y hashear que un uuid4)
+
+    def __init__(self, name: str, x: int = 0, y: int = 0, rng=None):
+        self.id = Entity.new_id()
         self.name = name
         self.x = x
         self.y = y
+        self.rng = rng # Stream propio (WorldRng.spawn); lo asigna el mundo al añadirla si falta
+
+    @property
+    def rand(self):
+        """Generador de la entidad: su stream, o el random global si aun no está en ningun mundo."""
+        return self.rng if self.rng is not None else random
+
+    @staticmethod
+    def new_id() -> int:
+        Entity._last_id += 1
+        return Entity._last_id
+
+    @staticmethod
+    def reserve_id(entity_id: int):
+        """Evita repetir ids de entidades cargadas de una partida."""
+        if entity_id > Entity._last_id: Entity._last_id = entity_id
+
+    @classmethod
+    def _fields(cls):
+        fields = cls.__dict__.get("_field_cache")
+        if fields is None:
+            fields = tuple(name for klass in reversed(cls.__mro__)
+                           for name in klass.__dict__.get("__slots__", ()) if not name.startswith("__"))
+            cls._field_cache = fields
+        return fields
+
+    # --- PERSISTENCIA (con __slots__ no hay __dict__ que guardar) ---
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self._fields() if hasattr(self, name)}
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple): # (dict, slots) de otros protocolos
+            state = {**(state[0] or {}), **(state[1] or {})}
+        for name, value in state.items():
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                pass # Campo de una version anterior que ya no existe
+        if not hasattr(self, "rng"): self.rng = None # Partidas sin streams: el mundo le da uno al cargar
+        # Partidas antiguas: uuid4 -> id entero nuevo
+        if isinstance(getattr(self, "id", None), int): Entity.reserve_id(self.id)
+        else: self.id = Entity.new_id()
 
     def update(self, delta_time: float):
         """Método para actualizar el estado de la entidad cada tick."""
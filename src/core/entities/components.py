@@ -0,0 +1,90 @@
+from array import array
+from enum import Enum
+from typing import Iterable, Tuple
+
+class PersonState(str, Enum):
+    """Estados de Person. Son str: comparan igual que las cadenas de siempre ("IDLE"...)."""
+    IDLE = "IDLE"
+    SEARCHING = "SEARCHING"
+    GATHERING = "GATHERING"
+    GOING_HOME = "GOING_HOME"
+    RESTING = "RESTING"
+    PANICKING = "PANICKING"
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+    @classmethod
+    def coerce(cls, value):
+        """Cadena de una partida antigua -> miembro del enum (o la cadena tal cual si no existe)."""
+        try:
+            return cls(value)
+        except ValueError:
+            return value
+
+ITEMS = ("wood", "food", "medkit")
+_ITEM_INDEX = {item: i for i, item in enumerate(ITEMS)}
+
+class Inventory(array):
+    """Inventario en un array de doubles, indexable por nombre como el dict de antes."""
+    __slots__ = ()
+
+    def __new__(cls, values=None):
+        inventory = super().__new__(cls, "d", bytes(8 * len(ITEMS)))
+        for item, amount in (values or {}).items():
+            if item in _ITEM_INDEX: inventory[item] = amount
+        return inventory
+
+    def __getitem__(self, key):
+        return super().__getitem__(_ITEM_INDEX[key] if isinstance(key, str) else key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(_ITEM_INDEX[key] if isinstance(key, str) else key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in _ITEM_INDEX
+
+    def get(self, key: str, default=None):
+        return self[key] if key in _ITEM_INDEX else default
+
+    def keys(self):
+        return ITEMS
+
+    def items(self):
+        return list(zip(ITEMS, self.tolist()))
+
+class Path:
+    """Ruta como array de enteros (x0, y0, x1, y1...) con cursor: pop(0) solo avanza."""
+    __slots__ = ("nodes", "cursor")
+
+    def __init__(self, nodes: Iterable[Tuple[int, int]] = ()):
+        self.nodes = array("i")
+        for x, y in nodes: self.nodes.extend((x, y))
+        self.cursor = 0
+
+    def __len__(self) -> int:
+        return (len(self.nodes) >> 1) - self.cursor
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return list(self)[index]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("path index out of range")
+        i = (self.cursor + index) << 1
+        return self.nodes[i], self.nodes[i + 1]
+
+    def __iter__(self):
+        nodes = self.nodes
+        for i in range(self.cursor << 1, len(nodes), 2):
+            yield nodes[i], nodes[i + 1]
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def pop(self, index: int = 0) -> Tuple[int, int]:
+        if index != 0: raise IndexError("Path solo avanza por el principio")
+        node = self[0]
+        self.cursor += 1
+        return node
+
+    def __repr__(self):
+        return f"Path({list(self)!r})"
@@ -1,26 +1,33 @@
-import random
 import math
 from .base import Entity
+from .components import PersonState, Inventory, Path
 from ..logger import logger
 from .town import Town
 from .shop import Shop
 from ..pathfinding import Pathfinder
 
 class Person(Entity):
-    def __init__(self, name: str, x: float = 0.0, y: float = 0.0, goal: str = "BUILDER", traits: list = None):
-        super().__init__(name, x, y)
+    __slots__ = ("energy", "wealth", "stress", "goal", "traits", "state", "inventory", "base_speed", "speed",
+                 "target_x", "target_y", "path", "pathfinder", "action_timer", "social_cooldown",
+                 "path_retry_timer", "current_biome", "home_reference", "last_road_pos", "is_constructing",
+                 "disease")
+    pooled = False # True en PooledPerson: la mueve Population.step, no el bucle del motor
+
+    def __init__(self, name: str, x: float = 0.0, y: float = 0.0, goal: str = "BUILDER", traits: list = None,
+                 rng=None):
+        super().__init__(name, x, y, rng)
         self.energy = 100
-        self.wealth = random.randint(20, 50)
+        self.wealth = self.rand.randint(20, 50)
         self.stress = 0
         self.name = name
         self.goal = goal
-        self.traits = traits if traits else []
-        self.state = "IDLE" 
-        self.inventory = {"wood": 0, "food": 0, "medkit": 0}
+        self.traits = tuple(traits) if traits else ()
+        self.state = PersonState.IDLE 
+        self.inventory = Inventory()
         self.base_speed = 8.0 # Velocidad controlada
         self.speed = self.base_speed
         self.target_x, self.target_y = x, y
-        self.path = []
+        self.path = Path()
         self.pathfinder = None
         self.action_timer = 0.0
         self.social_cooldown = 0.0
@@ -29,36 +36,43 @@ class Person(Entity):
         self.home_reference = None
         self.last_road_pos = (None, None)
         self.is_constructing = False 
+        self.disease = None
+
+    def __setstate__(self, state):
+        # Partidas antiguas: dict de inventario, lista de ruta y estados en cadena
+        if isinstance(state, dict):
+            state = dict(state)
+            if isinstance(state.get("inventory"), dict): state["inventory"] = Inventory(state["inventory"])
+            if isinstance(state.get("path"), list): state["path"] = Path(state["path"])
+            if isinstance(state.get("traits"), list): state["traits"] = tuple(state["traits"])
+            if isinstance(state.get("state"), str): state["state"] = PersonState.coerce(state["state"])
+            state.setdefault("disease", None)
+        super().__setstate__(state)
 
     def move_towards(self, tx, ty):
         if (self.target_x, self.target_y) != (tx, ty):
             self.target_x, self.target_y = tx, ty
-            self.path = []
+            self.path = Path()
             self.path_retry_timer = 0.0
 
-    def update(self, dt: float, biome: str = "MEADOW", scenario=None, world_state=None):
+    def update(self, dt: float, biome: str = "MEADOW", scenario=None, world_state=None, coarse: bool = False):
+        """Un paso de la persona. coarse=True (LOD intermedio): recorre varios nodos de ruta de una vez."""
         self.current_biome = biome
         
         # 1. SEGURIDAD: Si está en terreno prohibido, rescatarlo
         if world_state and not world_state.is_walkable(self.x, self.y):
             self.x, self.y = 0.0, 0.0 # Rescate a base
-            self.path = []
+            self.path = Path()
 
         # 2. METABOLISMO
-        if self.state == "RESTING" or biome == "INTERIOR":
-            self.energy = min(100.0, self.energy + 15.0 * dt)
-            self.stress = max(0.0, self.stress - 10.0 * dt)
-            self.speed = self.base_speed * 0.5
-        else:
-            self.energy = max(0.0, self.energy - 0.5 * dt)
-            speed_mod = 2.0 if world_state and (int(self.x), int(self.y)) in world_state.built_structures else 1.0
-            self.speed = self.base_speed * speed_mod
+        self._metabolism(dt, biome, world_state)
 
         # 3. MOVIMIENTO ORTOGONAL ESTRICTO
         if world_state:
             if self.path_retry_timer > 0:
                 self.path_retry_timer -= dt
-            self._follow_path_orthogonal(dt, world_state)
+            if coarse: self._travel_path(dt, world_state)
+            else: self._follow_path_orthogonal(dt, world_state)
         
         # 4. LÓGICA DE IA
         self.action_timer += dt
@@ -66,16 +80,96 @@ class Person(Entity):
             self.action_timer = 0
             self._logic_tick(world_state)
 
-    def _follow_path_orthogonal(self, dt, world_state):
+    def update_aggregate(self, dt: float, world_state):
+        """LOD lejano: sin A* ni caminos. Viaja en linea recta y decide una vez por segundo acumulado."""
+        if not world_state.is_walkable(self.x, self.y):
+            self.x, self.y = 0.0, 0.0 # Mismo rescate que en update
+        biome = world_state.get_biome_at(self.x, self.y)
+        self.current_biome = biome
+        self._metabolism(dt, biome, world_state)
+        self.path_retry_timer = max(0.0, self.path_retry_timer - dt)
+        if self.path: self.path = Path() # Al volver a verse planifica desde donde esté
+
+        dx, dy = self.target_x - self.x, self.target_y - self.y
+        dist = math.sqrt(dx**2 + dy**2)
+        step = self.speed * dt
+        if dist <= step: nx, ny = self.target_x, self.target_y
+        else: nx, ny = self.x + dx / dist * step, self.y + dy / dist * step
+        if world_state.is_walkable(nx, ny): self.x, self.y = nx, ny
+
+        self.action_timer += dt
+        while self.action_timer > 1.0:
+            self.action_timer -= 1.0
+            self._logic_tick(world_state)
+
+    # --- DORMIR (ver sleep.py): quieto, solo cambian energia, estres y temporizadores ---
+    def sleep_time(self) -> float:
+        """Segundos que puede saltarse el motor sin que cambie nada más (0: ahora no)."""
+        if self.path: return 0.0
+        # Sin ruta: o espera para reintentar, o ya está en su celda objetivo (replanear no la mueve)
+        at_target = (int(self.x), int(self.y)) == (int(self.target_x), int(self.target_y)) \
+            and abs(self.x - int(self.x)) + abs(self.y - int(self.y)) < 0.2
+        if not at_target and self.path_retry_timer <= 0: return 0.0
+        if self.state == PersonState.RESTING:
+            # Descansando, la logica no hace nada hasta tener la energia llena
+            wait = (100.0 - self.energy) / 15.0
+        else:
+            wait = 1.0 - self.action_timer # Hasta el siguiente tick de logica
+        if not at_target: wait = min(wait, self.path_retry_timer)
+        return max(0.0, wait)
+
+    def catch_up(self, elapsed: float):
+        """Aplica de golpe elapsed segundos dormida: metabolismo en forma cerrada y temporizadores."""
+        if self.state == PersonState.RESTING or self.current_biome == "INTERIOR":
+            self.energy = min(100.0, self.energy + 15.0 * elapsed)
+            self.stress = max(0.0, self.stress - 10.0 * elapsed)
+        else:
+            self.energy = max(0.0, self.energy - 0.5 * elapsed)
+        if self.path_retry_timer > 0: self.path_retry_timer = max(0.0, self.path_retry_timer - elapsed)
+        self.action_timer += elapsed
+
+    def _metabolism(self, dt: float, biome: str, world_state):
+        if self.state == PersonState.RESTING or biome == "INTERIOR":
+            self.energy = min(100.0, self.energy + 15.0 * dt)
+            self.stress = max(0.0, self.stress - 10.0 * dt)
+            self.speed = self.base_speed * 0.5
+        else:
+            self.energy = max(0.0, self.energy - 0.5 * dt)
+            speed_mod = 2.0 if world_state and (int(self.x), int(self.y)) in world_state.built_structures else 1.0
+            self.speed = self.base_speed * speed_mod
+
+    def _plan_path(self, world_state) -> bool:
+        """Pide ruta al objetivo si no tiene. False si no hay ruta (o aun está en enfriamiento)."""
+        if self.path: return True
+        if self.path_retry_timer > 0: return False # Enfriamiento activo
+
+        if not self.pathfinder: self.pathfinder = Pathfinder(world_state)
+        self.path = Path(self.pathfinder.get_path((self.x, self.y), (self.target_x, self.target_y)))
+
         if not self.path:
-            if self.path_retry_timer > 0: return # Enfriamiento activo
-            
-            if not self.pathfinder: self.pathfinder = Pathfinder(world_state)
-            self.path = self.pathfinder.get_path((self.x, self.y), (self.target_x, self.target_y))
-            
-            if not self.path:
-                self.path_retry_timer = 2.0 # Si falla, esperar 2 segundos
+            self.path_retry_timer = 2.0 # Si falla, esperar 2 segundos
+            return False
+        return True
+
+    def _travel_path(self, dt, world_state):
+        """Movimiento grueso: gasta speed*dt avanzando nodo a nodo (la ruta ya es transitable)."""
+        if not self._plan_path(world_state): return
+        budget = self.speed * dt
+        while self.path and budget > 0:
+            tx, ty = self.path[0]
+            dist = abs(tx - self.x) + abs(ty - self.y)
+            if dist > budget: # Se queda a medio tramo, primero en x como el paso normal
+                step = math.copysign(min(budget, abs(tx - self.x)), tx - self.x)
+                self.x += step
+                self.y += math.copysign(budget - abs(step), ty - self.y)
                 return
+            self.x, self.y = tx, ty
+            budget -= dist
+            self.path.pop(0)
+            self._build_road_step(world_state)
+
+    def _follow_path_orthogonal(self, dt, world_state):
+        if not self._plan_path(world_state): return
 
         target_node = self.path[0]
         dx = target_node[0] - self.x
@@ -93,18 +187,18 @@ class Person(Entity):
             if world_state.is_walkable(self.x + step, self.y):
                 self.x += step
                 self._build_road_step(world_state)
-            else: self.path = [] # Re-ruta
+            else: self.path = Path() # Re-ruta
         elif abs(dy) > 0.01:
             step = math.copysign(min(move_step, abs(dy)), dy)
             if world_state.is_walkable(self.x, self.y + step):
                 self.y += step
                 self._build_road_step(world_state)
-            else: self.path = []
+            else: self.path = Path()
 
     def _build_road_step(self, world_state):
         """Pone una celda de camino si tiene madera y va a casa."""
         bx, by = int(self.x), int(self.y)
-        if self.state == "GOING_HOME" and self.inventory["wood"] > 0:
+        if self.state == PersonState.GOING_HOME and self.inventory["wood"] > 0:
             if (bx, by) != self.last_road_pos and (bx, by) not in world_state.built_structures:
                 if self.current_biome not in ["INTERIOR", "OFFICE"]:
                     world_state.add_structure(bx, by, "ROAD")
@@ -112,14 +206,12 @@ class Person(Entity):
                     self.last_road_pos = (bx, by)
 
     def _logic_tick(self, world_state=None):
-        if self.state == "RESTING":
-            if self.energy >= 100: self.state = "IDLE"
+        if self.state == PersonState.RESTING:
+            if self.energy >= 100: self.state = PersonState.IDLE
             return
 
         if not self.home_reference:
-            for e in world_state.get_all_entities():
-                if isinstance(e, Town) and (e.owner_name == self.name or self.name in e.residents):
-                    self.home_reference = e; break
+            self.home_reference = world_state.home_of(self.name)
 
         # REGRESAR
         if self.energy < 40 or self.inventory["wood"] >= 10:
@@ -128,23 +220,24 @@ class Person(Entity):
                 if self.inventory["wood"] > 0 and self.home_reference:
                     self.home_reference.add_wood(int(self.inventory["wood"]))
                     self.inventory["wood"] = 0
-                self.state = "RESTING"; self.move_towards(hx, hy)
+                self.state = PersonState.RESTING; self.move_towards(hx, hy)
             else:
-                self.state = "GOING_HOME"; self.move_towards(hx, hy)
+                self.state = PersonState.GOING_HOME; self.move_towards(hx, hy)
             return
 
-        if self.state == "IDLE":
-            self.state = "SEARCHING"
-            self.move_towards(random.randint(-100, 100), random.randint(-100, 100))
-        elif self.state == "SEARCHING":
-            if random.random() < 0.2 and self.current_biome in ["FOREST", "OFFICE"]:
-                self.state = "GATHERING"
-        elif self.state == "GATHERING":
+        if self.state == PersonState.IDLE:
+            self.state = PersonState.SEARCHING
+            rand = self.rand
+            self.move_towards(rand.randint(-100, 100), rand.randint(-100, 100))
+        elif self.state == PersonState.SEARCHING:
+            if self.rand.random() < 0.2 and self.current_biome in ["FOREST", "OFFICE"]:
+                self.state = PersonState.GATHERING
+        elif self.state == PersonState.GATHERING:
             self.inventory["wood"] += 2
 
     def react_to_danger(self, dx, dy):
         if "BRAVE" in self.traits: return
-        self.state = "PANICKING"
+        self.state = PersonState.PANICKING
         logger.log(f"ALARM: ¡{self.name} huye de un peligro!")
         self.move_towards(self.x + (self.x-dx)*10, self.y + (self.y-dy)*10)
 
@@ -2,6 +2,8 @@ from .base import Entity
 from ..logger import logger
 
 class Shop(Entity):
+    __slots__ = ("stock", "prices")
+
     def __init__(self, x, y):
         super().__init__("Tienda General", x, y)
         self.stock = {"food": 100, "medkit": 50, "shoes": 10}
@@ -35,7 +37,6 @@ class Shop(Entity):
             if self._sell("shoes", buyer):
                 buyer.base_speed += 1.0
                 logger.log(f"SHOP: {buyer.name} compro botas nuevas! (+Speed).")
-                buyer.add_journal_entry("Me compre unas botas de lujo.")
 
     def _sell(self, item, buyer):
         if self.stock.get(item, 0) > 0 and buyer.wealth >= self.prices[item]:
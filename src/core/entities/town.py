@@ -2,6 +2,8 @@ from .base import Entity
 from ..logger import logger
 
 class Town(Entity):
+    __slots__ = ("owner_name", "residents", "wood_stock", "level", "max_residents", "dims", "world", "tiles")
+
     def __init__(self, name: str, x: int = 0, y: int = 0, owner_name: str = "Sistema"):
         super().__init__(name, x, y)
         self.owner_name = owner_name
@@ -11,12 +13,14 @@ class Town(Entity):
         self.max_residents = 2
         
         self.dims = {1: 3, 2: 5, 3: 7, 4: 9, 5: 13}
+        self.world = None # WorldState que la contiene (se avisa cuando cambia la huella)
         self.tiles = {}
         self._update_structure()
 
     def add_resident(self, name: str):
         if len(self.residents) < self.max_residents:
             self.residents.append(name)
+            if getattr(self, "world", None): self.world.on_resident_added(self, name)
             return True
         return False
 
@@ -46,7 +50,9 @@ class Town(Entity):
         if self.level < 5:
             self.level += 1
             self.max_residents += 1
+            old_tiles = self.tiles
             self._update_structure()
+            if getattr(self, "world", None): self.world.on_town_changed(self, old_tiles)
             logger.log(f"BUILD: La casa de {self.owner_name} ha sido ampliada a Nivel {self.level}.")
 
     def is_inside(self, x, y):
@@ -1,25 +1,30 @@
-import random
 import math
 from .base import Entity
 
 class Wolf(Entity):
-    def __init__(self, name: str, x: float, y: float):
-        super().__init__(name, x, y)
+    __slots__ = ("speed", "target_x", "target_y", "decision_timer")
+
+    def __init__(self, name: str, x: float, y: float, rng=None):
+        super().__init__(name, x, y, rng)
         self.speed = 3.0
-        self.target_x = x + random.uniform(-10, 10)
-        self.target_y = y + random.uniform(-10, 10)
+        self.target_x = x + self.rand.uniform(-10, 10)
+        self.target_y = y + self.rand.uniform(-10, 10)
         self.decision_timer = 0.0
 
     def update(self, dt: float, is_night: bool = False, world_state=None):
         # 1. Movimiento de patrulla
         current_speed = self.speed * 2.5 if is_night else self.speed
-        
+        # Con dt grande (niveles de detalle lejanos) a pasos de una celda como mucho: sin saltar muros
+        steps = max(1, math.ceil(current_speed * dt))
+        for _ in range(steps): self._patrol(dt / steps, current_speed, world_state)
+
+    def _patrol(self, dt: float, current_speed: float, world_state):
         dx = self.target_x - self.x
         dy = self.target_y - self.y
         dist = math.sqrt(dx**2 + dy**2)
         
         if dist > 0.5:
-            step = current_speed * dt
+            step = min(current_speed * dt, dist) # Sin pasarse del objetivo
             nx = self.x + (dx / dist) * step
             ny = self.y + (dy / dist) * step
             
@@ -32,11 +37,20 @@ class Wolf(Entity):
                 self.x, self.y = nx, ny
             else:
                 # Si choca con un muro, cambia de objetivo inmediatamente
-                self.target_x = self.x + random.uniform(-30, 30)
-                self.target_y = self.y + random.uniform(-30, 30)
+                self.target_x = self.x + self.rand.uniform(-30, 30)
+                self.target_y = self.y + self.rand.uniform(-30, 30)
         else:
             self.decision_timer += dt
             if self.decision_timer > 3.0:
                 self.decision_timer = 0
-                self.target_x = self.x + random.uniform(-40, 40)
-                self.target_y = self.y + random.uniform(-40, 40)
+                self.target_x = self.x + self.rand.uniform(-40, 40)
+                self.target_y = self.y + self.rand.uniform(-40, 40)
+
+    # --- DORMIR (ver sleep.py) ---
+    def sleep_time(self) -> float:
+        """Parado en su objetivo solo cuenta decision_timer: duerme hasta que toque decidir."""
+        if (self.target_x - self.x) ** 2 + (self.target_y - self.y) ** 2 > 0.25: return 0.0
+        return max(0.0, 3.0 - self.decision_timer)
+
+    def catch_up(self, elapsed: float):
+        self.decision_timer += elapsed
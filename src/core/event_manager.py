@@ -1,5 +1,5 @@
-import random
 from .logger import logger
+from .profiler import profiler
 from .entities.person import Person
 from .state import WorldState
 
@@ -17,17 +17,26 @@ class EventManager:
             self._bad_flu
         ]
 
-    def update(self):
-        entities = [e for e in self.world_state.get_all_entities() if isinstance(e, Person)]
-        if not entities: return
+    def update(self, people=None, share: float = 1.0, touch=None):
+        """Quizá un evento global sobre alguien de people (por defecto, toda la gente del mundo).
 
-        if random.random() < 0.03: # Probabilidad ajustada
-            event_func = random.choice(self.events)
-            event_func(random.choice(entities))
+        share escala la probabilidad cuando people es solo una parte del mundo (motor por regiones);
+        touch(victima) se llama antes del evento (el motor despierta a quien dormia).
+        """
+        if people is None: people = self.world_state.people
+        if not people: return
+
+        rng = self.world_state.rng.stream("events")
+        if rng.random() < 0.03 * share: # Probabilidad ajustada
+            event_func = rng.choice(self.events)
+            if profiler.enabled: profiler.count("events.global")
+            victim = rng.choice(list(people.values()))
+            if touch is not None: touch(victim)
+            event_func(victim)
 
     def _mugging_event(self, victim: Person):
         if victim.wealth > 15:
-            stolen = random.randint(5, 15)
+            stolen = victim.rand.randint(5, 15)
             victim.wealth -= stolen
             victim.stress += 30
             logger.log(f"ALARM: {victim.name} ha sido atracado! Perdio {stolen}G.")
@@ -44,12 +53,12 @@ class EventManager:
         logger.log(f"TAX: Hacienda ha cobrado {tax}G a {victim.name}.")
 
     def _good_finding(self, person: Person):
-        found = random.randint(5, 10)
+        found = person.rand.randint(5, 10)
         person.wealth += found
         logger.log(f"GOLD: {person.name} encontro una bolsa con {found}G.")
 
     def _lottery_win(self, person: Person):
-        win = random.randint(50, 100)
+        win = person.rand.randint(50, 100)
         person.wealth += win
         person.stress -= 10
         logger.log(f"GOLD: ¡{person.name} ha ganado la loteria! +{win}G.")
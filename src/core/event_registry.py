@@ -1,6 +1,6 @@
-import random
 import math
 from .logger import logger
+from .profiler import profiler
 
 class EventRegistry:
     def __init__(self):
@@ -11,15 +11,15 @@ class EventRegistry:
             (0.01, "WEATHER: El olor a tierra mojada relaja a {name}.", {"stress": -5}, 
              lambda p, ws: self._is_outside(p)),
             (0.005, "WEATHER: Un rayo cae sobre un arbol cerca de {name}!", {"stress": 30}, 
-             lambda p, ws: self._is_outside(p) and ws.scenario.get_biome_id(p.x, p.y) == "FOREST"),
+             lambda p, ws: self._is_outside(p) and ws.get_terrain_biome(p.x, p.y) == "FOREST"),
             (0.01, "WEATHER: La niebla impide que {name} vea bien.", {"speed_mult": 0.6}, 
              lambda p, ws: self._is_outside(p)),
 
             # --- FINANZAS (Contextuales) ---
             (0.01, "GOLD: {name} encontro una moneda en el asfalto.", {"wealth": 2}, 
-             lambda p, ws: ws.scenario.get_biome_id(p.x, p.y) == "STREET"),
+             lambda p, ws: ws.get_terrain_biome(p.x, p.y) == "STREET"),
             (0.005, "TAX: Un inspector de hacienda abordo a {name} en la oficina.", {"wealth": -20, "stress": 15}, 
-             lambda p, ws: ws.scenario.get_biome_id(p.x, p.y) == "INTERIOR"),
+             lambda p, ws: ws.get_terrain_biome(p.x, p.y) == "INTERIOR"),
 
             # --- SOCIAL (¡Solo si hay alguien cerca!) ---
             (0.02, "TALK: {name} discutio con un vecino por un malentendido.", {"stress": 20}, 
@@ -31,11 +31,11 @@ class EventRegistry:
 
             # --- NATURALEZA ---
             (0.01, "ZEN: {name} se quedo mirando el fluir del agua.", {"stress": -20}, 
-             lambda p, ws: ws.scenario.get_biome_id(p.x, p.y) == "WATER"),
+             lambda p, ws: ws.get_terrain_biome(p.x, p.y) == "WATER"),
             (0.01, "OOPS: {name} se pincho con un cactus.", {"energy": -5, "stress": 5}, 
-             lambda p, ws: ws.scenario.get_biome_id(p.x, p.y) == "DESERT"),
+             lambda p, ws: ws.get_terrain_biome(p.x, p.y) == "DESERT"),
             (0.01, "BUILD: {name} encontro madera de calidad superior.", {"energy": 10}, 
-             lambda p, ws: ws.scenario.get_biome_id(p.x, p.y) == "FOREST"),
+             lambda p, ws: ws.get_terrain_biome(p.x, p.y) == "FOREST"),
 
             # --- ESTADO INTERNO (Siempre posibles) ---
             (0.005, "CRISIS: {name} reflexiona sobre el sentido de su existencia.", {"stress": 15}, 
@@ -55,16 +55,13 @@ class EventRegistry:
 
     def _is_near_anyone(self, p, ws):
         from .entities.person import Person
-        for entity in ws.get_all_entities():
-            if isinstance(entity, Person) and entity.id != p.id:
-                dist = math.sqrt((p.x - entity.x)**2 + (p.y - entity.y)**2)
-                if dist < 4.0: return True
-        return False
+        return ws.spatial.any_within(p.x, p.y, 4.0, Person, exclude=p)
 
-    def get_random_event(self, person, world_state):
+    def get_random_event(self, person, world_state, scale: float = 1.0):
+        """Eventos que le tocan en esta ronda. scale multiplica las probabilidades (LOD agregado)."""
         triggered = []
         for prob, template, effects, condition in self.event_pool:
-            if random.random() < prob:
+            if person.rand.random() < prob * scale:
                 # SOLO DISPARA SI SE CUMPLE LA CONDICIÓN
                 if condition(person, world_state):
                     triggered.append((template, effects))
@@ -72,10 +69,11 @@ class EventRegistry:
 
     def apply_event(self, person, event_data):
         template, effects = event_data
+        if profiler.enabled: profiler.count("events.contextual")
         
         # LUCKY: 50% de ignorar lo malo
         is_bad = any(v < 0 for v in effects.values() if isinstance(v, (int, float))) or effects.get("stress", 0) > 0
-        if "LUCKY" in person.traits and is_bad and random.random() < 0.5:
+        if "LUCKY" in person.traits and is_bad and person.rand.random() < 0.5:
             logger.log(f"ZEN: La suerte de {person.name} le libro de un mal trago.")
             return
 
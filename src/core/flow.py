@@ -0,0 +1,231 @@
+"""Campos de flujo: un mapa de distancias compartido por todos los que van al mismo sitio.
+
+Muchos van a los mismos pocos destinos: su casa (el centro de su Town) o el origen (0, 0) si
+no tienen casa. Esos destinos se registran (add_goal; WorldState lo hace con cada Town) y el
+resto de busquedas no pasa por aqui. En vez de un A* por persona, cuando un destino
+registrado se pide desde MIN_DEMAND salidas distintas (no cuenta el mismo que reintenta) se
+calcula una vez la distancia de cada celda de una ventana alrededor de él (BFS inverso desde
+el destino) y cualquiera que esté dentro llega bajando por el campo, una consulta por paso.
+
+Las distancias se guardan en un array de 16 bits por celda. Cuando una celda cambia de paso
+el campo se repara en el sitio: si se cierra, solo se recalculan las celdas cuya distancia
+dependía de ella; si se abre, se propaga la mejora desde ella. Los campos que nadie consulta
+en IDLE_LOOKUPS consultas se tiran, y como mucho se guardan CAPACITY.
+"""
+from array import array
+from collections import OrderedDict, deque
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+from .profiler import profiler
+
+RADIUS = 96 # Semilado de la ventana (193x193 celdas, ~110 KB por campo)
+MIN_DEMAND = 3 # Salidas distintas hacia el mismo destino antes de montarle un campo
+CAPACITY = 32 # Campos guardados como mucho (se tira el menos usado)
+IDLE_LOOKUPS = 20000 # Consultas (de cualquier destino) sin usar un campo antes de tirarlo
+UNREACHED = 0xFFFF
+
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1)) # El mismo orden que el A*
+
+class FlowField:
+    """Distancias al destino en una ventana cuadrada alrededor de él."""
+    __slots__ = ("goal", "x0", "y0", "size", "walkable", "dist", "last_used")
+
+    def __init__(self, world, goal: Tuple[int, int], radius: int = RADIUS):
+        self.goal = goal
+        self.x0, self.y0 = goal[0] - radius, goal[1] - radius
+        self.size = 2 * radius + 1
+        self.walkable = world.get_walkable_window(self.x0, self.y0, self.size, self.size)
+        self.dist = array("H", [UNREACHED]) * (self.size * self.size)
+        self.last_used = 0
+        self._flood()
+
+    def index(self, x: int, y: int) -> int:
+        """Indice de la celda en la ventana, o -1 si cae fuera."""
+        lx, ly = x - self.x0, y - self.y0
+        if 0 <= lx < self.size and 0 <= ly < self.size: return ly * self.size + lx
+        return -1
+
+    def _neighbours(self, i: int):
+        size = self.size
+        x = i % size
+        if x > 0: yield i - 1
+        if x < size - 1: yield i + 1
+        if i >= size: yield i - size
+        if i < size * (size - 1): yield i + size
+
+    def _flood(self):
+        dist, walkable = self.dist, self.walkable
+        origin = self.index(*self.goal)
+        dist[origin] = 0
+        queue = deque([origin])
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self._neighbours(i):
+                if walkable[j] and dist[j] == UNREACHED:
+                    dist[j] = d
+                    queue.append(j)
+
+    def path_from(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        """Celdas de (x, y) al destino bajando por el campo, o None si no está en él."""
+        i = self.index(x, y)
+        if i < 0 or self.dist[i] == UNREACHED: return None
+        dist, size = self.dist, self.size
+        path = [(x, y)]
+        while dist[i]:
+            want = dist[i] - 1
+            for dx, dy in _DIRS:
+                nx, ny = x + dx, y + dy
+                j = self.index(nx, ny)
+                if j >= 0 and dist[j] == want: break
+            else: return None # No deberia pasar: el campo siempre tiene una vecina un paso más cerca
+            x, y, i = nx, ny, j
+            path.append((x, y))
+        return path
+
+    def cell_changed(self, x: int, y: int, walkable: bool) -> bool:
+        """Repara el campo tras cambiar una celda. False si el destino ya no es transitable."""
+        i = self.index(x, y)
+        if i < 0: return True
+        self.walkable[i] = walkable
+        if (x, y) == self.goal: return walkable
+        if walkable: self._opened(i)
+        else: self._blocked(i)
+        return True
+
+    def _opened(self, i: int):
+        """La celda se abre: tomar la mejor vecina y propagar la mejora."""
+        dist = self.dist
+        best = min((dist[j] for j in self._neighbours(i)), default=UNREACHED)
+        if best == UNREACHED or best + 1 >= dist[i]: return
+        dist[i] = best + 1
+        queue = deque([i])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for j in self._neighbours(u):
+                if self.walkable[j] and dist[j] > d:
+                    dist[j] = d
+                    queue.append(j)
+
+    def _blocked(self, i: int):
+        """La celda se cierra: invalidar lo que colgaba de ella y rellenarlo desde el borde."""
+        dist, walkable = self.dist, self.walkable
+        if dist[i] == UNREACHED: return
+        # 1. Por niveles: una celda cae si ninguna vecina valida está un paso más cerca
+        old = {i: dist[i]}
+        dist[i] = UNREACHED
+        queue = deque(j for j in self._neighbours(i) if dist[j] == old[i] + 1)
+        while queue:
+            u = queue.popleft()
+            d = dist[u]
+            if d == UNREACHED: continue
+            if any(dist[j] == d - 1 for j in self._neighbours(u)): continue
+            old[u] = d
+            dist[u] = UNREACHED
+            queue.extend(j for j in self._neighbours(u) if dist[j] == d + 1)
+        # 2. Rellenar las invalidadas desde sus vecinas que siguen teniendo distancia
+        heap = []
+        for u in old:
+            if not walkable[u]: continue
+            best = min((dist[j] for j in self._neighbours(u)), default=UNREACHED)
+            if best != UNREACHED: heap.append((best + 1, u))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d >= dist[u]: continue
+            dist[u] = d
+            for j in self._neighbours(u):
+                if j in old and walkable[j] and d + 1 < dist[j]: heapq.heappush(heap, (d + 1, j))
+
+class FlowFields:
+    """Campos por destino, montados a demanda, reparados por celdas y tirados si nadie los usa."""
+
+    def __init__(self, radius: int = RADIUS, min_demand: int = MIN_DEMAND, capacity: int = CAPACITY):
+        self.radius = radius
+        self.min_demand = min_demand
+        self.capacity = capacity
+        self.fields: "OrderedDict[Tuple[int, int], FlowField]" = OrderedDict() # Destino pedido -> campo
+        self.goals: Set[Tuple[int, int]] = set() # Destinos registrados (casas y origen)
+        self.demand: Dict[Tuple[int, int], Set[Tuple[int, int]]] = {} # Destino -> salidas que lo han pedido
+        self.lookups = self.served = self.built = self.repaired = self.evicted = 0
+
+    # Se guarda la configuracion, no los campos ni los destinos: al cargar WorldState los vuelve a registrar
+    def __getstate__(self):
+        return {"radius": self.radius, "min_demand": self.min_demand, "capacity": self.capacity}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def add_goal(self, x: int, y: int):
+        self.goals.add((x, y))
+
+    def remove_goal(self, x: int, y: int):
+        """El destino deja de serlo (su Town ya no está): fuera su campo y su demanda."""
+        key = (x, y)
+        self.goals.discard(key)
+        self.demand.pop(key, None)
+        if key in self.fields: self._evict(key)
+
+    def path(self, pathfinder, start, end) -> Optional[List[Tuple[int, int]]]:
+        """Ruta de start a end por el campo de end, o None (no es un destino registrado, no hay campo o start cae fuera)."""
+        key = (int(end[0]), int(end[1]))
+        if key not in self.goals: return None
+        self.lookups += 1
+        field = self.fields.get(key)
+        if field is None:
+            starts = self.demand.setdefault(key, set())
+            starts.add((int(start[0]), int(start[1])))
+            if len(starts) < self.min_demand: return None
+            self.demand.pop(key, None)
+            goal = pathfinder.free_goal(key[0], key[1], {})
+            if goal is None: return None
+            field = self._add(pathfinder.world_state, key, goal)
+        field.last_used = self.lookups
+        self.fields.move_to_end(key)
+        path = field.path_from(int(start[0]), int(start[1]))
+        if path is not None:
+            self.served += 1
+            if profiler.enabled: profiler.count("flow.served")
+        self._evict_idle()
+        return path
+
+    def _add(self, world, key, goal) -> FlowField:
+        self.built += 1
+        if profiler.enabled: profiler.count("flow.built")
+        field = self.fields[key] = FlowField(world, goal, self.radius)
+        while len(self.fields) > self.capacity: self._evict(next(iter(self.fields)))
+        return field
+
+    def _evict(self, key):
+        del self.fields[key]
+        self.evicted += 1
+
+    def _evict_idle(self):
+        # El primero del OrderedDict es el que lleva más sin usarse
+        while self.fields:
+            key, field = next(iter(self.fields.items()))
+            if self.lookups - field.last_used < IDLE_LOOKUPS: return
+            self._evict(key)
+
+    def cells_changed(self, blocked=(), opened=()):
+        """Repara los campos cuya ventana contiene celdas que han cambiado de paso."""
+        for walkable, cells in ((False, blocked), (True, opened)):
+            for x, y in cells:
+                for key, field in list(self.fields.items()):
+                    if field.index(x, y) < 0: continue
+                    self.repaired += 1
+                    # Meta sólida que se abre: el campo apuntaba a la celda libre de al lado
+                    stale = walkable and (x, y) == key != field.goal
+                    if not field.cell_changed(x, y, walkable) or stale: self._evict(key)
+
+    def clear(self):
+        """Tira campos y demanda (cambio de escenario); los destinos siguen registrados."""
+        self.fields.clear()
+        self.demand.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {"goals": len(self.goals), "fields": len(self.fields), "lookups": self.lookups, "served": self.served,
+                "built": self.built, "repaired": self.repaired, "evicted": self.evicted,
+                "bytes": sum(len(f.dist) * 2 + len(f.walkable) for f in self.fields.values())}
@@ -0,0 +1,226 @@
+"""Rutas jerarquicas (HPA*) para viajes largos.
+
+El mapa se parte en clusters de 16x16 celdas (los mismos bloques que consulta el A*). En cada
+frontera entre dos clusters, cada tramo de celdas transitables a ambos lados es una entrada
+(una en su centro si es corto, dos en sus extremos si es largo). Dentro de un cluster se unen
+sus entradas con su distancia real (BFS sin salir del cluster). La busqueda va primero sobre
+ese grafo de entradas, con coste acotado, y despues se refina tramo a tramo dentro de cada
+cluster. Así un rio o una sierra no agotan el presupuesto de celdas del A* normal.
+
+Los clusters se calculan al pisarlos por primera vez y se guardan. Cuando una celda cambia de
+paso (valla, puente, muro de un Town) solo se recalcula su cluster y, si está en el borde,
+el vecino que comparte esa frontera. Cambiar de escenario lo tira todo.
+"""
+import heapq
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .pathfinding import BLOCK_BITS, BLOCK_SIZE, BLOCK_MASK
+from .profiler import profiler
+
+MIN_DISTANCE = 2 * BLOCK_SIZE # Por debajo (distancia Manhattan) basta el A* de siempre
+MAX_NODES = 500 # Expansiones del grafo de entradas por busqueda (un viaje de 100 celdas pide ~40-300)
+CAPACITY = 16384 # Clusters guardados como mucho (al pasarse se empieza de cero)
+LONG_RUN = 6 # Tramos de frontera desde esta longitud: dos entradas
+
+_SIDES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+def _bfs(walkable: bytearray, origin: int) -> Tuple[List[int], List[int]]:
+    """Distancias y padres desde origin sin salir del cluster (indices locales y*16+x)."""
+    dist = [-1] * (BLOCK_SIZE * BLOCK_SIZE)
+    parent = [-1] * (BLOCK_SIZE * BLOCK_SIZE)
+    dist[origin] = 0
+    queue = deque([origin])
+    while queue:
+        i = queue.popleft()
+        x, d = i & BLOCK_MASK, dist[i] + 1
+        for j, ok in ((i - 1, x > 0), (i + 1, x < BLOCK_MASK), (i - BLOCK_SIZE, i >= BLOCK_SIZE),
+                      (i + BLOCK_SIZE, i < BLOCK_SIZE * BLOCK_MASK)):
+            if ok and dist[j] < 0 and walkable[j]:
+                dist[j] = d
+                parent[j] = i
+                queue.append(j)
+    return dist, parent
+
+class Cluster:
+    """Entradas de un cluster, sus distancias internas y a qué celda vecina salta cada una."""
+    __slots__ = ("key", "walkable", "nodes", "edges", "exits")
+
+    def __init__(self, key: Tuple[int, int], walkable: bytearray):
+        self.key = key
+        self.walkable = walkable
+        self.nodes: List[Tuple[int, int]] = []
+        self.edges: Dict[Tuple[int, int], List[Tuple[Tuple[int, int], int]]] = {}
+        self.exits: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+
+    def local(self, x: int, y: int) -> int:
+        return ((y & BLOCK_MASK) << BLOCK_BITS) | (x & BLOCK_MASK)
+
+    def distances(self, x: int, y: int) -> Dict[Tuple[int, int], int]:
+        """Distancia interna desde (x, y) a cada entrada alcanzable."""
+        dist = _bfs(self.walkable, self.local(x, y))[0]
+        return {node: dist[self.local(*node)] for node in self.nodes if dist[self.local(*node)] >= 0}
+
+    def path(self, a: Tuple[int, int], b: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Celdas de a a b (ambas incluidas) sin salir del cluster."""
+        x0, y0 = self.key[0] << BLOCK_BITS, self.key[1] << BLOCK_BITS
+        parent = _bfs(self.walkable, self.local(*a))[1]
+        i, origin = self.local(*b), self.local(*a)
+        out = []
+        while i != origin:
+            out.append((x0 + (i & BLOCK_MASK), y0 + (i >> BLOCK_BITS)))
+            i = parent[i]
+        out.append(a)
+        out.reverse()
+        return out
+
+class ClusterGraph:
+    """Grafo de entradas entre clusters, calculado a demanda y actualizado por celdas."""
+
+    def __init__(self, max_nodes: int = MAX_NODES, min_distance: int = MIN_DISTANCE):
+        self.max_nodes = max_nodes
+        self.min_distance = min_distance
+        self.windows: Dict[Tuple[int, int], bytearray] = {} # Paso de cada bloque, 1 = transitable
+        self.clusters: Dict[Tuple[int, int], Cluster] = {}
+        self.searches = self.failed = self.expanded = self.built = 0
+
+    # Se guarda la configuracion, no los clusters: al cargar se recalculan a demanda
+    def __getstate__(self):
+        return {"max_nodes": self.max_nodes, "min_distance": self.min_distance}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _window(self, world, key: Tuple[int, int]) -> bytearray:
+        window = self.windows.get(key)
+        if window is None:
+            if len(self.windows) > CAPACITY: self.clear()
+            window = self.windows[key] = world.get_walkable_window(key[0] << BLOCK_BITS, key[1] << BLOCK_BITS,
+                                                                   BLOCK_SIZE, BLOCK_SIZE)
+        return window
+
+    def cluster(self, world, key: Tuple[int, int]) -> Cluster:
+        cluster = self.clusters.get(key)
+        if cluster is None: cluster = self.clusters[key] = self._build(world, key)
+        return cluster
+
+    def _build(self, world, key: Tuple[int, int]) -> Cluster:
+        self.built += 1
+        if profiler.enabled: profiler.count("hpa.clusters")
+        cx, cy = key
+        walkable = self._window(world, key)
+        cluster = Cluster(key, walkable)
+        x0, y0 = cx << BLOCK_BITS, cy << BLOCK_BITS
+        for dx, dy in _SIDES:
+            other = self._window(world, (cx + dx, cy + dy))
+            # Celda de este lado y la de enfrente, recorriendo la frontera
+            if dx: inside = [(x0 + (BLOCK_MASK if dx > 0 else 0), y0 + i) for i in range(BLOCK_SIZE)]
+            else: inside = [(x0 + i, y0 + (BLOCK_MASK if dy > 0 else 0)) for i in range(BLOCK_SIZE)]
+            run = []
+            for cell in inside + [None]: # None cierra el último tramo
+                if cell is not None and walkable[cluster.local(*cell)] and other[cluster.local(cell[0] + dx, cell[1] + dy)]:
+                    run.append(cell)
+                    continue
+                if run:
+                    picks = (run[0], run[-1]) if len(run) >= LONG_RUN else (run[len(run) // 2],)
+                    for node in picks:
+                        if node not in cluster.exits: cluster.nodes.append(node)
+                        cluster.exits.setdefault(node, []).append((node[0] + dx, node[1] + dy))
+                    run = []
+        for node in cluster.nodes:
+            cluster.edges[node] = [(other, d) for other, d in cluster.distances(*node).items() if other != node]
+        return cluster
+
+    def cells_changed(self, cells):
+        """Celdas que han cambiado de paso: su cluster (y el vecino si es borde) se recalcula."""
+        for x, y in cells:
+            key = (x >> BLOCK_BITS, y >> BLOCK_BITS)
+            self.windows.pop(key, None)
+            self.clusters.pop(key, None)
+            lx, ly = x & BLOCK_MASK, y & BLOCK_MASK
+            if lx == 0: self.clusters.pop((key[0] - 1, key[1]), None)
+            if lx == BLOCK_MASK: self.clusters.pop((key[0] + 1, key[1]), None)
+            if ly == 0: self.clusters.pop((key[0], key[1] - 1), None)
+            if ly == BLOCK_MASK: self.clusters.pop((key[0], key[1] + 1), None)
+
+    def clear(self):
+        self.windows.clear()
+        self.clusters.clear()
+
+    def search(self, world, start: Tuple[int, int], goal: Tuple[int, int],
+               blocks: Optional[Dict] = None) -> Tuple[List[Tuple[int, int]], int]:
+        """(ruta de celdas, entradas expandidas) de start a goal, o ([], n) si no hay.
+
+        goal ya debe ser transitable (Pathfinder.get_path la corrige antes). En blocks quedan
+        los bloques cuyo paso decide el resultado (los visitados y sus vecinos).
+        """
+        self.searches += 1
+        if profiler.enabled: profiler.count("hpa.searches")
+        skey = (start[0] >> BLOCK_BITS, start[1] >> BLOCK_BITS)
+        gkey = (goal[0] >> BLOCK_BITS, goal[1] >> BLOCK_BITS)
+        scluster, gcluster = self.cluster(world, skey), self.cluster(world, gkey)
+        start_links = scluster.distances(*start)
+        for node in scluster.exits.get(start, ()): start_links[node] = 1
+        if skey == gkey: # Mismo cluster: también directo, sin pasar por entradas
+            d = _bfs(scluster.walkable, scluster.local(*start))[0][scluster.local(*goal)]
+            if d >= 0: start_links[goal] = d
+        goal_links = gcluster.distances(*goal)
+        visited = {skey, gkey}
+        ex, ey = goal
+
+        open_set = [(abs(start[0] - ex) + abs(start[1] - ey), 0, start)]
+        if goal not in start_links and not (start_links and goal_links):
+            open_set = [] # Salida o meta encerradas en su cluster: no hay ruta
+        g_score = {start: 0}
+        came_from = {}
+        expanded = 0
+        found = False
+        while open_set and expanded < self.max_nodes:
+            _, g, node = heapq.heappop(open_set)
+            if g > g_score[node]: continue
+            if node == goal:
+                found = True
+                break
+            expanded += 1
+            if node == start: links = start_links.items()
+            else:
+                key = (node[0] >> BLOCK_BITS, node[1] >> BLOCK_BITS)
+                visited.add(key)
+                cluster = self.cluster(world, key)
+                links = cluster.edges.get(node, [])
+                links = list(links) + [(other, 1) for other in cluster.exits.get(node, ())]
+            if node in goal_links: links = list(links) + [(goal, goal_links[node])]
+            for other, cost in links:
+                tentative = g + cost
+                if tentative < g_score.get(other, tentative + 1):
+                    g_score[other] = tentative
+                    came_from[other] = node
+                    heapq.heappush(open_set, (tentative + abs(other[0] - ex) + abs(other[1] - ey), tentative, other))
+
+        self.expanded += expanded
+        if profiler.enabled: profiler.count("hpa.nodes", expanded)
+        if blocks is not None:
+            for cx, cy in visited:
+                for key in ((cx, cy), (cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    blocks.setdefault(key, self._window(world, key)) # Mismo formato que el memo del A*
+        if not found:
+            self.failed += 1
+            if profiler.enabled: profiler.count("hpa.failed")
+            return [], expanded
+        return self._refine(world, came_from, start, goal), expanded
+
+    def _refine(self, world, came_from, start, goal) -> List[Tuple[int, int]]:
+        """Del camino de entradas a celdas: BFS dentro de cada cluster, salto de frontera entre ellos."""
+        waypoints = [goal]
+        while waypoints[-1] != start: waypoints.append(came_from[waypoints[-1]])
+        waypoints.reverse()
+        path = [start]
+        for a, b in zip(waypoints, waypoints[1:]):
+            key = (a[0] >> BLOCK_BITS, a[1] >> BLOCK_BITS)
+            if key == (b[0] >> BLOCK_BITS, b[1] >> BLOCK_BITS): path.extend(self.cluster(world, key).path(a, b)[1:])
+            else: path.append(b)
+        return path
+
+    def stats(self) -> Dict[str, float]:
+        return {"clusters": len(self.clusters), "built": self.built, "searches": self.searches,
+                "failed": self.failed, "expanded": self.expanded}
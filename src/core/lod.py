@@ -0,0 +1,88 @@
+"""Nivel de detalle: la simulacion completa solo cerca de la camara.
+
+Tres niveles según la distancia al foco (renderer.camera_focus):
+- FULL: el update de siempre, cada frame.
+- REDUCED: cada REDUCED_EVERY frames con el dt acumulado y movimiento grueso (varios nodos
+  de ruta por llamada, sin comprobar cada paso).
+- AGGREGATE: cada AGGREGATE_EVERY frames, sin A* ni caminos: viaje en linea recta, recogida y
+  decisiones por segundo acumulado, y eventos contextuales menos a menudo con la probabilidad
+  escalada (mismo resultado esperado).
+Cada entidad guarda el dt que lleva sin simular, así que al cambiar de nivel no pierde ni
+repite tiempo; los turnos se escalonan por id para repartir el coste entre frames.
+"""
+from typing import Dict, Optional, Tuple
+
+from .entities.components import Path
+from .profiler import profiler
+
+FULL, REDUCED, AGGREGATE = 0, 1, 2
+TIER_NAMES = ("full", "reduced", "aggregate")
+
+NEAR = 80.0             # Celdas a zoom 1: lo que cabe en pantalla y un margen
+FAR = 320.0
+REDUCED_EVERY = 4       # Frames entre updates del nivel intermedio
+AGGREGATE_EVERY = 30    # 2 s a 15 fps
+AGGREGATE_EVENT_EVERY = 4 # Rondas de eventos contextuales entre tiradas (x4 de probabilidad)
+REASSIGN_EVERY = 4      # Frames entre recalculos de nivel
+
+_EVERY = (1, REDUCED_EVERY, AGGREGATE_EVERY)
+
+class LevelOfDetail:
+    """Decide el nivel de cada persona y lobo y cuándo le toca simularse."""
+
+    def __init__(self, focus=None, near: float = NEAR, far: float = FAR):
+        self.focus = focus # Cualquier cosa con x, y (normalmente renderer.camera_focus)
+        self.near = near
+        self.far = far
+        self.scale = 1.0 # Zoom del renderer: alejando la camara se ve más, los radios crecen
+        self.tiers: Dict[int, int] = {}
+        self.pending: Dict[int, float] = {} # dt sin simular de quien espera turno
+        self.counts = [0, 0, 0]
+        self.frame = 0
+
+    def begin_frame(self, world):
+        """Avanza el contador de frames y, cada REASSIGN_EVERY, recalcula los niveles."""
+        self.frame += 1
+        if self.frame % REASSIGN_EVERY == 1 or not self.tiers: self.assign(world)
+
+    def assign(self, world):
+        fx, fy = float(self.focus.x), float(self.focus.y)
+        near2, far2 = (self.near * self.scale) ** 2, (self.far * self.scale) ** 2
+        old, tiers, counts = self.tiers, {}, [0, 0, 0]
+        for registry in (world.people, world.wolves):
+            for entity in registry.values():
+                d2 = (entity.x - fx) ** 2 + (entity.y - fy) ** 2
+                tier = FULL if d2 <= near2 else REDUCED if d2 <= far2 else AGGREGATE
+                if old.get(entity.id) == AGGREGATE and tier != AGGREGATE: self._settle(entity, world)
+                tiers[entity.id] = tier
+                counts[tier] += 1
+        self.tiers, self.counts = tiers, counts
+        self.pending = {eid: dt for eid, dt in self.pending.items() if eid in tiers}
+        if profiler.enabled:
+            for tier, name in enumerate(TIER_NAMES): profiler.count(f"lod.{name}", counts[tier])
+
+    def _settle(self, entity, world):
+        """Vuelve a verse tras el nivel agregado: sin ruta vieja y en una celda transitable."""
+        if hasattr(entity, "path"): entity.path = Path()
+        if world.is_walkable(entity.x, entity.y): return
+        x, y = entity.x, entity.y
+        for r in range(1, 6):
+            for dx in range(-r, r + 1):
+                for dy in (-r, r):
+                    for cx, cy in ((x + dx, y + dy), (x + dy, y + dx)):
+                        if world.is_walkable(cx, cy):
+                            entity.x, entity.y = cx, cy
+                            return
+
+    def advance(self, entity, dt: float) -> Tuple[Optional[float], int]:
+        """(dt a simular, nivel); dt es None si este frame no le toca y se acumula."""
+        eid = entity.id
+        tier = self.tiers.get(eid, FULL)
+        if tier == FULL and eid not in self.pending: return dt, FULL
+        total = self.pending.pop(eid, 0.0) + dt
+        if tier == FULL or (self.frame + eid) % _EVERY[tier] == 0: return total, tier
+        self.pending[eid] = total
+        return None, tier
+
+    def tier(self, entity) -> int:
+        return self.tiers.get(entity.id, FULL)
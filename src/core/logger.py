@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List
 from .storyteller import Storyteller
+from .profiler import profiler
 
 class GameLogger:
     def __init__(self, max_lines: int = 30):
@@ -16,6 +17,7 @@ class GameLogger:
         }
 
     def log(self, message: str):
+        if profiler.enabled: profiler.count("log_lines")
         # 1. Limpieza de emojis
         for emoji, text in self.emoji_map.items():
             message = message.replace(emoji, text)
@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+from .terrain_cache import CHUNK_BITS, CHUNK_SIZE, CHUNK_MASK
+
+# Codigos por celda de la capa de ocupacion
+FREE = 0     # Sin construcciones: decide el escenario
+OPEN = 1     # Construccion transitable (camino, puente, puerta)
+SOLID = 2    # Muro o valla
+INTERIOR = 3 # Interior de un Town (transitable, bioma INTERIOR)
+
+class OccupancyChunk:
+    __slots__ = ("codes", "chars", "built", "used")
+
+    def __init__(self):
+        self.codes = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        self.chars = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        self.built = bytearray(CHUNK_SIZE * CHUNK_SIZE) # 1 si hay construccion manual (aunque la tape un Town)
+        self.used = 0 # Celdas distintas de FREE
+
+class OccupancyGrid:
+    """Towns y construcciones estampados en arrays por chunk, consultables en O(1).
+
+    Prioridad por celda (la de siempre): el primer Town de world.towns que la cubra,
+    luego built_structures y, si no hay nada, el escenario (FREE).
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.chunks: Dict[Tuple[int, int], OccupancyChunk] = {}
+        self.towns_by_chunk: Dict[Tuple[int, int], List] = {} # Towns que pisan cada chunk, en orden de world.towns
+
+    def code_at(self, x: int, y: int) -> int:
+        chunk = self.chunks.get((x >> CHUNK_BITS, y >> CHUNK_BITS))
+        if chunk is None: return FREE
+        return chunk.codes[((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)]
+
+    def get(self, x: int, y: int) -> Tuple[int, Optional[str]]:
+        """(codigo, caracter) de la celda; (FREE, None) si no hay construccion."""
+        chunk = self.chunks.get((x >> CHUNK_BITS, y >> CHUNK_BITS))
+        if chunk is None: return FREE, None
+        i = ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)
+        code = chunk.codes[i]
+        return (code, chr(chunk.chars[i])) if code else (FREE, None)
+
+    # --- ACTUALIZACION INCREMENTAL ---
+    def _resolve(self, x: int, y: int) -> Tuple[int, str]:
+        for town in self.towns_by_chunk.get((x >> CHUNK_BITS, y >> CHUNK_BITS), ()):
+            tile = town.get_tile_at(x, y)
+            if tile:
+                if tile["solid"]: return SOLID, tile["char"]
+                return (INTERIOR if tile["type"] == "INTERIOR" else OPEN), tile["char"]
+        struct = self.world.built_structures.get((x, y))
+        if struct: return (SOLID if struct["solid"] else OPEN), struct["char"]
+        return FREE, " "
+
+    def refresh_tile(self, x: int, y: int):
+        key = (x >> CHUNK_BITS, y >> CHUNK_BITS)
+        code, char = self._resolve(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if code == FREE: return
+            chunk = self.chunks[key] = OccupancyChunk()
+        i = ((y & CHUNK_MASK) << CHUNK_BITS) | (x & CHUNK_MASK)
+        chunk.used += (code != FREE) - (chunk.codes[i] != FREE)
+        chunk.codes[i], chunk.chars[i] = code, ord(char)
+        chunk.built[i] = (x, y) in self.world.built_structures
+        if chunk.used == 0: del self.chunks[key]
+
+    def _town_cells(self, town, tiles) -> List[Tuple[int, int]]:
+        tx, ty = int(town.x), int(town.y) # Los Town se colocan en celdas enteras
+        return [(tx + dx, ty + dy) for dx, dy in tiles]
+
+    def add_town(self, town):
+        self.update_town(town, {})
+
+    def update_town(self, town, old_tiles: Dict):
+        """Re-estampa un Town tras crearse o cambiar de huella (Town.upgrade)."""
+        new_cells = self._town_cells(town, town.tiles)
+        for cx, cy in {(x >> CHUNK_BITS, y >> CHUNK_BITS) for x, y in new_cells}:
+            towns = self.towns_by_chunk.setdefault((cx, cy), [])
+            if town not in towns:
+                towns.append(town)
+                towns.sort(key=self.world.towns.index)
+        for x, y in set(self._town_cells(town, old_tiles)) | set(new_cells):
+            self.refresh_tile(x, y)
+
+    def remove_town(self, town):
+        cells = self._town_cells(town, town.tiles)
+        for key in {(x >> CHUNK_BITS, y >> CHUNK_BITS) for x, y in cells}:
+            towns = self.towns_by_chunk.get(key, [])
+            if town in towns: towns.remove(town)
+            if not towns: self.towns_by_chunk.pop(key, None)
+        for x, y in cells:
+            self.refresh_tile(x, y)
+
+    def rebuild(self):
+        self.chunks.clear()
+        self.towns_by_chunk.clear()
+        for town in self.world.towns: self.add_town(town)
+        for x, y in self.world.built_structures: self.refresh_tile(x, y)
+
+    # --- CONSULTAS POR RECTANGULO ---
+    def apply_walkable(self, walkable: bytearray, x0: int, y0: int, width: int, height: int):
+        """Sobrescribe una mascara de paso del escenario con las construcciones del rectangulo."""
+        chunk_keys = [(cx, cy) for cy in range(y0 >> CHUNK_BITS, ((y0 + height - 1) >> CHUNK_BITS) + 1)
+                      for cx in range(x0 >> CHUNK_BITS, ((x0 + width - 1) >> CHUNK_BITS) + 1)]
+        for cx, cy in chunk_keys:
+            chunk = self.chunks.get((cx, cy))
+            if chunk is None: continue
+            cx0, cy0 = cx << CHUNK_BITS, cy << CHUNK_BITS
+            xa, xb = max(x0, cx0), min(x0 + width, cx0 + CHUNK_SIZE)
+            ya, yb = max(y0, cy0), min(y0 + height, cy0 + CHUNK_SIZE)
+            if xa >= xb or ya >= yb: continue
+            codes = chunk.codes
+            for y in range(ya, yb):
+                row = (y - cy0) << CHUNK_BITS
+                out = (y - y0) * width - x0
+                for x in range(xa, xb):
+                    code = codes[row + x - cx0]
+                    if code: walkable[out + x] = 0 if code == SOLID else 1
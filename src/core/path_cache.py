@@ -0,0 +1,182 @@
+"""Rutas compartidas: A* ya resueltos, reutilizables por cualquiera que haga un viaje parecido.
+
+La clave es (celda de salida, celda de meta) cuantizadas a cuadros de quantum celdas: todos
+los que van a casa desde el mismo barrio comparten entrada. Al reutilizarla se empalma con
+un A* corto desde la salida real hasta la ruta guardada y desde su final hasta la meta real.
+Con quantum=1 solo acierta el mismo viaje exacto: la ruta es la que daría A* salvo que
+desde entonces se haya abierto paso (un puente puede acortarla; la guardada sigue valiendo).
+
+Tambien se recuerdan las busquedas fallidas, con la clave exacta: quien se queda quieto
+reintentando el mismo destino cada 2 segundos no repite 400 expansiones que van a fallar.
+
+Las rutas se guardan como un byte por paso (direccion) y se indexan por bloques de 16x16
+celdas, así que invalidar es preciso: una valla o un muro nuevo de un Town solo tira las
+rutas que pasan por esa celda, y una celda que se abre (un puente, un muro viejo que pasa a
+interior) solo los fallos cuya busqueda miró ese bloque. Cambiar de escenario (cueva) lo
+tira todo.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .pathfinding import BLOCK_BITS
+from .profiler import profiler
+
+QUANTUM = 8 # Celdas por lado del cuadro de salida y de meta
+CAPACITY = 4096 # Rutas guardadas como mucho (se tira la menos usada)
+STITCH_STEPS = 64 # Presupuesto de cada empalme: si no llega, A* completo
+
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_CODE = {d: i for i, d in enumerate(_DIRS)}
+
+class CachedPath:
+    """Ruta comprimida: salida, meta pedida, un byte por paso y lo que costó encontrarla."""
+    __slots__ = ("x", "y", "goal", "steps", "nodes", "blocks")
+
+    def __init__(self, path: List[Tuple[int, int]], goal: Tuple[int, int], nodes: int):
+        self.x, self.y = path[0]
+        self.goal = goal
+        self.steps = bytes(_CODE[(bx - ax, by - ay)] for (ax, ay), (bx, by) in zip(path, path[1:]))
+        self.nodes = nodes
+        self.blocks = {(x >> BLOCK_BITS, y >> BLOCK_BITS) for x, y in path}
+
+    def decode(self) -> List[Tuple[int, int]]:
+        x, y = self.x, self.y
+        path = [(x, y)]
+        for code in self.steps:
+            dx, dy = _DIRS[code]
+            x += dx; y += dy
+            path.append((x, y))
+        return path
+
+class PathCache:
+    """Rutas por (salida, meta) cuantizadas, con LRU y estadisticas de aciertos."""
+
+    def __init__(self, quantum: int = QUANTUM, capacity: int = CAPACITY):
+        self.quantum = quantum
+        self.capacity = capacity
+        self.entries: "OrderedDict[Tuple[int, int, int, int], CachedPath]" = OrderedDict()
+        self.by_block: Dict[Tuple[int, int], Set[Tuple[int, int, int, int]]] = {}
+        self.failures: "OrderedDict[Tuple[int, ...], Tuple[int, frozenset]]" = OrderedDict() # -> (nodos, bloques)
+        self.failures_by_block: Dict[Tuple[int, int], Set[Tuple[int, ...]]] = {}
+        self.hits = self.misses = self.stitch_failed = self.invalidated = 0
+        self.known_failures = 0 # Busquedas que ya se sabia que fallan
+        self.saved_nodes = 0 # Expansiones de A* ahorradas (coste original menos empalmes)
+
+    # Se guarda la configuracion, no las rutas: al cargar se vuelven a aprender
+    def __getstate__(self):
+        return {"quantum": self.quantum, "capacity": self.capacity}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _key(self, sx: int, sy: int, ex: int, ey: int) -> Tuple[int, int, int, int]:
+        q = self.quantum
+        return sx // q, sy // q, ex // q, ey // q
+
+    def lookup(self, pathfinder, start, end, max_steps: int = 400) -> Optional[List[Tuple[int, int]]]:
+        """Ruta de start a end a partir de una guardada ([] si se sabe que falla), o None (hay que buscarla)."""
+        sx, sy, ex, ey = int(start[0]), int(start[1]), int(end[0]), int(end[1])
+        failure = self.failures.get((sx, sy, ex, ey, max_steps))
+        if failure is not None:
+            self.known_failures += 1
+            self.saved_nodes += failure[0]
+            if profiler.enabled:
+                profiler.count("paths.known_failure")
+                profiler.count("paths.saved", failure[0])
+            return []
+        key = self._key(sx, sy, ex, ey)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if profiler.enabled: profiler.count("paths.miss")
+            return None
+        path = entry.decode()
+        cost = 0
+        if (sx, sy) in path: path = path[path.index((sx, sy)):] # Ya está sobre la ruta
+        else:
+            head, steps = pathfinder.search((sx, sy), path[0], STITCH_STEPS)
+            cost += steps
+            if not head: return self._stitch_failed()
+            path = head + path[1:]
+        if (ex, ey) != entry.goal:
+            if (ex, ey) in path: path = path[:path.index((ex, ey)) + 1]
+            else:
+                tail, steps = pathfinder.search(path[-1], (ex, ey), STITCH_STEPS)
+                cost += steps
+                if not tail: return self._stitch_failed()
+                path += tail[1:]
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.saved_nodes += max(0, entry.nodes - cost)
+        if profiler.enabled:
+            profiler.count("paths.hit")
+            profiler.count("paths.saved", max(0, entry.nodes - cost))
+        return path
+
+    def _stitch_failed(self):
+        self.stitch_failed += 1
+        if profiler.enabled: profiler.count("paths.stitch_failed")
+        return None
+
+    def store(self, start, end, path: List[Tuple[int, int]], nodes: int):
+        """Guarda la ruta que acaba de encontrar A* (nodes: expansiones que costó)."""
+        sx, sy, ex, ey = int(start[0]), int(start[1]), int(end[0]), int(end[1])
+        key = self._key(sx, sy, ex, ey)
+        if key in self.entries: self._evict(key)
+        entry = self.entries[key] = CachedPath(path, (ex, ey), nodes)
+        for block in entry.blocks: self.by_block.setdefault(block, set()).add(key)
+        while len(self.entries) > self.capacity: self._evict(next(iter(self.entries)))
+
+    def store_failure(self, start, end, max_steps: int, nodes: int, blocks: Iterable[Tuple[int, int]]):
+        """Guarda una busqueda fallida con los bloques de celdas que consultó."""
+        key = (int(start[0]), int(start[1]), int(end[0]), int(end[1]), max_steps)
+        blocks = frozenset(blocks)
+        if key in self.failures: self._evict_failure(key)
+        self.failures[key] = (nodes, blocks)
+        for block in blocks: self.failures_by_block.setdefault(block, set()).add(key)
+        while len(self.failures) > self.capacity: self._evict_failure(next(iter(self.failures)))
+
+    def _evict_failure(self, key):
+        for block in self.failures.pop(key)[1]:
+            keys = self.failures_by_block[block]
+            keys.discard(key)
+            if not keys: del self.failures_by_block[block]
+
+    def _evict(self, key):
+        entry = self.entries.pop(key)
+        for block in entry.blocks:
+            keys = self.by_block[block]
+            keys.discard(key)
+            if not keys: del self.by_block[block]
+
+    def cells_changed(self, blocked: Iterable[Tuple[int, int]] = (), opened: Iterable[Tuple[int, int]] = ()):
+        """Celdas que han dejado de ser (blocked) o pasado a ser (opened) transitables."""
+        by_block: Dict[Tuple[int, int], Set[Tuple[int, int]]] = {}
+        for x, y in blocked: by_block.setdefault((x >> BLOCK_BITS, y >> BLOCK_BITS), set()).add((x, y))
+        for block, cells in by_block.items():
+            for key in list(self.by_block.get(block, ())):
+                if not cells.isdisjoint(self.entries[key].decode()):
+                    self._evict(key)
+                    self.invalidated += 1
+        for block in {(x >> BLOCK_BITS, y >> BLOCK_BITS) for x, y in opened}:
+            for key in list(self.failures_by_block.get(block, ())):
+                self._evict_failure(key)
+                self.invalidated += 1
+
+    def clear(self):
+        self.invalidated += len(self.entries) + len(self.failures)
+        self.entries.clear()
+        self.by_block.clear()
+        self.failures.clear()
+        self.failures_by_block.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.known_failures + self.misses + self.stitch_failed
+        return {"entries": len(self.entries), "failures": len(self.failures), "hits": self.hits,
+                "known_failures": self.known_failures, "misses": self.misses,
+                "hit_rate": (self.hits + self.known_failures) / lookups if lookups else 0.0,
+                "stitch_failed": self.stitch_failed, "saved_nodes": self.saved_nodes,
+                "invalidated": self.invalidated}
+
+    def __len__(self) -> int:
+        return len(self.entries)
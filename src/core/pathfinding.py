@@ -1,24 +1,78 @@
 import heapq
 import math
+from .profiler import profiler
+
+BLOCK_BITS = 4 # Bloques de 16x16 celdas para consultar el terreno por lotes
+BLOCK_SIZE = 1 << BLOCK_BITS
+BLOCK_MASK = BLOCK_SIZE - 1
 
 class Pathfinder:
     def __init__(self, world_state):
         self.world_state = world_state
 
+    def _is_walkable(self, x, y, blocks):
+        """is_walkable sobre bloques pedidos de una vez a WorldState (memo por busqueda)."""
+        key = (x >> BLOCK_BITS, y >> BLOCK_BITS)
+        block = blocks.get(key)
+        if block is None:
+            if profiler.enabled: profiler.count("astar.blocks")
+            block = blocks[key] = self.world_state.get_walkable_window(
+                key[0] << BLOCK_BITS, key[1] << BLOCK_BITS, BLOCK_SIZE, BLOCK_SIZE)
+        return block[((y & BLOCK_MASK) << BLOCK_BITS) | (x & BLOCK_MASK)]
+
     def get_path(self, start, end, max_steps=400):
+        """Ruta de celdas de start a end (4 direcciones), o [] si no la encuentra en max_steps.
+
+        Si el mundo tiene campos de flujo (world.flows) y el destino tiene uno, se baja por él.
+        Si tiene cache de rutas (world.paths), se mira ahí y lo encontrado se guarda.
+        Con rutas jerarquicas (world.hpa), los viajes largos, o los cortos que agotan max_steps, van
+        por el grafo de clusters.
+        """
+        flows = self.world_state.flows
+        if flows is not None:
+            path = flows.path(self, start, end)
+            if path is not None: return path
+        paths = self.world_state.paths
+        if paths is not None:
+            path = paths.lookup(self, start, end, max_steps)
+            if path is not None: return path
+        if profiler.enabled: profiler.count("astar.calls")
+        blocks = {}
+        hpa = self.world_state.hpa
+        if hpa is not None and abs(int(start[0]) - int(end[0])) + abs(int(start[1]) - int(end[1])) > hpa.min_distance:
+            path, steps = self._hierarchical(hpa, start, end, blocks)
+        else:
+            path, steps = self.search(start, end, max_steps, blocks)
+            if not path and hpa is not None and steps >= max_steps: # Cerca pero con rodeo largo
+                path, more = self._hierarchical(hpa, start, end, blocks)
+                steps += more
+        if paths is not None:
+            if path: paths.store(start, end, path, steps)
+            else: paths.store_failure(start, end, max_steps, steps, blocks) # Lo consultado decide el fallo
+        return path
+
+    def free_goal(self, ex, ey, blocks):
+        """La meta, o si es sólida el punto libre más cercano (None si no hay)."""
+        if self._is_walkable(ex, ey, blocks): return ex, ey
+        for r in range(1, 6):
+            for dx, dy in [(-r,0), (r,0), (0,-r), (0,r)]:
+                if self._is_walkable(ex+dx, ey+dy, blocks):
+                    return ex+dx, ey+dy
+        return None
+
+    def _hierarchical(self, hpa, start, end, blocks):
+        goal = self.free_goal(int(end[0]), int(end[1]), blocks)
+        if goal is None: return [], 0
+        return hpa.search(self.world_state, (int(start[0]), int(start[1])), goal, blocks)
+
+    def search(self, start, end, max_steps=400, blocks=None):
+        """A* sin cache: (ruta, nodos expandidos). blocks: memo de bloques consultados."""
         sx, sy = int(start[0]), int(start[1])
         ex, ey = int(end[0]), int(end[1])
-        
-        # Si la meta es sólida, buscar el punto libre más cercano
-        if not self.world_state.is_walkable(ex, ey):
-            found = False
-            for r in range(1, 6):
-                for dx, dy in [(-r,0), (r,0), (0,-r), (0,r)]:
-                    if self.world_state.is_walkable(ex+dx, ey+dy):
-                        ex, ey = ex+dx, ey+dy
-                        found = True; break
-                if found: break
-            if not found: return []
+        if blocks is None: blocks = {}
+        goal = self.free_goal(ex, ey, blocks)
+        if goal is None: return [], 0
+        ex, ey = goal
 
         open_set = []
         heapq.heappush(open_set, (0, (sx, sy)))
@@ -30,12 +84,13 @@ class Pathfinder:
             steps += 1
             current = heapq.heappop(open_set)[1]
             if current == (ex, ey):
-                return self._reconstruct_path(came_from, current)
+                if profiler.enabled: profiler.count("astar.nodes", steps)
+                return self._reconstruct_path(came_from, current), steps
             
             # ESTRICTAMENTE 4 DIRECCIONES
             for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
                 neighbor = (current[0] + dx, current[1] + dy)
-                if not self.world_state.is_walkable(neighbor[0], neighbor[1]):
+                if not self._is_walkable(neighbor[0], neighbor[1], blocks):
                     continue
                     
                 tentative_g = g_score[current] + 1
@@ -45,7 +100,10 @@ class Pathfinder:
                     priority = tentative_g + abs(neighbor[0]-ex) + abs(neighbor[1]-ey)
                     heapq.heappush(open_set, (priority, neighbor))
                     
-        return []
+        if profiler.enabled:
+            profiler.count("astar.nodes", steps)
+            profiler.count("astar.failed")
+        return [], steps
 
     def _reconstruct_path(self, came_from, current):
         path = [current]
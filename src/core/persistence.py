@@ -8,7 +8,8 @@ SAVE_DIR = "saves"
 
 class PersistenceManager:
     @staticmethod
-    def save_game(world_state: WorldState, filename: str = None):
+    def save_path(filename: str = None) -> str:
+        """Ruta de guardado en SAVE_DIR (con fecha y hora si no hay nombre)."""
         if not os.path.exists(SAVE_DIR):
             os.makedirs(SAVE_DIR)
             
@@ -16,12 +17,27 @@ class PersistenceManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"save_{timestamp}.dat"
             
-        filepath = os.path.join(SAVE_DIR, filename)
+        return os.path.join(SAVE_DIR, filename)
+
+    @staticmethod
+    def write(filepath: str, world_state: WorldState = None, data: bytes = None):
+        """Comprime y escribe el mundo (o sus bytes ya serializados con pickle).
+
+        Escribe a un temporal y lo renombra: un guardado a medias no pisa la partida anterior.
+        """
+        tmp = filepath + ".tmp"
+        with gzip.open(tmp, 'wb') as f:
+            if data is None: pickle.dump(world_state, f)
+            else: f.write(data)
+        os.replace(tmp, filepath)
+
+    @staticmethod
+    def save_game(world_state: WorldState, filename: str = None):
+        filepath = PersistenceManager.save_path(filename)
         
         try:
             # Serializamos y comprimimos el estado completo
-            with gzip.open(filepath, 'wb') as f:
-                pickle.dump(world_state, f)
+            PersistenceManager.write(filepath, world_state)
             print(f"Game saved to {filepath}")
             return filepath
         except Exception as e:
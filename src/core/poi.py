@@ -0,0 +1,83 @@
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from .scenarios.base import BaseScenario
+
+Kinds = Union[None, str, Iterable[str]] # Un tipo, varios, o None para todos
+
+class PointOfInterest(NamedTuple):
+    kind: str   # "RUIN", "CAVE" (entrada), "EXIT" (portal de vuelta)...
+    x: int      # Centro
+    y: int
+    radius: int # Huella (distancia de Chebyshev) en la que se puede interactuar
+
+    def covers(self, x: int, y: int) -> bool:
+        return abs(x - self.x) <= self.radius and abs(y - self.y) <= self.radius
+
+class PoiIndex:
+    """Indice perezoso de puntos de interes de un escenario, por macro-celdas.
+
+    Cada macro-celda se evalua una sola vez (un hash) y se recuerda, asi que las
+    consultas cuestan lo que el numero de macro-celdas que tocan, no sus celdas.
+    """
+    MAX_RADIUS = 2 # Huella maxima de un POI: limita cuantas macro-celdas vecinas mirar en at()
+
+    def __init__(self, scenario: BaseScenario):
+        self.scenario = scenario
+        self.cell_size = scenario.poi_cell_size
+        self.cells: Dict[Tuple[int, int], Tuple[PointOfInterest, ...]] = {}
+
+    def get_cell(self, gx: int, gy: int) -> Tuple[PointOfInterest, ...]:
+        pois = self.cells.get((gx, gy))
+        if pois is None:
+            pois = self.cells[(gx, gy)] = tuple(PointOfInterest(*p) for p in self.scenario.get_macro_pois(gx, gy))
+        return pois
+
+    def _kinds(self, kind: Kinds):
+        return None if kind is None else ({kind} if isinstance(kind, str) else set(kind))
+
+    def at(self, x: float, y: float, kind: Kinds = None) -> Optional[PointOfInterest]:
+        """POI cuya huella contiene la celda (x, y)."""
+        bx, by, size, r = int(x), int(y), self.cell_size, self.MAX_RADIUS
+        kinds = self._kinds(kind)
+        for gy in range((by - r) // size, (by + r) // size + 1):
+            for gx in range((bx - r) // size, (bx + r) // size + 1):
+                for poi in self.get_cell(gx, gy):
+                    if poi.covers(bx, by) and (kinds is None or poi.kind in kinds): return poi
+        return None
+
+    def in_rect(self, x0: int, y0: int, width: int, height: int, kind: Kinds = None) -> List[PointOfInterest]:
+        """POIs cuyo centro cae en [x0, x0+width) x [y0, y0+height)."""
+        size, found, kinds = self.cell_size, [], self._kinds(kind)
+        for gy in range(y0 // size, (y0 + height - 1) // size + 1):
+            for gx in range(x0 // size, (x0 + width - 1) // size + 1):
+                for poi in self.get_cell(gx, gy):
+                    if x0 <= poi.x < x0 + width and y0 <= poi.y < y0 + height and (kinds is None or poi.kind in kinds):
+                        found.append(poi)
+        return found
+
+    def nearest(self, x: float, y: float, kind: Kinds = None,
+                max_cells: int = 64) -> Optional[PointOfInterest]:
+        """POI más cercano (distancia euclidea al centro), buscando en anillos de macro-celdas."""
+        size, kinds = self.cell_size, self._kinds(kind)
+        gx0, gy0 = int(x) // size, int(y) // size
+        best, best_dist = None, math.inf
+        for ring in range(max_cells + 1):
+            for gx, gy in self._ring(gx0, gy0, ring):
+                for poi in self.get_cell(gx, gy):
+                    if kinds is not None and poi.kind not in kinds: continue
+                    dist = math.hypot(poi.x - x, poi.y - y)
+                    if dist < best_dist: best, best_dist = poi, dist
+            # Todo lo que quede en anillos exteriores está al menos a ring * size
+            if best_dist <= ring * size: break
+        return best
+
+    def _ring(self, gx: int, gy: int, ring: int):
+        if ring == 0:
+            yield gx, gy
+            return
+        for dx in range(-ring, ring + 1):
+            yield gx + dx, gy - ring
+            yield gx + dx, gy + ring
+        for dy in range(-ring + 1, ring):
+            yield gx - ring, gy + dy
+            yield gx + ring, gy + dy
@@ -0,0 +1,301 @@
+"""Poblacion en columnas (NumPy): metabolismo y movimiento de muchas personas por lotes.
+
+Cada PooledPerson es una Person normal para el resto del juego (IA, tiendas, eventos,
+renderer), pero su estado caliente vive en arrays de la Population. El motor llama a
+Population.step una vez por frame en lugar de Person.update persona a persona; solo las
+decisiones de IA (_logic_tick), el calculo de rutas y la construccion de caminos siguen
+siendo codigo Python por entidad.
+"""
+from typing import Dict, List
+
+try:
+    import numpy as np
+except ImportError: # NumPy es opcional: sin el, se usan Person normales
+    np = None
+
+from .entities.person import Person
+from .occupancy import FREE, SOLID, INTERIOR
+from .pathfinding import Pathfinder
+from .profiler import profiler
+from .terrain_cache import CHUNK_BITS, CHUNK_MASK
+
+FLOAT_COLUMNS = ("x", "y", "energy", "stress", "speed", "base_speed", "action_timer", "path_retry_timer")
+LABEL_COLUMNS = ("state", "current_biome") # Cadenas internadas en Population.labels
+PATH_COLUMNS = ("path_start", "path_len", "cursor") # Ruta de cada fila dentro de path_x/path_y
+COLUMN_FIELDS = frozenset(FLOAT_COLUMNS + LABEL_COLUMNS + ("path", "_pop", "_slot"))
+
+def _float_column(name: str):
+    def get(self):
+        return self._pop.columns[name][self._slot].item()
+    def set(self, value):
+        self._pop.columns[name][self._slot] = value
+    return property(get, set)
+
+def _label_column(name: str):
+    def get(self):
+        return self._pop.labels[self._pop.columns[name][self._slot]]
+    def set(self, value):
+        self._pop.columns[name][self._slot] = self._pop.label(value)
+    return property(get, set)
+
+class PooledPerson(Person):
+    """Person cuyo estado caliente vive en una Population (ver Population.spawn)."""
+    __slots__ = ("_pop", "_slot")
+    pooled = True
+
+    def __init__(self, population: "Population", name: str, x: float = 0.0, y: float = 0.0,
+                 goal: str = "BUILDER", traits: list = None, rng=None):
+        self._pop = population
+        self._slot = population._allocate(self)
+        super().__init__(name, x, y, goal, traits, rng)
+
+    @property
+    def path(self) -> list:
+        """Nodos que quedan de la ruta (copia: para cambiarla hay que asignarla)."""
+        return self._pop.get_path(self._slot)
+
+    @path.setter
+    def path(self, value):
+        self._pop.set_path(self._slot, value)
+
+    # Las columnas se guardan con la Population; aqui solo el resto de campos
+    def __getstate__(self):
+        state = {"_pop": self._pop, "_slot": self._slot}
+        for name in self._fields():
+            if name not in COLUMN_FIELDS and name not in state and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        self._pop, self._slot = state["_pop"], state["_slot"]
+        super().__setstate__({k: v for k, v in state.items() if k not in COLUMN_FIELDS})
+
+    def update(self, dt: float, biome: str = "MEADOW", scenario=None, world_state=None):
+        # Una sola persona por la misma ruta que el lote (el bioma se consulta dentro)
+        if world_state is None: return super().update(dt, biome, scenario, world_state)
+        self._pop.step(dt, world_state, np.array([self._slot]))
+
+for _name in FLOAT_COLUMNS:
+    setattr(PooledPerson, _name, _float_column(_name))
+for _name in LABEL_COLUMNS:
+    setattr(PooledPerson, _name, _label_column(_name))
+
+class Population:
+    """Almacen columnar de PooledPerson: un array por campo, una fila por persona."""
+
+    def __init__(self, capacity: int = 1024):
+        if np is None: raise ImportError("Population necesita NumPy")
+        self.capacity = capacity
+        self.count = 0
+        self.columns: Dict[str, "np.ndarray"] = {name: np.zeros(capacity) for name in FLOAT_COLUMNS}
+        for name in LABEL_COLUMNS + PATH_COLUMNS: self.columns[name] = np.zeros(capacity, np.int64)
+        self.members: List[PooledPerson] = [] # Fila -> fachada
+        self.labels: List[str] = []
+        self.label_ids: Dict[str, int] = {}
+        self._terrain_labels = (None, None) # (tabla de biomas, array de etiquetas)
+        # Nodos de todas las rutas, uno tras otro; las rutas viejas se compactan de vez en cuando
+        self.path_x = np.zeros(capacity * 16, np.int32)
+        self.path_y = np.zeros(capacity * 16, np.int32)
+        self.path_used = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def label(self, value: str) -> int:
+        code = self.label_ids.get(value)
+        if code is None:
+            code = self.label_ids[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+    # --- ALTAS Y BAJAS ---
+    def spawn(self, name: str, x: float = 0.0, y: float = 0.0, goal: str = "BUILDER",
+              traits: list = None, rng=None) -> PooledPerson:
+        """Crea una persona en la poblacion (se simula en Population.step; añadir con add_entity)."""
+        return PooledPerson(self, name, x, y, goal, traits, rng)
+
+    def _allocate(self, person: PooledPerson) -> int:
+        if self.count == self.capacity: self._grow(self.capacity * 2)
+        slot = self.count
+        self.count += 1
+        for column in self.columns.values(): column[slot] = 0
+        self.members.append(person)
+        return slot
+
+    def _grow(self, capacity: int):
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def release(self, person: PooledPerson):
+        """Baja de una persona: la ultima fila ocupa su hueco."""
+        slot, last = person._slot, self.count - 1
+        if self.members[slot] is not person: return
+        if slot != last:
+            for column in self.columns.values(): column[slot] = column[last]
+            moved = self.members[slot] = self.members[last]
+            moved._slot = slot
+        self.members.pop()
+        self.count -= 1
+
+    # --- RUTAS ---
+    def get_path(self, slot: int) -> list:
+        c = self.columns
+        start, end = c["path_start"][slot] + c["cursor"][slot], c["path_start"][slot] + c["path_len"][slot]
+        return list(zip(self.path_x[start:end].tolist(), self.path_y[start:end].tolist()))
+
+    def set_path(self, slot: int, path):
+        path = list(path)
+        c = self.columns
+        c["cursor"][slot] = c["path_len"][slot] = 0
+        if not path: return
+        if self.path_used + len(path) > len(self.path_x): self._compact(len(path))
+        start = c["path_start"][slot] = self.path_used
+        c["path_len"][slot] = len(path)
+        self.path_used += len(path)
+        xs, ys = zip(*path)
+        self.path_x[start:self.path_used] = xs
+        self.path_y[start:self.path_used] = ys
+
+    def _clear_paths(self, rows):
+        self.columns["cursor"][rows] = 0
+        self.columns["path_len"][rows] = 0
+
+    def _compact(self, extra: int):
+        """Junta los nodos pendientes al principio del buffer (y lo agranda si no basta)."""
+        c, n = self.columns, self.count
+        lengths = c["path_len"][:n] - c["cursor"][:n]
+        live = int(lengths.sum())
+        size = len(self.path_x)
+        while live + extra > size // 2: size *= 2
+        starts = np.cumsum(lengths) - lengths
+        # Indice de origen de cada nodo vivo, ruta a ruta
+        sources = np.repeat(c["path_start"][:n] + c["cursor"][:n] - starts, lengths) + np.arange(live)
+        new_x, new_y = np.zeros(size, np.int32), np.zeros(size, np.int32)
+        new_x[:live], new_y[:live] = self.path_x[sources], self.path_y[sources]
+        c["path_start"][:n], c["path_len"][:n], c["cursor"][:n] = starts, lengths, 0
+        self.path_x, self.path_y, self.path_used = new_x, new_y, live
+
+    # --- CONSULTAS AL MUNDO POR LOTES ---
+    def _sample(self, world, x, y, full: bool = True):
+        """(transitable, bioma del terreno, codigo de ocupacion, construccion) por persona.
+
+        Las celdas se agrupan por chunk y cada chunk se consulta una vez por lote.
+        """
+        count = len(x)
+        walkable = np.ones(count, bool)
+        codes = np.zeros(count, np.uint8)
+        occ = np.zeros(count, np.uint8)
+        built = np.zeros(count, bool)
+        if not count: return walkable, codes, occ, built
+        bx, by = np.trunc(x).astype(np.int64), np.trunc(y).astype(np.int64) # int(), como el resto del mundo
+        cx, cy = bx >> CHUNK_BITS, by >> CHUNK_BITS
+        local = ((by & CHUNK_MASK) << CHUNK_BITS) | (bx & CHUNK_MASK)
+        keys = (cx << 32) | (cy & 0xFFFFFFFF)
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+
+        terrain, occupancy = world.terrain, world.occupancy.chunks
+        solid = np.zeros(count, np.uint8)
+        for group in np.split(order, bounds):
+            key = (int(cx[group[0]]), int(cy[group[0]]))
+            cells = local[group]
+            chunk = terrain.get_chunk(*key)
+            solid[group] = np.frombuffer(chunk.solid, np.uint8)[cells]
+            if full: codes[group] = np.frombuffer(chunk.codes, np.uint8)[cells]
+            placed = occupancy.get(key)
+            if placed is not None:
+                occ[group] = np.frombuffer(placed.codes, np.uint8)[cells]
+                if full: built[group] = np.frombuffer(placed.built, np.uint8)[cells] != 0
+        walkable = np.where(occ != FREE, occ != SOLID, solid == 0)
+        return walkable, codes, occ, built
+
+    def _biome_labels(self, world, codes, occ):
+        names, table = self._terrain_labels
+        if names is not world.terrain.biome_names:
+            names = world.terrain.biome_names
+            table = np.array([self.label(name) for name in names], np.int64)
+            self._terrain_labels = (names, table)
+        return np.where(occ == INTERIOR, self.label("INTERIOR"), table[codes])
+
+    # --- SIMULACION POR LOTES ---
+    def step(self, dt: float, world, idx=None):
+        """Person.update para todas las filas (o las de idx), fase a fase."""
+        rows = np.arange(self.count) if idx is None else idx
+        sel = slice(0, self.count) if idx is None else idx # Con slice, las columnas se leen sin copia
+        if not len(rows): return
+        c, members = self.columns, self.members
+        x, y = c["x"][sel].copy(), c["y"][sel].copy()
+        old_x, old_y = x.copy(), y.copy()
+
+        # 0. Bioma bajo los pies (como WorldState.get_biome_at)
+        walkable, codes, occ, built = self._sample(world, x, y)
+        biome = self._biome_labels(world, codes, occ)
+        if profiler.enabled: profiler.count("world.biome", len(rows))
+        c["current_biome"][sel] = biome
+
+        # 1. SEGURIDAD: Si está en terreno prohibido, rescatarlo
+        stuck = np.flatnonzero(~walkable)
+        if len(stuck):
+            x[stuck] = 0.0; y[stuck] = 0.0 # Rescate a base
+            self._clear_paths(rows[stuck])
+            built[stuck] = self._sample(world, x[stuck], y[stuck])[3]
+
+        # 2. METABOLISMO
+        rest = (c["state"][sel] == self.label("RESTING")) | (biome == self.label("INTERIOR"))
+        energy, stress = c["energy"][sel], c["stress"][sel]
+        c["energy"][sel] = np.where(rest, np.minimum(100.0, energy + 15.0 * dt), np.maximum(0.0, energy - 0.5 * dt))
+        c["stress"][sel] = np.where(rest, np.maximum(0.0, stress - 10.0 * dt), stress)
+        speed = c["base_speed"][sel] * np.where(rest, 0.5, np.where(built, 2.0, 1.0))
+        c["speed"][sel] = speed
+
+        # 3. MOVIMIENTO ORTOGONAL ESTRICTO
+        retry = c["path_retry_timer"][sel]
+        retry = np.where(retry > 0, retry - dt, retry)
+        c["path_retry_timer"][sel] = retry
+        for k in np.flatnonzero((c["cursor"][sel] >= c["path_len"][sel]) & (retry <= 0)):
+            person = members[rows[k]]
+            if not person.pathfinder: person.pathfinder = Pathfinder(world)
+            path = person.pathfinder.get_path((x[k].item(), y[k].item()), (person.target_x, person.target_y))
+            if path: self.set_path(rows[k], path)
+            else: c["path_retry_timer"][rows[k]] = 2.0 # Si falla, esperar 2 segundos
+
+        cursor = c["cursor"][sel]
+        active = np.flatnonzero(cursor < c["path_len"][sel])
+        node = c["path_start"][rows[active]] + cursor[active]
+        dx = self.path_x[node] - x[active]
+        dy = self.path_y[node] - y[active]
+        arrived = np.sqrt(dx * dx + dy * dy) < 0.2
+        c["cursor"][rows[active[arrived]]] += 1
+
+        moving, dx, dy = active[~arrived], dx[~arrived], dy[~arrived]
+        step = speed[moving] * dt
+        along_x = np.abs(dx) > 0.01 # FORZAR MOVIMIENTO POR EJES (Garantiza caminos rectos)
+        along_y = ~along_x & (np.abs(dy) > 0.01)
+        new_x = np.where(along_x, x[moving] + np.copysign(np.minimum(step, np.abs(dx)), dx), x[moving])
+        new_y = np.where(along_y, y[moving] + np.copysign(np.minimum(step, np.abs(dy)), dy), y[moving])
+        moved = along_x | along_y
+        moving, new_x, new_y = moving[moved], new_x[moved], new_y[moved]
+        free = self._sample(world, new_x, new_y, full=False)[0]
+        x[moving[free]], y[moving[free]] = new_x[free], new_y[free]
+        self._clear_paths(rows[moving[~free]]) # Re-ruta
+        c["x"][sel], c["y"][sel] = x, y
+
+        stepped = moving[free]
+        for k in stepped[c["state"][rows[stepped]] == self.label("GOING_HOME")]:
+            members[rows[k]]._build_road_step(world)
+
+        # 4. LÓGICA DE IA
+        timer = c["action_timer"][sel] + dt
+        due = timer > 1.0 # Ritmo razonable
+        timer[due] = 0.0
+        c["action_timer"][sel] = timer
+        for i in rows[due]: members[i]._logic_tick(world)
+
+        # La rejilla espacial solo se toca para quien ha cambiado de celda
+        spatial = world.spatial
+        size = spatial.cell_size
+        changed = ((old_x // size) != (x // size)) | ((old_y // size) != (y // size))
+        for i in rows[changed]: spatial.move(members[i])
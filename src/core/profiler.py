@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILE_DIR = "profiles"
+BUCKETS = 24 # Cubos log2 en microsegundos: el i cubre [2^(i-1), 2^i), hasta ~8 s
+
+class Histogram:
+    """Tiempos en cubos de potencias de 2 (microsegundos): media, máximo y percentiles aproximados."""
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+        self.buckets[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, q: float) -> float:
+        """Limite superior (en segundos) del cubo donde cae el percentil q."""
+        if not self.count: return 0.0
+        seen, target = 0, q * self.count
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target: return min(self.max, (1 << i) / 1e6)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.count, "total_ms": self.total * 1000,
+                "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "max_ms": self.max * 1000, "p50_ms": self.percentile(0.5) * 1000,
+                "p95_ms": self.percentile(0.95) * 1000}
+
+class Profiler:
+    """Contadores e histogramas de tiempos del bucle. Apagado por defecto.
+
+    Los puntos calientes comprueban `profiler.enabled` antes de medir nada, así que
+    apagado cuesta una lectura de atributo.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.frames = 0
+        self.started = time.perf_counter()
+
+    def enable(self, reset: bool = True):
+        if reset: self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def toggle(self) -> bool:
+        if self.enabled: self.disable()
+        else: self.enable()
+        return self.enabled
+
+    # --- REGISTRO (llamar solo con enabled) ---
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None: histogram = self.histograms[name] = Histogram()
+        histogram.add(seconds)
+
+    def frame(self):
+        self.frames += 1
+
+    # --- CONSULTA Y VOLCADO ---
+    def snapshot(self) -> Dict:
+        elapsed = time.perf_counter() - self.started
+        return {"frames": self.frames, "elapsed_s": elapsed,
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: h.summary() for name, h in sorted(self.histograms.items())}}
+
+    def lines(self, prefix: Optional[str] = None) -> List[str]:
+        """Resumen legible (para el overlay): tiempos por fase y contadores por frame."""
+        frames = max(1, self.frames)
+        out = []
+        for name, h in sorted(self.histograms.items()):
+            if prefix and not name.startswith(prefix): continue
+            out.append(f"{name:<18}{h.total / max(1, h.count) * 1000:7.2f} {h.percentile(0.95) * 1000:7.2f} {h.max * 1000:7.1f}")
+        for name, value in sorted(self.counters.items()):
+            if prefix and not name.startswith(prefix): continue
+            out.append(f"{name:<18}{value / frames:10.1f}/frame")
+        return out
+
+    def dump(self, filename: Optional[str] = None, data: Optional[Dict] = None) -> Optional[str]:
+        """Vuelca el perfil (o un snapshot() ya tomado) a JSON o CSV (segun la extension) en PROFILE_DIR."""
+        if not os.path.exists(PROFILE_DIR):
+            os.makedirs(PROFILE_DIR)
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"profile_{timestamp}.json"
+        filepath = os.path.join(PROFILE_DIR, filename)
+        if data is None: data = self.snapshot()
+        try:
+            if filepath.endswith(".csv"):
+                with open(filepath, "w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["kind", "name", "count", "total_ms", "avg_ms", "max_ms", "p50_ms", "p95_ms"])
+                    writer.writerow(["frames", "frames", data["frames"], data["elapsed_s"] * 1000, "", "", "", ""])
+                    for name, value in data["counters"].items():
+                        writer.writerow(["counter", name, value, "", "", "", "", ""])
+                    for name, s in data["histograms"].items():
+                        writer.writerow(["timer", name, s["count"], f"{s['total_ms']:.3f}", f"{s['avg_ms']:.4f}",
+                                         f"{s['max_ms']:.3f}", f"{s['p50_ms']:.3f}", f"{s['p95_ms']:.3f}"])
+            else:
+                with open(filepath, "w") as f:
+                    json.dump(data, f, indent=2)
+            return filepath
+        except OSError as e:
+            print(f"Failed to dump profile: {e}")
+            return None
+
+profiler = Profiler()
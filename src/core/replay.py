@@ -0,0 +1,159 @@
+"""Grabacion y repeticion de partidas sin ventana: semilla + entradas -> el mismo mundo.
+
+Un Recorder crea el mundo desde (escenario, semilla), aplica las entradas como comandos y
+anota en que frame se aplico cada una. replay() vuelve a construir el mundo con la misma
+semilla, repite los comandos en los mismos frames con el mismo dt fijo y compara el
+state_hash de cada punto de control.
+"""
+import hashlib
+import json
+from array import array
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .state import WorldState
+from .engine import SimulationEngine
+from .entities.base import Entity
+from .entities.person import Person
+from .entities.shop import Shop
+from .entities.town import Town
+from .entities.components import Path
+from .scenarios.nature import NatureScenario
+from .scenarios.urban import UrbanScenario
+from .scenarios.cave import CaveScenario
+from . import population
+
+SCENARIOS = {cls.__name__: cls for cls in (NatureScenario, UrbanScenario, CaveScenario)}
+_SKIP_FIELDS = frozenset(("id", "rng", "pathfinder", "world", "_pop", "_slot"))
+
+# --- HUELLA DEL ESTADO ---
+def _plain(value):
+    """Valor comparable y estable entre procesos (sin ids ni referencias a objetos)."""
+    if isinstance(value, Entity): return value.name
+    if isinstance(value, (int, float)) and not isinstance(value, bool): return float(value) # 100 == 100.0 (columnas)
+    if isinstance(value, Enum): return value.value
+    if isinstance(value, (array, Path, list, tuple)): return tuple(_plain(v) for v in value)
+    if isinstance(value, dict): return tuple(sorted((repr(k), _plain(v)) for k, v in value.items()))
+    return value
+
+def _entity_key(entity: Entity) -> Tuple:
+    kind = "Person" if isinstance(entity, Person) else type(entity).__name__ # PooledPerson == Person
+    fields = tuple(_plain(getattr(entity, name, None)) for name in entity._fields() if name not in _SKIP_FIELDS)
+    return (kind, fields, entity.rng.state if entity.rng is not None else None)
+
+def state_hash(world: WorldState) -> str:
+    """Huella del mundo: reloj, entidades (en orden de alta), construcciones y streams."""
+    digest = hashlib.blake2b(digest_size=16)
+    rng = world.rng
+    digest.update(repr((world.tick_count, world.time_of_day, world.scenario.cache_key(), rng.seed, rng.spawned,
+                        sorted((name, s.state) for name, s in rng.streams.items()))).encode())
+    for entity in world.entities.values():
+        digest.update(repr(_entity_key(entity)).encode())
+    digest.update(repr(sorted((pos, _plain(data)) for pos, data in world.built_structures.items())).encode())
+    return digest.hexdigest()
+
+# --- COMANDOS (toda entrada externa al mundo pasa por aqui) ---
+def _move(world: WorldState, name: str, x: float, y: float):
+    for entity in world.entities.values():
+        if entity.name == name:
+            entity.x, entity.y = x, y
+            world.spatial.move(entity)
+            return
+
+COMMANDS: Dict[str, Callable] = {
+    "spawn_person": lambda world, name, x, y: world.spawn_person(name, x, y),
+    "spawn_wolf": lambda world, name, x, y: world.spawn_wolf(name, x, y),
+    "add_shop": lambda world, x, y: world.add_entity(Shop(x, y)),
+    "add_town": lambda world, name, x, y, owner: world.add_entity(Town(name, x, y, owner_name=owner)),
+    "build": lambda world, x, y, kind: world.add_structure(x, y, kind),
+    "move": _move,
+}
+
+class Recording:
+    """Lo necesario para repetir una partida: escenario, semilla, dt, entradas y puntos de control."""
+
+    def __init__(self, scenario: str, seed: int, dt: float, pooled: bool = False):
+        self.scenario = scenario
+        self.seed = seed
+        self.dt = dt
+        self.pooled = pooled
+        # seq ordena lo ocurrido dentro de un mismo frame (entradas y puntos de control)
+        self.inputs: List[Tuple[int, int, str, list]] = []    # (frame, seq, comando, argumentos)
+        self.checkpoints: List[Tuple[int, int, int, str]] = [] # (frame, seq, tick, state_hash)
+
+    def next_seq(self) -> int:
+        return len(self.inputs) + len(self.checkpoints)
+
+    def to_dict(self) -> Dict:
+        return {"scenario": self.scenario, "seed": self.seed, "dt": self.dt, "pooled": self.pooled,
+                "inputs": self.inputs, "checkpoints": self.checkpoints}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Recording":
+        recording = cls(data["scenario"], data["seed"], data["dt"], data.get("pooled", False))
+        recording.inputs = [tuple(item) for item in data["inputs"]]
+        recording.checkpoints = [tuple(item) for item in data["checkpoints"]]
+        return recording
+
+    def save(self, path: str):
+        with open(path, "w") as f: json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path) as f: return cls.from_dict(json.load(f))
+
+def new_engine(scenario: str, seed: int, dt: float, pooled: bool = False) -> SimulationEngine:
+    world = WorldState(SCENARIOS[scenario](seed=seed), population=population.Population() if pooled else None,
+                       seed=seed)
+    engine = SimulationEngine(world)
+    engine.fixed_dt = dt
+    return engine
+
+class Recorder:
+    """Motor sin ventana que anota las entradas que recibe (ver Recording)."""
+
+    def __init__(self, scenario: str = "NatureScenario", seed: int = 1, dt: Optional[float] = None,
+                 pooled: bool = False):
+        self.engine = new_engine(scenario, seed, dt or 1.0 / 15, pooled)
+        self.world = self.engine.world_state
+        self.recording = Recording(scenario, seed, self.engine.fixed_dt, pooled)
+        self.frame = 0
+
+    def apply(self, command: str, *args):
+        COMMANDS[command](self.world, *args)
+        self.recording.inputs.append((self.frame, self.recording.next_seq(), command, list(args)))
+
+    def step(self, frames: int = 1):
+        self.engine.step(frames)
+        self.frame += frames
+
+    def checkpoint(self) -> str:
+        digest = state_hash(self.world)
+        self.recording.checkpoints.append((self.frame, self.recording.next_seq(), self.world.tick_count, digest))
+        return digest
+
+def replay(recording: Recording, frames: Optional[int] = None) -> Tuple[SimulationEngine, List[Tuple]]:
+    """Repite la grabacion hasta frames (por defecto, el último punto de control).
+
+    Devuelve el motor y las discrepancias [(frame, tick, esperado, obtenido)]; vacia si todo coincide.
+    """
+    engine = new_engine(recording.scenario, recording.seed, recording.dt, recording.pooled)
+    world = engine.world_state
+    if frames is None: frames = max([item[0] for item in recording.checkpoints] + [0])
+    timeline = sorted([(frame, seq, command, args) for frame, seq, command, args in recording.inputs] +
+                      [(frame, seq, None, (tick, digest)) for frame, seq, tick, digest in recording.checkpoints],
+                      key=lambda item: item[:2])
+    mismatches = []
+    i = 0
+    for frame in range(frames + 1):
+        while i < len(timeline) and timeline[i][0] == frame:
+            _, _, command, args = timeline[i]
+            i += 1
+            if command is not None:
+                COMMANDS[command](world, *args)
+                continue
+            tick, expected = args
+            actual = state_hash(world)
+            if actual != expected or world.tick_count != tick: mismatches.append((frame, tick, expected, actual))
+        if frame < frames: engine.step()
+    return engine, mismatches
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Dict, Sequence
+
+_MASK = (1 << 64) - 1
+
+def derive_seed(seed, *labels) -> int:
+    """Semilla de 64 bits para (seed, etiquetas): estable entre ejecuciones, a diferencia de hash()."""
+    key = ":".join(map(str, (seed,) + labels)).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+class Stream:
+    """Generador splitmix64: el estado es un solo entero (cabe uno por entidad sin pesar).
+
+    Ofrece el subconjunto de random.Random que usa el juego: random, uniform, randint y choice.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int = 0):
+        self.state = seed & _MASK
+
+    def _next(self) -> int:
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & _MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        return z ^ (z >> 31)
+
+    def random(self) -> float:
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def uniform(self, a: float, b: float) -> float:
+        return a + (b - a) * self.random()
+
+    def randint(self, a: int, b: int) -> int:
+        return a + self._next() % (b - a + 1)
+
+    def choice(self, seq: Sequence):
+        if not seq: raise IndexError("Cannot choose from an empty sequence")
+        return seq[self._next() % len(seq)]
+
+    def __repr__(self):
+        return f"Stream({self.state:#018x})"
+
+class WorldRng:
+    """Jerarquía de generadores de un mundo: uno por subsistema y uno por entidad.
+
+    Todos salen de la misma semilla, así que dos mundos con la misma semilla (y las mismas
+    entradas) evolucionan igual; cada stream es independiente, de modo que el orden en que
+    se recorren las entidades no cambia lo que le toca a cada una.
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.streams: Dict[str, Stream] = {}
+        self.spawned = 0 # Entidades que han recibido stream (su ordinal deriva la semilla)
+
+    def stream(self, name: str) -> Stream:
+        stream = self.streams.get(name)
+        if stream is None: stream = self.streams[name] = Stream(derive_seed(self.seed, "system", name))
+        return stream
+
+    def spawn(self) -> Stream:
+        """Stream para la siguiente entidad del mundo."""
+        self.spawned += 1
+        return Stream(derive_seed(self.seed, "entity", self.spawned))
+
+    def __repr__(self):
+        return f"<WorldRng seed={self.seed} streams={len(self.streams)} spawned={self.spawned}>"
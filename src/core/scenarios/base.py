@@ -1,22 +1,135 @@
-from typing import Dict, List, Tuple, Any
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple, Any
+
+class TerrainWindow:
+    """Rectangulo de terreno muestreado de una vez (arrays compactos, fila a fila)."""
+    __slots__ = ("x0", "y0", "width", "height", "step", "biome_names", "codes", "chars", "solid", "shade")
+
+    def __init__(self, x0: float, y0: float, width: int, height: int, step: float,
+                 biome_names: Tuple[str, ...], codes: array, chars: str, solid: bytearray, shade: bytearray):
+        self.x0, self.y0 = x0, y0
+        self.width, self.height = width, height
+        self.step = step
+        self.biome_names = biome_names # codigo -> nombre de bioma
+        self.codes = codes             # array('B') con el codigo de bioma de cada celda
+        self.chars = chars             # str con el caracter de suelo de cada celda
+        self.solid = solid             # 1 si la celda bloquea el paso
+        self.shade = shade             # 1 si el relieve va en negrita
+
+    def biome_at(self, col: int, row: int) -> str:
+        return self.biome_names[self.codes[row * self.width + col]]
+
+    def row_chars(self, row: int) -> str:
+        start = row * self.width
+        return self.chars[start:start + self.width]
 
 class BaseScenario:
     name: str = "Base"
     biomes_def: Dict[str, Dict[str, Any]] = {}
     legend_def: List[Tuple[str, str, int]] = []
     structures_blueprints: Dict[str, List[Tuple[int, int, str, int, bool]]] = {}
+    poi_cell_size: int = 60 # Lado de las macro-celdas donde se reparten ruinas, cuevas y portales
 
     def get_biome_id(self, x: float, y: float) -> str: raise NotImplementedError
-    def generate_decorations(self, radius: int) -> Dict[Tuple[int, int], str]: raise NotImplementedError
+    def generate_chunk_decorations(self, cx: int, cy: int, size: int,
+                                   codes: Optional[array] = None) -> Dict[Tuple[int, int], str]:
+        """Decoraciones del chunk (cx, cy) de size x size celdas; `codes` son sus biomas si ya se tienen."""
+        return {}
     def get_home_coords(self) -> Tuple[int, int]: return (0, 0) # Por defecto el origen
+    def cache_key(self) -> Tuple:
+        """Identifica el terreno generado: mismo tipo, semilla y nivel => mismas celdas."""
+        return (type(self).__name__, getattr(self, "seed", None), getattr(self, "level", None))
+    def get_macro_pois(self, gx: int, gy: int) -> List[Tuple[str, int, int, int]]:
+        """Puntos de interes de la macro-celda (gx, gy) como (tipo, x, y, radio)."""
+        return []
+    def chunk_rng(self, *coords: int) -> random.Random:
+        """RNG propio de una zona: el resultado no depende del orden en que se generen las zonas."""
+        return random.Random(":".join(map(str, self.cache_key() + coords)))
+
+    def generate_decorations(self, radius: int, size: int = 64) -> Dict[Tuple[int, int], str]:
+        """Todas las decoraciones del cuadrado [-radius, radius], chunk a chunk."""
+        decorations = {}
+        for cy in range(-radius // size, radius // size + 1):
+            for cx in range(-radius // size, radius // size + 1):
+                for (x, y), char in self.generate_chunk_decorations(cx, cy, size).items():
+                    if abs(x) <= radius and abs(y) <= radius: decorations[(x, y)] = char
+        return decorations
 
     def is_door(self, x: int, y: int) -> bool: return False
-    def get_ground_char(self, biome_id: str) -> str:
+    def get_ground_char(self, x: int, y: int, biome_id: str) -> str:
         return self.biomes_def.get(biome_id, {}).get("char", ".")
     def get_biome_stats(self, biome_id: str) -> Dict[str, Any]:
         return self.biomes_def.get(biome_id, {})
+    def get_shade(self, x: float, y: float) -> bool: return True # Relieve (negrita) por defecto
     def is_walkable(self, x: float, y: float) -> bool:
         bx, by = int(x), int(y)
         if self.is_door(bx, by): return True
         biome = self.get_biome_id(x, y)
         return not self.biomes_def.get(biome, {}).get("solid", False)
+
+    # --- CONSULTAS POR LOTES (rectangulos) ---
+    # Muestrean las coordenadas x0 + i*step, y0 + j*step. Las versiones genericas
+    # llaman a la API por celda; los escenarios sobrescriben las que les salen caras.
+
+    def biome_table(self) -> Tuple[str, ...]:
+        return tuple(self.biomes_def)
+
+    def _axis(self, start: float, count: int, step: float) -> List[float]:
+        return [start + i * step for i in range(count)]
+
+    def _lattice_row(self, iy: int, ixs, hashes: Dict[int, Dict[int, float]]) -> Dict[int, float]:
+        """Fila iy de la red de ruido (self._hash), memorizada en `hashes` durante una consulta."""
+        row = hashes.get(iy)
+        if row is None: row = hashes[iy] = {}
+        for ix in ixs:
+            if ix not in row: row[ix] = self._hash(ix, iy)
+        return row
+
+    def get_biome_ids(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> array:
+        index = {name: i for i, name in enumerate(self.biome_table())}
+        xs = self._axis(x0, width, step)
+        codes = array('B')
+        for y in self._axis(y0, height, step):
+            codes.extend(index[self.get_biome_id(x, y)] for x in xs)
+        return codes
+
+    def get_ground_chars(self, x0: float, y0: float, width: int, height: int, step: float = 1.0,
+                         codes: array = None) -> str:
+        if codes is None: codes = self.get_biome_ids(x0, y0, width, height, step)
+        names = self.biome_table()
+        xs = [int(x) for x in self._axis(x0, width, step)]
+        chars = []
+        for row, y in enumerate(self._axis(y0, height, step)):
+            iy, base = int(y), row * width
+            chars.extend(self.get_ground_char(ix, iy, names[codes[base + col]]) for col, ix in enumerate(xs))
+        return "".join(chars)
+
+    def get_solid_mask(self, x0: float, y0: float, width: int, height: int, step: float = 1.0,
+                       codes: array = None) -> bytearray:
+        if codes is None: codes = self.get_biome_ids(x0, y0, width, height, step)
+        solid_by_code = bytes(1 if self.biomes_def[name].get("solid", False) else 0 for name in self.biome_table())
+        solid = bytearray(solid_by_code[c] for c in codes)
+        if type(self).is_door is BaseScenario.is_door: return solid
+        # Las puertas siempre se pueden cruzar
+        xs = [int(x) for x in self._axis(x0, width, step)]
+        for row, y in enumerate(self._axis(y0, height, step)):
+            iy, base = int(y), row * width
+            for col, ix in enumerate(xs):
+                if solid[base + col] and self.is_door(ix, iy): solid[base + col] = 0
+        return solid
+
+    def get_shading(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> bytearray:
+        xs = self._axis(x0, width, step)
+        shade = bytearray()
+        for y in self._axis(y0, height, step):
+            shade.extend(1 if self.get_shade(x, y) else 0 for x in xs)
+        return shade
+
+    def get_window(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> TerrainWindow:
+        codes = self.get_biome_ids(x0, y0, width, height, step)
+        return TerrainWindow(
+            x0, y0, width, height, step, self.biome_table(), codes,
+            self.get_ground_chars(x0, y0, width, height, step, codes),
+            self.get_solid_mask(x0, y0, width, height, step, codes),
+            self.get_shading(x0, y0, width, height, step))
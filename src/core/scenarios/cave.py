@@ -1,6 +1,7 @@
 import random
 import math
-from typing import Dict, Tuple, Any
+from array import array
+from typing import Dict, List, Tuple, Any
 from .base import BaseScenario
 
 class CaveScenario(BaseScenario):
@@ -36,14 +37,33 @@ class CaveScenario(BaseScenario):
         u = fy * fy * (3 - 2 * fy)
         return v00 + t*(v10-v00) + u*(v01-v00) + t*u*(v00-v10-v01+v11)
 
+    def _noise_grid(self, xs: List[float], ys: List[float], hashes: Dict) -> List[float]:
+        """_noise sobre la rejilla xs * ys, hasheando cada vertice una sola vez."""
+        cols = []
+        for x in xs:
+            ix = math.floor(x); fx = x - ix
+            cols.append((ix, fx * fx * (3 - 2 * fx)))
+        ixs = {ix for ix, _ in cols} | {ix + 1 for ix, _ in cols}
+        out = []
+        for y in ys:
+            iy = math.floor(y); fy = y - iy
+            u = fy * fy * (3 - 2 * fy)
+            r0, r1 = self._lattice_row(iy, ixs, hashes), self._lattice_row(iy + 1, ixs, hashes)
+            for ix, t in cols:
+                v00, v10, v01, v11 = r0[ix], r0[ix + 1], r1[ix], r1[ix + 1]
+                out.append(v00 + t*(v10-v00) + u*(v01-v00) + t*u*(v00-v10-v01+v11))
+        return out
+
     def get_biome_id(self, x: float, y: float) -> str:
         # Ruido base para túneles
         n = self._noise(x * 0.1, y * 0.1)
-        
+        detail = self._noise(x * 0.5, y * 0.5) if abs(n) < 0.25 else 0.0
+        return self._classify(n, detail)
+
+    def _classify(self, n: float, detail: float) -> str:
         # Umbral para pasillos (Túneles orgánicos)
         if abs(n) < 0.25:
             # Dentro del túnel, ver si hay lava o cristales
-            detail = self._noise(x * 0.5, y * 0.5)
             if detail > 0.8: return "LAVA"
             if detail < -0.8: return "CRYSTAL"
             return "FLOOR"
@@ -52,6 +72,36 @@ class CaveScenario(BaseScenario):
         if abs(n) > 0.85: return "GOLD_VEIN"
         return "WALL"
 
+    def get_biome_ids(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> array:
+        xs, ys = self._axis(x0, width, step), self._axis(y0, height, step)
+        tunnels = self._noise_grid([x * 0.1 for x in xs], [y * 0.1 for y in ys], {})
+        detail = self._noise_grid([x * 0.5 for x in xs], [y * 0.5 for y in ys], {})
+        index = {name: i for i, name in enumerate(self.biome_table())}
+        return array('B', (index[self._classify(n, d)] for n, d in zip(tunnels, detail)))
+
+    def get_ground_chars(self, x0: float, y0: float, width: int, height: int, step: float = 1.0,
+                         codes: array = None) -> str:
+        if codes is None: codes = self.get_biome_ids(x0, y0, width, height, step)
+        table = [self.biomes_def[name]["char"] for name in self.biome_table()]
+        chars = [table[c] for c in codes]
+        # Portal de retorno en el origen local
+        xs = [int(x) for x in self._axis(x0, width, step)]
+        for row, y in enumerate(self._axis(y0, height, step)):
+            if abs(int(y)) >= 2: continue
+            for col, ix in enumerate(xs):
+                if abs(ix) < 2: chars[row * width + col] = "0"
+        return "".join(chars)
+
+    def get_macro_pois(self, gx: int, gy: int) -> List[Tuple[str, int, int, int]]:
+        return [("EXIT", 0, 0, 1)] if (gx, gy) == (0, 0) else [] # Portal de retorno
+
+    def get_shade(self, x: float, y: float) -> bool:
+        return self._noise(x * 0.1, y * 0.1) > 0
+
+    def get_shading(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> bytearray:
+        xs, ys = self._axis(x0, width, step), self._axis(y0, height, step)
+        return bytearray(1 if n > 0 else 0 for n in self._noise_grid([x * 0.1 for x in xs], [y * 0.1 for y in ys], {}))
+
     def get_ground_char(self, x: int, y: int, biome_id: str) -> str:
         # Entrada/Salida siempre libre en el origen local (para no aparecer en un muro)
         if abs(x) < 2 and abs(y) < 2: return "0" # Portal de retorno
@@ -1,8 +1,14 @@
 import random
 import math
-from typing import Dict, Tuple, Any
+from array import array
+from typing import Dict, List, Optional, Tuple, Any
 from .base import BaseScenario
 
+try:
+    import numpy as np
+except ImportError: # NumPy es opcional: sin él se usa la ruta en Python puro
+    np = None
+
 class NatureScenario(BaseScenario):
     name = "Nature"
     
@@ -53,15 +59,152 @@ class NatureScenario(BaseScenario):
             f *= 2.0; amp *= 0.5
         return val / max_amp
 
+    # --- RUIDO SOBRE REJILLAS (consultas por lotes) ---
+    # Mismas operaciones y en el mismo orden que _noise/_octave_noise, pero cada
+    # vertice de la red se hashea una sola vez por rectangulo (memo en `hashes`).
+
+    def _noise_grid(self, xs: List[float], ys: List[float], hashes: Dict) -> List[float]:
+        fade = self._fade
+        cols = []
+        for x in xs:
+            ix = math.floor(x)
+            cols.append((ix, fade(x - ix)))
+        ixs = {ix for ix, _ in cols} | {ix + 1 for ix, _ in cols}
+        out = []
+        for y in ys:
+            iy = math.floor(y)
+            uy = fade(y - iy)
+            r0 = self._lattice_row(iy, ixs, hashes)
+            r1 = self._lattice_row(iy + 1, ixs, hashes)
+            for ix, ux in cols:
+                v00, v10 = r0[ix], r0[ix + 1]
+                v01, v11 = r1[ix], r1[ix + 1]
+                a = v00 + ux * (v10 - v00)
+                b = v01 + ux * (v11 - v01)
+                out.append(a + uy * (b - a))
+        return out
+
+    def _octave_grid(self, xs: List[float], ys: List[float], octaves: int, freq: float, hashes: Dict) -> List[float]:
+        val = [0.0] * (len(xs) * len(ys))
+        amp, max_amp, f = 1.0, 0.0, freq
+        for _ in range(octaves):
+            layer = self._noise_grid([x * f for x in xs], [y * f for y in ys], hashes)
+            val = [v + n * amp for v, n in zip(val, layer)]
+            max_amp += amp
+            f *= 2.0; amp *= 0.5
+        return [v / max_amp for v in val]
+
+    # --- RUTA VECTORIAL (NumPy) ---
+    # Misma aritmetica que la ruta escalar: el hash se hace en uint64 y solo se
+    # conservan los 31 bits bajos, que coinciden con los de los enteros de Python.
+
+    def _hash_np(self, ix, iy):
+        n = (ix.astype(np.int64) * 15731 + iy.astype(np.int64) * 789221 + self.seed) & 0x7fffffff
+        n = n.astype(np.uint64)
+        n = (n << np.uint64(13)) ^ n
+        with np.errstate(over='ignore'): # El desbordamiento modulo 2^64 es intencionado
+            m = (n * (n * n * np.uint64(15731) + np.uint64(789221)) + np.uint64(1376312589)) & np.uint64(0x7fffffff)
+        return 1.0 - m.astype(np.float64) / 1073741824.0
+
+    def _fade_np(self, t): return t * t * t * (t * (t * 6 - 15) + 10)
+
+    def _noise_np(self, x, y):
+        """_noise elemento a elemento sobre arrays de coordenadas."""
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        ix, iy = np.floor(x), np.floor(y)
+        ux, uy = self._fade_np(x - ix), self._fade_np(y - iy)
+        ix, iy = ix.astype(np.int64), iy.astype(np.int64)
+        v00, v10 = self._hash_np(ix, iy), self._hash_np(ix + 1, iy)
+        v01, v11 = self._hash_np(ix, iy + 1), self._hash_np(ix + 1, iy + 1)
+        a = v00 + ux * (v10 - v00)
+        b = v01 + ux * (v11 - v01)
+        return a + uy * (b - a)
+
+    def _noise_grid_np(self, xs, ys):
+        """_noise sobre la rejilla ys x xs: se hashean solo los vertices distintos de la red."""
+        ix, iy = np.floor(xs), np.floor(ys)
+        ux, uy = self._fade_np(xs - ix), self._fade_np(ys - iy)
+        ix, iy = ix.astype(np.int64), iy.astype(np.int64)
+        lx, col = np.unique(np.concatenate([ix, ix + 1]), return_inverse=True)
+        ly, row = np.unique(np.concatenate([iy, iy + 1]), return_inverse=True)
+        lattice = self._hash_np(lx[None, :], ly[:, None])
+        c0, c1 = col[:len(ix)], col[len(ix):]
+        r0, r1 = row[:len(iy)], row[len(iy):]
+        v00, v10 = lattice[np.ix_(r0, c0)], lattice[np.ix_(r0, c1)]
+        v01, v11 = lattice[np.ix_(r1, c0)], lattice[np.ix_(r1, c1)]
+        a = v00 + ux[None, :] * (v10 - v00)
+        b = v01 + ux[None, :] * (v11 - v01)
+        return a + uy[:, None] * (b - a)
+
+    def _octave_noise_np(self, x, y, octaves: int = 5, freq: float = 0.01, grid: bool = False):
+        noise = self._noise_grid_np if grid else self._noise_np
+        val, amp, max_amp, f = 0.0, 1.0, 0.0, freq
+        for _ in range(octaves):
+            val = val + noise(x * f, y * f) * amp
+            max_amp += amp
+            f *= 2.0; amp *= 0.5
+        return val / max_amp
+
+    def _classify_np(self, y, elev, river, hum, temp_noise):
+        """_classify vectorizado: devuelve codigos de biome_table() (uint8)."""
+        river_noise = np.abs(river)
+        is_river = (river_noise < 0.04) & (elev > -0.15)
+        temp_distort = temp_noise * 200
+        temp = (1.0 - np.abs(y + temp_distort) / 4000.0) - (elev * 0.4)
+        warm = temp > 0.6
+        # Mismo orden de prioridad que la cadena de ifs escalar
+        rules = [
+            (is_river & (elev < 0.5), "RIVER"),
+            (elev < -0.8, "ABYSS"),
+            (elev < -0.5, "DEEP_OCEAN"),
+            (elev < -0.15, "WATER"),
+            ((-0.15 <= elev) & (elev < -0.05), "BEACH"),
+            (elev > 0.8, "SNOW_PEAK"),
+            (elev > 0.6, "MOUNTAIN"),
+            (elev > 0.35, "HILLS"),
+            (temp < -0.1, "GLACIER"),
+            (temp < 0.2, "TUNDRA"),
+            (warm & (hum < -0.4), "DESERT"),
+            (warm & (hum > 0.4), "SWAMP"),
+            (warm, "MEADOW"),
+            (hum > 0.2, "FOREST"),
+        ]
+        index = {name: i for i, name in enumerate(self.biome_table())}
+        return np.select([cond for cond, _ in rules], [index[name] for _, name in rules],
+                         default=index["MEADOW"]).astype(np.uint8)
+
+    def get_biome_codes_np(self, x, y):
+        """Codigos de bioma (indices de biome_table()) para arrays de coordenadas de igual forma."""
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        elev = self._octave_noise_np(x, y, octaves=5, freq=0.008)
+        river = self._octave_noise_np(x + 311, y + 91, octaves=2, freq=0.02)
+        hum = self._octave_noise_np(x + 523, y + 117, octaves=3, freq=0.015)
+        temp_noise = self._noise_np(x * 0.005, y * 0.005)
+        return self._classify_np(y, elev, river, hum, temp_noise)
+
+    def _biome_codes_grid_np(self, xs, ys):
+        elev = self._octave_noise_np(xs, ys, octaves=5, freq=0.008, grid=True)
+        river = self._octave_noise_np(xs + 311, ys + 91, octaves=2, freq=0.02, grid=True)
+        hum = self._octave_noise_np(xs + 523, ys + 117, octaves=3, freq=0.015, grid=True)
+        temp_noise = self._noise_grid_np(xs * 0.005, ys * 0.005)
+        return self._classify_np(ys[:, None], elev, river, hum, temp_noise)
+
+    def _axis_np(self, start: float, count: int, step: float):
+        return start + np.arange(count, dtype=np.int64) * step
+
     def get_biome_id(self, x: float, y: float) -> str:
         elev = self._octave_noise(x, y, octaves=5, freq=0.008)
-        
+        river = self._octave_noise(x + 311, y + 91, octaves=2, freq=0.02)
+        hum = self._octave_noise(x + 523, y + 117, octaves=3, freq=0.015)
+        temp_noise = self._noise(x * 0.005, y * 0.005)
+        return self._classify(y, elev, river, hum, temp_noise)
+
+    def _classify(self, y: float, elev: float, river: float, hum: float, temp_noise: float) -> str:
         # RÍOS (Ridged Noise)
-        river_noise = abs(self._octave_noise(x + 311, y + 91, octaves=2, freq=0.02))
+        river_noise = abs(river)
         is_river = river_noise < 0.04 and elev > -0.15
 
-        hum = self._octave_noise(x + 523, y + 117, octaves=3, freq=0.015)
-        temp_distort = self._noise(x * 0.005, y * 0.005) * 200
+        temp_distort = temp_noise * 200
         temp = (1.0 - abs(y + temp_distort) / 4000.0) - (elev * 0.4)
         
         if is_river and elev < 0.5: return "RIVER"
@@ -111,19 +254,82 @@ class NatureScenario(BaseScenario):
 
         return self.biomes_def.get(biome_id, {}).get("char", ".")
 
+    def get_macro_pois(self, gx: int, gy: int) -> List[Tuple[str, int, int, int]]:
+        # Mismo criterio que get_ground_char: ruina si el hash > 0.97, cueva si > 0.95 en relieve
+        struct_seed = self._hash(gx, gy)
+        if struct_seed <= 0.95: return []
+        cx, cy = gx * 60 + 30, gy * 60 + 30
+        if struct_seed > 0.97: return [("RUIN", cx, cy, 2)]
+        if self.get_biome_id(cx, cy) in ["MOUNTAIN", "HILLS", "SNOW_PEAK"]: return [("CAVE", cx, cy, 0)]
+        return []
+
+    def get_shade(self, x: float, y: float) -> bool:
+        return self._noise(x * 0.1, y * 0.1) > 0
+
+    def get_biome_ids(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> array:
+        if np is not None:
+            codes = self._biome_codes_grid_np(self._axis_np(x0, width, step), self._axis_np(y0, height, step))
+            return array('B', codes.tobytes())
+        xs, ys = self._axis(x0, width, step), self._axis(y0, height, step)
+        hashes = {}
+        elev = self._octave_grid(xs, ys, 5, 0.008, hashes)
+        river = self._octave_grid([x + 311 for x in xs], [y + 91 for y in ys], 2, 0.02, hashes)
+        hum = self._octave_grid([x + 523 for x in xs], [y + 117 for y in ys], 3, 0.015, hashes)
+        temp = self._noise_grid([x * 0.005 for x in xs], [y * 0.005 for y in ys], hashes)
+
+        index = {name: i for i, name in enumerate(self.biome_table())}
+        classify = self._classify
+        codes = array('B')
+        for row, y in enumerate(ys):
+            base = row * width
+            for i in range(base, base + width):
+                codes.append(index[classify(y, elev[i], river[i], hum[i], temp[i])])
+        return codes
+
+    def get_ground_chars(self, x0: float, y0: float, width: int, height: int, step: float = 1.0,
+                         codes: array = None) -> str:
+        if codes is None: codes = self.get_biome_ids(x0, y0, width, height, step)
+        names = self.biome_table()
+        table = [self.biomes_def[name].get("char", ".") for name in names]
+        xs = [int(x) for x in self._axis(x0, width, step)]
+        chars = [table[c] for c in codes]
+        # Solo las macro-celdas con ruina o cueva necesitan el calculo fino por celda
+        gxs = [ix // 60 for ix in xs]
+        macro_cols = set(gxs)
+        for row, y in enumerate(self._axis(y0, height, step)):
+            iy, base = int(y), row * width
+            hot = {gx for gx in macro_cols if self._hash(gx, iy // 60) > 0.95}
+            if not hot: continue
+            for col, ix in enumerate(xs):
+                if gxs[col] in hot: chars[base + col] = self.get_ground_char(ix, iy, names[codes[base + col]])
+        return "".join(chars)
+
+    def get_shading(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> bytearray:
+        if np is not None:
+            xs, ys = self._axis_np(x0, width, step), self._axis_np(y0, height, step)
+            return bytearray((self._noise_grid_np(xs * 0.1, ys * 0.1) > 0).astype(np.uint8).tobytes())
+        xs, ys = self._axis(x0, width, step), self._axis(y0, height, step)
+        noise = self._noise_grid([x * 0.1 for x in xs], [y * 0.1 for y in ys], {})
+        return bytearray(1 if n > 0 else 0 for n in noise)
+
     def get_ground_attr(self, x: int, y: int, char: str) -> int:
         # Colores especiales para estructuras
         if char in ["#", "X"]: return 5 # Blanco/Gris
         if char == "0": return 3 # Rojo/Oscuro para cuevas
         return 0 # Default
 
-    def generate_decorations(self, radius: int) -> Dict[Tuple[int, int], str]:
+    def generate_chunk_decorations(self, cx: int, cy: int, size: int,
+                                   codes: Optional[array] = None) -> Dict[Tuple[int, int], str]:
+        # Misma densidad que antes (800 muestras en 301x301 celdas), pero por chunk y con su propio RNG
+        rng = self.chunk_rng(cx, cy)
+        names = self.biome_table()
+        x0, y0 = cx * size, cy * size
         decorations = {}
-        for _ in range(800):
-            x = self.rng.randint(-radius, radius)
-            y = self.rng.randint(-radius, radius)
-            biome = self.get_biome_id(x, y)
+        for _ in range(round(800 * size * size / (301 * 301))):
+            lx, ly = rng.randrange(size), rng.randrange(size)
+            x, y = x0 + lx, y0 + ly
+            biome = names[codes[ly * size + lx]] if codes is not None else self.get_biome_id(x, y)
             if biome == "FOREST": decorations[(x, y)] = "T"
-            elif biome == "MEADOW" and self.rng.random() < 0.2: decorations[(x, y)] = "f"
-            elif biome == "DESERT" and self.rng.random() < 0.05: decorations[(x, y)] = "C"
+            elif biome == "MEADOW" and rng.random() < 0.2: decorations[(x, y)] = "f"
+            elif biome == "DESERT" and rng.random() < 0.05: decorations[(x, y)] = "C"
         return decorations
@@ -1,6 +1,7 @@
 import random
 import math
-from typing import Dict, Tuple, Any, List
+from array import array
+from typing import Dict, Tuple, Any, List, Optional
 from .base import BaseScenario
 
 class UrbanScenario(BaseScenario):
@@ -20,18 +21,23 @@ class UrbanScenario(BaseScenario):
         ("#", "CALLE", 14), (".", "ACERA", 15), ("v", "PARQUE", 17)
     ]
 
+    def __init__(self, seed: int = None):
+        self.seed = seed or random.randint(0, 1000000) # Solo afecta a las decoraciones
+
     def get_biome_id(self, x: float, y: float) -> str:
+        ix, iy = int(x), int(y)
+        return self._classify(x**2 + y**2, ix % 50, iy % 50, ix // 50, iy // 50)
+
+    def _classify(self, dist2: float, bx: int, by: int, gx: int, gy: int) -> str:
         # Distritos: Centro (Comercial), Periferia (Parques), Zonas Industriales
-        dist = math.sqrt(x**2 + y**2)
+        dist = math.sqrt(dist2)
         
         # 1. Parques Metropolitanos en la periferia
         if dist > 120: return "PARK"
         
-        # 2. Rejilla de manzanas (Blocks)
-        bx, by = int(x) % 50, int(y) % 50
-        
+        # 2. Rejilla de manzanas (Blocks): bx, by dentro de la manzana (gx, gy)
         # Calles más anchas en avenidas principales
-        street_width = 10 if (int(x)//50) % 3 == 0 else 6
+        street_width = 10 if gx % 3 == 0 else 6
         
         if bx < street_width or by < street_width:
             return "STREET"
@@ -39,7 +45,7 @@ class UrbanScenario(BaseScenario):
             return "SIDEWALK"
             
         # 3. Zonas en Construcción aleatorias
-        if (int(x)//50 + int(y)//50) % 7 == 0:
+        if (gx + gy) % 7 == 0:
             if bx > 20 and by > 20 and bx < 30 and by < 30:
                 return "CONSTRUCTION"
 
@@ -49,6 +55,28 @@ class UrbanScenario(BaseScenario):
             
         return "INTERIOR"
 
+    def get_biome_ids(self, x0: float, y0: float, width: int, height: int, step: float = 1.0) -> array:
+        index = {name: i for i, name in enumerate(self.biome_table())}
+        cols = [(x**2, int(x) % 50, int(x) // 50) for x in self._axis(x0, width, step)]
+        classify = self._classify
+        codes = array('B')
+        for y in self._axis(y0, height, step):
+            y2, by, gy = y**2, int(y) % 50, int(y) // 50
+            codes.extend(index[classify(x2 + y2, bx, by, gx, gy)] for x2, bx, gx in cols)
+        return codes
+
+    def get_solid_mask(self, x0: float, y0: float, width: int, height: int, step: float = 1.0,
+                       codes: array = None) -> bytearray:
+        if codes is None: codes = self.get_biome_ids(x0, y0, width, height, step)
+        solid_by_code = bytes(1 if self.biomes_def[name]["solid"] else 0 for name in self.biome_table())
+        solid = bytearray(solid_by_code[c] for c in codes)
+        # Puertas: fila 47 y columna 25 de cada manzana
+        door_cols = [col for col, x in enumerate(self._axis(x0, width, step)) if int(x) % 50 == 25]
+        for row, y in enumerate(self._axis(y0, height, step)):
+            if int(y) % 50 != 47: continue
+            for col in door_cols: solid[row * width + col] = 0
+        return solid
+
     def is_door(self, x: int, y: int) -> bool:
         bx, by = x % 50, y % 50
         # Puerta en el centro de la fachada
@@ -58,11 +86,17 @@ class UrbanScenario(BaseScenario):
     def get_home_coords(self) -> Tuple[int, int]:
         return (24, 24) # Centro del edificio inicial en la manzana 40x40
 
-    def generate_decorations(self, radius: int) -> Dict[Tuple[int, int], str]:
+    def generate_chunk_decorations(self, cx: int, cy: int, size: int,
+                                   codes: Optional[array] = None) -> Dict[Tuple[int, int], str]:
         decorations = {}
-        for x in range(-radius, radius, 50):
-            for y in range(-radius, radius, 50):
-                decorations[(x + 25, y + 47)] = "+" # Puertas
-                if random.random() < 0.3:
-                    decorations[(x + 10, y + 10)] = "o" # Papeleras
+        x0, y0 = cx * size, cy * size
+        for gx in range(x0 // 50, (x0 + size - 1) // 50 + 1):
+            for gy in range(y0 // 50, (y0 + size - 1) // 50 + 1):
+                bx, by = gx * 50, gy * 50
+                if x0 <= bx + 25 < x0 + size and y0 <= by + 47 < y0 + size:
+                    decorations[(bx + 25, by + 47)] = "+" # Puertas
+                # La papelera depende solo de su manzana, no del chunk que la genera
+                if x0 <= bx + 10 < x0 + size and y0 <= by + 10 < y0 + size:
+                    if self.chunk_rng(gx, gy).random() < 0.3:
+                        decorations[(bx + 10, by + 10)] = "o" # Papeleras
         return decorations
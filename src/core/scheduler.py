@@ -0,0 +1,146 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from .logger import logger
+from .profiler import profiler
+
+# fn(elapsed, deadline) -> True si le queda trabajo pendiente (se retoma el frame siguiente)
+SystemFn = Callable[[float, Optional[float]], Optional[bool]]
+
+class System:
+    """Una fase del bucle (física, interacciones, eventos, render...) con su ritmo y su presupuesto.
+
+    rate en Hz (None = todos los frames). budget en segundos por frame: los sistemas troceables
+    reciben el deadline y devuelven True si no han terminado; el resto solo cuenta el exceso.
+    """
+    __slots__ = ("name", "fn", "interval", "priority", "budget", "deferrable", "order",
+                 "accum", "pending", "streak",
+                 "calls", "runs", "time_total", "time_max", "overruns", "deferred", "carried")
+
+    def __init__(self, name: str, fn: SystemFn, rate: Optional[float] = None, priority: int = 0,
+                 budget: Optional[float] = None, deferrable: bool = False):
+        self.name = name
+        self.fn = fn
+        self.interval = 1.0 / rate if rate else None
+        self.priority = priority
+        self.budget = budget
+        self.deferrable = deferrable # Puede esperar al frame siguiente si el frame va pasado
+        self.order = 0
+        self.accum = 0.0    # Tiempo simulado desde la ultima ejecucion
+        self.pending = False
+        self.streak = 0     # Frames seguidos aplazado
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.calls = 0      # Llamadas (incluye continuaciones)
+        self.runs = 0       # Pasadas completas
+        self.time_total = 0.0
+        self.time_max = 0.0
+        self.overruns = 0   # Llamadas que pasaron de budget
+        self.deferred = 0   # Frames aplazado por falta de tiempo
+        self.carried = 0    # Frames en que quedo trabajo para el siguiente
+
+    def stats(self) -> Dict[str, float]:
+        return {"calls": self.calls, "runs": self.runs, "time_total": self.time_total,
+                "time_avg": self.time_total / self.calls if self.calls else 0.0,
+                "time_max": self.time_max, "overruns": self.overruns,
+                "deferred": self.deferred, "carried": self.carried}
+
+    def __repr__(self):
+        rate = f"{1.0 / self.interval:g}Hz" if self.interval else "frame"
+        return f"<System {self.name} {rate} prio={self.priority} budget={self.budget}>"
+
+class Scheduler:
+    """Ejecuta los sistemas registrados cada frame, por prioridad (menor primero).
+
+    Si el frame ya ha gastado frame_budget, los sistemas aplazables que tocaban esperan al
+    siguiente (su tiempo acumulado se conserva); tras max_deferrals aplazamientos seguidos
+    corren igualmente para que nadie se quede sin turno.
+    """
+
+    def __init__(self, frame_budget: Optional[float] = None, max_deferrals: int = 4):
+        self.frame_budget = frame_budget
+        self.max_deferrals = max_deferrals
+        self.systems: List[System] = []
+        self._by_name: Dict[str, System] = {}
+        self._added = 0
+        self.frames = 0
+        self.frame_time_max = 0.0
+
+    def add(self, name: str, fn: SystemFn, rate: Optional[float] = None, priority: int = 0,
+            budget: Optional[float] = None, deferrable: bool = False) -> System:
+        if name in self._by_name: raise ValueError(f"Sistema repetido: {name}")
+        system = System(name, fn, rate, priority, budget, deferrable)
+        system.order = self._added
+        self._added += 1
+        self.systems.append(system)
+        self.systems.sort(key=lambda s: (s.priority, s.order))
+        self._by_name[name] = system
+        return system
+
+    def remove(self, name: str):
+        system = self._by_name.pop(name)
+        self.systems.remove(system)
+
+    def __getitem__(self, name: str) -> System:
+        return self._by_name[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def tick(self, dt: float, budgeted: bool = True, exclude: Iterable[str] = ()) -> List[str]:
+        """Avanza un frame de dt segundos. Devuelve los nombres de los sistemas que han corrido.
+
+        Con budgeted=False no hay deadlines ni aplazamientos: cada sistema corre entero cuando
+        le toca, y el resultado solo depende de dt (modo sin ventana, repeticiones).
+        """
+        clock = time.perf_counter
+        frame_start = clock()
+        ran = []
+        for system in self.systems:
+            if system.name in exclude: continue
+            system.accum += dt
+            continuing = system.pending
+            if not continuing and system.interval is not None and system.accum <= system.interval: continue
+            if (budgeted and system.deferrable and self.frame_budget is not None
+                    and clock() - frame_start > self.frame_budget and system.streak < self.max_deferrals):
+                system.deferred += 1
+                system.streak += 1
+                continue
+            system.streak = 0
+            elapsed = 0.0 if continuing else system.accum
+            if not continuing: system.accum = 0.0
+
+            start = clock()
+            deadline = start + system.budget if budgeted and system.budget is not None else None
+            try:
+                system.pending = bool(system.fn(elapsed, deadline))
+            except Exception as e:
+                system.pending = False
+                logger.log(f"SYSTEM ERROR ({system.name}): {str(e)}")
+                if profiler.enabled: profiler.count(f"errors.{system.name}")
+            took = clock() - start
+            if profiler.enabled: profiler.record(f"phase.{system.name}", took)
+
+            system.calls += 1
+            system.time_total += took
+            if took > system.time_max: system.time_max = took
+            if system.budget is not None and took > system.budget: system.overruns += 1
+            if system.pending: system.carried += 1
+            else: system.runs += 1
+            ran.append(system.name)
+
+        self.frames += 1
+        frame_time = clock() - frame_start
+        if frame_time > self.frame_time_max: self.frame_time_max = frame_time
+        if profiler.enabled:
+            profiler.record("frame", frame_time)
+            profiler.frame()
+        return ran
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {system.name: system.stats() for system in self.systems}
+
+    def reset_stats(self):
+        self.frames = 0
+        self.frame_time_max = 0.0
+        for system in self.systems: system.reset_stats()
@@ -0,0 +1,345 @@
+"""Simulacion repartida por regiones: cada proceso trabajador es dueño de unas franjas del plano.
+
+El plano (infinito en NatureScenario) se corta en franjas verticales de region_size celdas y la
+franja rx es del trabajador rx % workers. Cada trabajador tiene un WorldState completo (el
+terreno sale de la semilla del escenario) pero solo simula sus Persons y Wolves:
+
+- Traspaso: quien sale de sus franjas se empaqueta y pasa al dueño de la nueva.
+- Halo: lo que está a menos de halo celdas de una frontera se copia como fantasma al vecino
+  (engine.ghosts). Los fantasmas se ven en las interacciones pero no se simulan, y cada efecto
+  lo aplica el dueño de quien lo recibe: el panico por lobos y las charlas cruzan la frontera asi.
+- Casas: replicadas en todos, con el coordinador como autoridad. Cada trabajador informa de la
+  madera entregada; el coordinador la suma y reparte madera y nivel.
+- Construcciones (caminos, vallas): cada trabajador informa de las nuevas y se reparten al resto.
+
+Todos avanzan a la vez exchange_frames frames entre intercambios, así que un fantasma lleva como
+mucho ese retraso. snapshot() junta a todos en un WorldState normal para pintar o guardar.
+"""
+import math
+import multiprocessing
+import time
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .engine import SimulationEngine
+from .entities.base import Entity
+from .entities.town import Town
+from .logger import logger
+from .persistence import PersistenceManager
+from .rng import derive_seed
+from .state import WorldState
+
+REGION_SIZE = 128   # Ancho de cada franja en celdas
+HALO = 6.0          # Radio de copia al vecino: al menos el mayor radio de interaccion (panico, 5)
+EXCHANGE_FRAMES = 8 # Frames entre intercambios: un tick de logica a 15 fps
+
+_DROP = ("world", "pathfinder", "home_reference") # Apuntan al mundo de un proceso: se rehacen al llegar
+
+def pack(entity: Entity) -> Tuple[type, Dict]:
+    """Entidad lista para cruzar de proceso, sin referencias a su mundo."""
+    state = entity.__getstate__()
+    for name in _DROP:
+        if name in state: state[name] = None
+    return type(entity), state
+
+def unpack(packed: Tuple[type, Dict]) -> Entity:
+    cls, state = packed
+    entity = cls.__new__(cls)
+    entity.__setstate__(state) # Conserva el id (los da el coordinador, son unicos entre procesos)
+    return entity
+
+def owner_of(x: float, region_size: int, workers: int) -> int:
+    return math.floor(x / region_size) % workers
+
+# --- TRABAJADOR ---
+class _ShardEngine(SimulationEngine):
+    """Motor de un trabajador: los eventos globales solo tocan a los suyos, con su parte de probabilidad."""
+
+    share = 1.0
+
+    def _events_system(self, elapsed: float, deadline):
+        ghosts = self.ghosts
+        own = {pid: p for pid, p in self.world_state.people.items() if pid not in ghosts}
+        self.event_manager.update(own, self.share, touch=self._wake)
+
+class Shard:
+    """Estado de un trabajador (vive en su proceso): su mundo, su motor y que entidades son copias."""
+
+    def __init__(self, index: int, workers: int, scenario, seed: int, region_size: int, halo: float):
+        self.index = index
+        self.workers = workers
+        self.region_size = region_size
+        self.halo = halo
+        # Stream de eventos propio por trabajador; las entidades traen el suyo al llegar
+        self.world = WorldState(scenario, seed=derive_seed(seed, "shard", index))
+        self.engine = _ShardEngine(self.world)
+        self.engine.ghosts = set()
+        self.towns = {} # id -> replica de la casa
+        self.wood_mark: Dict[int, int] = {} # Madera de cada replica tras el ultimo reparto
+        self.built_mark = 0 # built_structures es de solo altas: lo nuevo va al final del dict
+
+    def apply(self, inbox: Dict):
+        world, ghosts = self.world, self.engine.ghosts
+        if "clock" in inbox: world.tick_count, world.time_of_day = inbox["clock"]
+        for packed in inbox.get("fixed", ()):
+            entity = unpack(packed)
+            world.add_entity(entity, snap=False)
+            if isinstance(entity, Town): self.towns[entity.id] = entity
+        self.engine.share = inbox.get("share", self.engine.share)
+        # Los fantasmas se rehacen enteros en cada intercambio
+        for entity_id in ghosts:
+            entity = world.entities.get(entity_id)
+            if entity is not None: world.remove_entity(entity)
+        ghosts.clear()
+        for packed in inbox.get("arrivals", ()):
+            world.add_entity(unpack(packed), snap=False)
+        for packed in inbox.get("ghosts", ()):
+            entity = unpack(packed)
+            if entity.id in world.entities: continue # Llega traspasada en este mismo intercambio
+            world.add_entity(entity, snap=False)
+            ghosts.add(entity.id)
+        for town_id, wood, level in inbox.get("towns", ()):
+            town = self.towns[town_id]
+            town.wood_stock = wood
+            while town.level < level: town.upgrade()
+        for (x, y), kind in inbox.get("structures", ()):
+            world.add_structure(x, y, kind)
+        self.wood_mark = {town_id: town.wood_stock for town_id, town in self.towns.items()}
+        self.built_mark = len(world.built_structures)
+
+    def step(self, frames: int) -> Dict:
+        world, ghosts = self.world, self.engine.ghosts
+        ticks = self.engine.step(frames) if frames else 0
+        departures, halo, people = [], {}, 0
+        size, workers, reach = self.region_size, self.workers, self.halo
+        for registry in (world.people, world.wolves):
+            for entity in list(registry.values()):
+                if entity.id in ghosts: continue
+                rx = math.floor(entity.x / size)
+                dest = rx % workers
+                if dest != self.index:
+                    world.remove_entity(entity)
+                    departures.append((dest, pack(entity)))
+                    continue
+                people += registry is world.people
+                offset = entity.x - rx * size
+                near = set()
+                if offset < reach: near.add((rx - 1) % workers)
+                if size - offset < reach: near.add((rx + 1) % workers)
+                near.discard(self.index)
+                if near:
+                    packed = pack(entity)
+                    for dest in near: halo.setdefault(dest, []).append(packed)
+        wood = {town_id: town.wood_stock - self.wood_mark[town_id] for town_id, town in self.towns.items()
+                if town.wood_stock != self.wood_mark[town_id]}
+        built = world.built_structures
+        structures = [(pos, data["type"]) for pos, data in islice(built.items(), self.built_mark, None)]
+        self.built_mark = len(built)
+        logs, logger.logs = logger.logs, [] # Las lineas viajan al log del coordinador
+        return {"ticks": ticks, "departures": departures, "halo": halo, "wood": wood,
+                "structures": structures, "people": people, "logs": logs}
+
+    def snapshot(self) -> Dict:
+        ghosts, world = self.engine.ghosts, self.world
+        own = [pack(e) for registry in (world.people, world.wolves) for e in registry.values() if e.id not in ghosts]
+        return {"entities": own, "clock": (world.tick_count, world.time_of_day)}
+
+def _worker_main(conn, index: int, workers: int, scenario, seed: int, region_size: int, halo: float):
+    shard = Shard(index, workers, scenario, seed, region_size, halo)
+    while True:
+        command, payload = conn.recv()
+        if command == "stop": break
+        try:
+            if command == "step":
+                inbox, frames = payload
+                shard.apply(inbox)
+                conn.send(("ok", shard.step(frames)))
+            elif command == "snapshot":
+                conn.send(("ok", shard.snapshot()))
+            else:
+                conn.send(("error", f"comando desconocido: {command}"))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+# --- COORDINADOR ---
+class ShardedEngine:
+    """Reparte un WorldState entre procesos por regiones y los avanza a la vez.
+
+    Se usa como el modo sin ventana de SimulationEngine (step, run_until) y snapshot() da el
+    mundo unido. world_state se queda con lo que tiene autoridad aqui: casas, tiendas y
+    construcciones. Solo personas normales (sin Population).
+    """
+
+    def __init__(self, world_state: WorldState, workers: int = 2, region_size: int = REGION_SIZE,
+                 halo: float = HALO, exchange_frames: int = EXCHANGE_FRAMES, fps: int = 15):
+        if world_state.population is not None:
+            raise ValueError("ShardedEngine no admite Population (personas en columnas)")
+        self.world_state = world_state
+        self.workers = workers
+        self.region_size = region_size
+        self.exchange_frames = exchange_frames
+        self.fixed_dt = 1.0 / fps
+        self.is_running = False
+        self.render_callbacks: List[Callable[[WorldState], None]] = []
+        self.tick_count = world_state.tick_count
+        self.stats = {"exchanges": 0, "handoffs": 0, "ghosts": 0, "people": [0] * workers}
+
+        ctx = multiprocessing.get_context()
+        self._conns, self._procs = [], []
+        for i in range(workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker_main, daemon=True,
+                               args=(child, i, workers, world_state.scenario, world_state.rng.seed, region_size, halo))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+        # Reparto inicial: lo fijo a todos, cada persona y lobo al dueño de su franja
+        fixed = [pack(e) for e in world_state.others.values()]
+        structures = [(pos, data["type"]) for pos, data in world_state.built_structures.items()]
+        self._inbox = [{"fixed": fixed, "structures": structures, "arrivals": [], "ghosts": [],
+                        "clock": (world_state.tick_count, world_state.time_of_day)} for _ in range(workers)]
+        for registry in (world_state.people, world_state.wolves):
+            for entity in list(registry.values()):
+                self._inbox[self.owner(entity.x)]["arrivals"].append(pack(entity))
+                world_state.remove_entity(entity)
+        self._exchange(0) # Primeros halos, sin avanzar
+
+    def owner(self, x: float) -> int:
+        return owner_of(x, self.region_size, self.workers)
+
+    def _send_all(self, command: str, payloads) -> List:
+        for conn, payload in zip(self._conns, payloads): conn.send((command, payload))
+        results = []
+        for i, conn in enumerate(self._conns):
+            status, result = conn.recv()
+            if status != "ok": raise RuntimeError(f"trabajador {i}: {result}")
+            results.append(result)
+        return results
+
+    def _exchange(self, frames: int) -> int:
+        outboxes = self._send_all("step", [(inbox, frames) for inbox in self._inbox])
+        inbox = self._inbox = [{"arrivals": [], "ghosts": [], "structures": []} for _ in range(self.workers)]
+        world, stats = self.world_state, self.stats
+        wood: Dict[int, int] = {}
+        for i, out in enumerate(outboxes):
+            for dest, packed in out["departures"]:
+                inbox[dest]["arrivals"].append(packed)
+            stats["handoffs"] += len(out["departures"])
+            for dest, packed in out["halo"].items():
+                inbox[dest]["ghosts"].extend(packed)
+                stats["ghosts"] += len(packed)
+            for town_id, amount in out["wood"].items():
+                wood[town_id] = wood.get(town_id, 0) + amount
+            for item in out["structures"]:
+                (x, y), kind = item
+                world.add_structure(x, y, kind)
+                for j in range(self.workers):
+                    if j != i: inbox[j]["structures"].append(item)
+            stats["people"][i] = out["people"]
+            logger.logs.extend(out["logs"])
+        del logger.logs[:-logger.max_lines]
+        # La madera de todas las regiones se suma en la casa de verdad y vuelve a las replicas
+        towns = {town.id: town for town in world.towns}
+        sync = []
+        for town_id, amount in wood.items():
+            town = towns[town_id]
+            town.add_wood(amount)
+            sync.append((town_id, town.wood_stock, town.level))
+        total = sum(stats["people"]) or 1
+        for i, box in enumerate(inbox):
+            box["towns"] = sync
+            box["share"] = stats["people"][i] / total
+        stats["exchanges"] += 1
+        ticks = outboxes[0]["ticks"] # Todos llevan el mismo reloj
+        self.tick_count += ticks
+        return ticks
+
+    # --- MODO SIN VENTANA ---
+    def step(self, frames: int = 1) -> int:
+        """Avanza frames de fixed_dt en todos los trabajadores. Devuelve los ticks de logica."""
+        ticks = 0
+        while frames > 0:
+            chunk = min(frames, self.exchange_frames)
+            ticks += self._exchange(chunk)
+            frames -= chunk
+        return ticks
+
+    def run_until(self, tick: int, max_frames: int = 10_000_000) -> int:
+        """Avanza de intercambio en intercambio hasta llegar a tick. Devuelve los frames simulados."""
+        frames = 0
+        while self.tick_count < tick and frames < max_frames:
+            self.step(self.exchange_frames)
+            frames += self.exchange_frames
+        return frames
+
+    def snapshot(self) -> WorldState:
+        """Mundo unido (casas y construcciones de aqui, personas y lobos de cada trabajador)."""
+        base = self.world_state
+        results = self._send_all("snapshot", [None] * self.workers)
+        world = WorldState(base.scenario, terrain_cache=base.terrain_cache, seed=base.rng.seed)
+        world.rng = base.rng
+        world.built_structures = dict(base.built_structures)
+        world.occupancy.rebuild()
+        for entity in base.others.values():
+            world.add_entity(unpack(pack(entity)), snap=False)
+        packed = [item for result in results for item in result["entities"]]
+        packed += [item for box in self._inbox for item in box["arrivals"]] # En camino a su nueva region
+        entities = [unpack(item) for item in packed]
+        for entity in sorted(entities, key=lambda e: e.id): # Orden de alta, como en un mundo normal
+            world.add_entity(entity, snap=False)
+        world.tick_count, world.time_of_day = results[0]["clock"]
+        return world
+
+    def save(self, filename: Optional[str] = None):
+        return PersistenceManager.save_game(self.snapshot(), filename)
+
+    # --- CON VENTANA: cada intercambio pinta el mundo unido ---
+    def register_render_callback(self, callback: Callable[[WorldState], None]):
+        self.render_callbacks.append(callback)
+
+    def render(self):
+        world = self.snapshot()
+        for callback in self.render_callbacks:
+            try:
+                callback(world)
+            except Exception as e:
+                logger.log(f"RENDER ERROR: {str(e)}")
+
+    def run(self):
+        self.is_running = True
+        period = self.exchange_frames * self.fixed_dt
+        try:
+            while self.is_running:
+                start = time.time()
+                self.step(self.exchange_frames)
+                self.render()
+                time.sleep(max(0.005, period - (time.time() - start)))
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            self.close()
+
+    def stop(self):
+        self.is_running = False
+
+    def close(self):
+        """Para los trabajadores. El estado que tuvieran se pierde: snapshot() antes si hace falta."""
+        for conn in self._conns:
+            try:
+                conn.send(("stop", None))
+                conn.close()
+            except (OSError, BrokenPipeError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=2.0)
+            if proc.is_alive(): proc.terminate()
+        self._conns, self._procs = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
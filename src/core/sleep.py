@@ -0,0 +1,97 @@
+"""Entidades dormidas: el motor no las visita hasta su hora de despertar.
+
+Tras su update, cada Person o Wolf dice cuánto puede esperar sin que cambie nada salvo
+energia, estres y temporizadores (sleep_time). Si es bastante, se apunta en una rueda de
+temporizadores y el motor se la salta; al despertar se le aplica catch_up(elapsed) en forma
+cerrada y sigue con su update normal en ese mismo frame. Un evento (un lobo cerca, una compra,
+una entrega, un suceso) la despierta antes con wake().
+"""
+import math
+from typing import Dict, List, Tuple
+
+from .profiler import profiler
+
+MIN_SLEEP = 2 # Frames: dormir menos no compensa apuntarla y despertarla
+
+class TimerWheel:
+    """Rueda de temporizadores con hueco de resolution segundos; lo que pasa de una vuelta espera.
+
+    Programar y cancelar es O(1) (la cancelacion es perezosa: se descarta al llegar su hueco).
+    """
+
+    def __init__(self, resolution: float, slots: int = 256):
+        self.resolution = resolution
+        self.slots: List[List[Tuple[int, int]]] = [[] for _ in range(slots)]
+        self.due_tick: Dict[int, int] = {} # clave -> tick vigente
+        self.current = 0 # Último tick ya procesado
+
+    def schedule(self, key: int, when: float):
+        tick = max(self.current + 1, math.ceil(when / self.resolution - 1e-9))
+        self.due_tick[key] = tick
+        self.slots[tick % len(self.slots)].append((tick, key))
+
+    def cancel(self, key: int):
+        self.due_tick.pop(key, None)
+
+    def advance(self, now: float) -> List[int]:
+        """Claves que vencen hasta now, en orden de tick."""
+        target = math.floor(now / self.resolution + 1e-9)
+        slots, size, due_tick = self.slots, len(self.slots), self.due_tick
+        due = []
+        if not due_tick: # Nada programado: salto directo
+            self.current = max(self.current, target)
+            return due
+        for tick in range(self.current + 1, target + 1):
+            bucket = slots[tick % size]
+            if not bucket: continue
+            keep = []
+            for item in bucket:
+                if item[0] > tick: keep.append(item) # Vueltas futuras
+                elif due_tick.get(item[1]) == item[0]:
+                    del due_tick[item[1]]
+                    due.append(item[1])
+            slots[tick % size] = keep
+        self.current = max(self.current, target)
+        return due
+
+    def __len__(self) -> int:
+        return len(self.due_tick)
+
+class Sleepers:
+    """Quién duerme, desde cuándo y cuándo despierta (en tiempo simulado del motor)."""
+
+    def __init__(self, frame_time: float):
+        self.frame_time = frame_time
+        self.wheel = TimerWheel(frame_time)
+        self.asleep: Dict[int, Tuple[object, float]] = {} # id -> (entidad, sim_time al dormirse)
+
+    def consider(self, entity, now: float):
+        """Tras su update: la duerme si puede esperar al menos MIN_SLEEP frames."""
+        wait = entity.sleep_time()
+        if wait < MIN_SLEEP * self.frame_time: return
+        self.asleep[entity.id] = (entity, now)
+        self.wheel.schedule(entity.id, now + wait)
+
+    def wake_due(self, now: float, dt: float, world):
+        """Despierta a quien le toca: se pone al dia hasta el frame anterior y este frame va normal."""
+        for entity_id in self.wheel.advance(now):
+            entry = self.asleep.pop(entity_id, None)
+            if entry is None: continue
+            entity, since = entry
+            if world.entities.get(entity_id) is not entity: continue # Ya no está en el mundo
+            entity.catch_up(max(0.0, now - dt - since))
+        if profiler.enabled: profiler.count("sleep.asleep", len(self.asleep))
+
+    def wake(self, entity, now: float):
+        """Despierta antes de hora porque algo la va a tocar (se pone al dia hasta now)."""
+        entry = self.asleep.pop(entity.id, None)
+        if entry is None: return
+        self.wheel.cancel(entity.id)
+        entity.catch_up(max(0.0, now - entry[1]))
+        if profiler.enabled: profiler.count("sleep.woken")
+
+    def __contains__(self, entity) -> bool:
+        return entity.id in self.asleep
+
+    def __len__(self) -> int:
+        return len(self.asleep)
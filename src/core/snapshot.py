@@ -0,0 +1,82 @@
+"""Fotos del mundo para pintar desde otro hilo.
+
+El simulador publica al final de cada frame una WorldSnapshot: posiciones y glifos en arrays,
+reloj, datos del HUD y la cola del log. No se modifica despues de publicarse, así que el
+pintor la lee sin cerrojos mientras el simulador sigue con el frame siguiente. Las entradas
+van al reves por SimulationEngine.post (una cola de comandos que aplica el hilo del simulador).
+"""
+import threading
+from array import array
+from typing import Optional, Tuple
+
+from .entities.person import Person
+from .entities.shop import Shop
+from .entities.wolf import Wolf
+from .logger import logger
+from .profiler import profiler
+
+def glyph_of(entity) -> Tuple[str, int]:
+    """(caracter, par de color) con que se pinta una entidad."""
+    if isinstance(entity, Wolf): return "W", 3
+    if isinstance(entity, Shop): return "S", 2
+    if isinstance(entity, Person): return entity.name[0].upper(), 1
+    return "H", 2
+
+class WorldSnapshot:
+    """Lo que necesita el pintor de un frame, sin referencias a entidades vivas."""
+    __slots__ = ("seq", "tick", "time_of_day", "is_night", "scenario", "camera", "xs", "ys", "glyphs", "pairs",
+                 "people", "logs", "profile", "sim_fps")
+
+    @classmethod
+    def capture(cls, world, camera=None, seq: int = 0, sim_fps: float = 0.0) -> "WorldSnapshot":
+        snap = cls.__new__(cls)
+        snap.seq = seq
+        snap.tick = world.tick_count
+        snap.time_of_day = world.time_of_day
+        snap.is_night = world.is_night()
+        snap.scenario = world.scenario # Procedural y de solo lectura: el pintor saca su propio terreno
+        entities = list(world.entities.values())
+        if camera is None and entities: camera = entities[0]
+        snap.camera = (float(camera.x), float(camera.y)) if camera is not None else (0.0, 0.0)
+        snap.xs = array("d", [e.x for e in entities])
+        snap.ys = array("d", [e.y for e in entities])
+        glyphs = [glyph_of(e) for e in entities]
+        snap.glyphs = "".join(g[0] for g in glyphs)
+        snap.pairs = bytes(g[1] for g in glyphs)
+        snap.people = len(world.people)
+        snap.logs = tuple(logger.get_logs())
+        snap.profile = (profiler.frames, tuple(profiler.lines())) if profiler.enabled else None
+        snap.sim_fps = sim_fps
+        return snap
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+class SnapshotBuffer:
+    """Ultima foto publicada: el simulador nunca espera al pintor.
+
+    Como las fotos no se modifican, publicar es cambiar una referencia (lo que haría un triple
+    buffer, sin copiar). El pintor se salta las fotos que no le dio tiempo a leer (dropped).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._latest: Optional[WorldSnapshot] = None
+        self._read = 0 # seq de la última foto entregada al pintor
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, snapshot: WorldSnapshot):
+        with self._cond:
+            if self._latest is not None and self._latest.seq > self._read: self.dropped += 1
+            self._latest = snapshot
+            self.published += 1
+            self._cond.notify_all()
+
+    def latest(self, after: int = 0, timeout: Optional[float] = None) -> Optional[WorldSnapshot]:
+        """La foto más reciente con seq > after, esperando hasta timeout; None si no llega."""
+        with self._cond:
+            ready = lambda: self._latest is not None and self._latest.seq > after
+            if not self._cond.wait_for(ready, timeout): return None
+            self._read = self._latest.seq
+            return self._latest
@@ -0,0 +1,131 @@
+import math
+from typing import Dict, List, Optional, Tuple, Type, Union
+from .entities.base import Entity
+
+Kind = Union[None, Type, Tuple[Type, ...]] # Clase (o tupla de clases) para filtrar con isinstance
+
+class SpatialHash:
+    """Rejilla uniforme de entidades para consultas de proximidad.
+
+    Cada entidad vive en la celda de su posicion; moverla dentro de la misma celda
+    no cuesta nada. Los resultados salen en orden de insercion (el de world.entities),
+    asi que las interacciones se resuelven en el mismo orden que los bucles de antes.
+    """
+
+    def __init__(self, cell_size: float = 8.0):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Dict[int, Entity]] = {}
+        self.where: Dict[int, Tuple[int, int]] = {} # id -> celda actual
+        self.order: Dict[int, int] = {}             # id -> orden de insercion
+        self._next = 0
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def __len__(self) -> int:
+        return len(self.where)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity.id in self.where
+
+    # --- MANTENIMIENTO ---
+    def insert(self, entity: Entity):
+        if entity.id in self.where:
+            self.move(entity); return
+        cell = self._cell(entity.x, entity.y)
+        self.cells.setdefault(cell, {})[entity.id] = entity
+        self.where[entity.id] = cell
+        self.order[entity.id] = self._next
+        self._next += 1
+
+    def remove(self, entity: Entity):
+        cell = self.where.pop(entity.id, None)
+        if cell is None: return
+        self.order.pop(entity.id, None)
+        bucket = self.cells[cell]
+        del bucket[entity.id]
+        if not bucket: del self.cells[cell]
+
+    def move(self, entity: Entity):
+        """Actualiza la celda de una entidad tras cambiar su posicion."""
+        old = self.where.get(entity.id)
+        if old is None: return
+        cell = self._cell(entity.x, entity.y)
+        if cell == old: return
+        bucket = self.cells[old]
+        del bucket[entity.id]
+        if not bucket: del self.cells[old]
+        self.cells.setdefault(cell, {})[entity.id] = entity
+        self.where[entity.id] = cell
+
+    def rebuild(self, entities):
+        self.cells.clear(); self.where.clear(); self.order.clear()
+        self._next = 0
+        for entity in entities: self.insert(entity)
+
+    # --- CONSULTAS ---
+    def query_radius(self, x: float, y: float, radius: float, kind: Kind = None,
+                     exclude: Optional[Entity] = None) -> List[Entity]:
+        """Entidades a distancia euclidea estrictamente menor que radius de (x, y)."""
+        size, r2 = self.cell_size, radius * radius
+        exclude_id = exclude.id if exclude is not None else None
+        found = []
+        for gy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+            for gx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+                bucket = self.cells.get((gx, gy))
+                if not bucket: continue
+                for entity in bucket.values():
+                    if entity.id == exclude_id or (kind is not None and not isinstance(entity, kind)): continue
+                    dx, dy = entity.x - x, entity.y - y
+                    if dx * dx + dy * dy < r2: found.append(entity)
+        if len(found) > 1: found.sort(key=lambda e: self.order[e.id])
+        return found
+
+    def any_within(self, x: float, y: float, radius: float, kind: Kind = None,
+                   exclude: Optional[Entity] = None) -> bool:
+        """Como query_radius, pero se para en la primera entidad encontrada."""
+        size, r2 = self.cell_size, radius * radius
+        exclude_id = exclude.id if exclude is not None else None
+        for gy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+            for gx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+                for entity in self.cells.get((gx, gy), {}).values():
+                    if entity.id == exclude_id or (kind is not None and not isinstance(entity, kind)): continue
+                    dx, dy = entity.x - x, entity.y - y
+                    if dx * dx + dy * dy < r2: return True
+        return False
+
+    def k_nearest(self, x: float, y: float, k: int, kind: Kind = None,
+                  exclude: Optional[Entity] = None, max_radius: float = math.inf) -> List[Entity]:
+        """Las k entidades más cercanas a (x, y), de la más cercana a la más lejana."""
+        if k <= 0 or not self.where: return []
+        size = self.cell_size
+        exclude_id = exclude.id if exclude is not None else None
+        gx0, gy0 = self._cell(x, y)
+        # Ningun anillo más alla de las celdas ocupadas puede aportar nada
+        max_ring = max(max(abs(gx - gx0), abs(gy - gy0)) for gx, gy in self.cells)
+        if max_radius != math.inf: max_ring = min(max_ring, int(max_radius // size) + 1)
+        best: List[Tuple[float, int, Entity]] = []
+        for ring in range(max_ring + 1):
+            for cell in self._ring(gx0, gy0, ring):
+                for entity in self.cells.get(cell, {}).values():
+                    if entity.id == exclude_id or (kind is not None and not isinstance(entity, kind)): continue
+                    dist = math.hypot(entity.x - x, entity.y - y)
+                    if dist <= max_radius: best.append((dist, self.order[entity.id], entity))
+            if len(best) >= k:
+                best.sort(key=lambda item: item[:2])
+                del best[k:]
+                # Lo que quede en anillos exteriores está al menos a ring * size
+                if best[-1][0] <= ring * size: break
+        best.sort(key=lambda item: item[:2])
+        return [entity for _, _, entity in best[:k]]
+
+    def _ring(self, gx: int, gy: int, ring: int):
+        if ring == 0:
+            yield gx, gy
+            return
+        for dx in range(-ring, ring + 1):
+            yield gx + dx, gy - ring
+            yield gx + dx, gy + ring
+        for dy in range(-ring + 1, ring):
+            yield gx - ring, gy + dy
+            yield gx + ring, gy + dy
@@ -1,63 +1,224 @@
 from typing import Dict, List, Optional, Tuple
-from uuid import UUID
 import random
 from .entities.base import Entity
 from .scenarios.base import BaseScenario
 from .entities.town import Town
+from .entities.person import Person
+from .entities.wolf import Wolf
+from .entities.shop import Shop
+from .terrain_cache import TerrainCache, ChunkCache, terrain_window
+from .decorations import DecorationLayer
+from .poi import PoiIndex
+from .occupancy import OccupancyGrid, FREE, SOLID, INTERIOR
+from .profiler import profiler
+from .spatial import SpatialHash
+from .rng import WorldRng
+from .path_cache import PathCache
+from .hpa import ClusterGraph
+from .flow import FlowFields
+
+_SOLID_TO_WALKABLE = bytes.maketrans(b"\x00\x01", b"\x01\x00")
 
 class WorldState:
-    def __init__(self, scenario: BaseScenario):
+    def __init__(self, scenario: BaseScenario, terrain_cache: Optional[TerrainCache] = None,
+                 population=None, seed: Optional[int] = None):
         self.scenario = scenario
-        self.entities: Dict[UUID, Entity] = {}
+        # Toda la aleatoriedad de la simulacion sale de aqui (por defecto, la semilla del escenario)
+        self.rng = WorldRng(seed if seed is not None else getattr(scenario, "seed", 0))
+        self.terrain_cache = terrain_cache or TerrainCache()
+        self._terrain: Optional[ChunkCache] = None
+        self._terrain_for: Optional[BaseScenario] = None
+        self.poi_indexes: Dict[Tuple, PoiIndex] = {}
+        self.entities: Dict[int, Entity] = {}
         self.towns: List[Town] = [] # CACHE DE EDIFICIOS
+        self.population = population # Population (NumPy) opcional para simular personas por lotes
+        self._init_registries()
         self.tick_count: int = 0
         self.time_of_day = 12.0
-        self.decorations = self.scenario.generate_decorations(radius=150)
+        self.decorations = DecorationLayer(self) # Se generan por chunks al consultarlas
         self.built_structures: Dict[Tuple[int, int], Dict] = {}
+        self.occupancy = OccupancyGrid(self) # Towns + construcciones por celda
+        self.spatial = SpatialHash() # Entidades por celdas, para consultas de cercania
+        self.paths: Optional[PathCache] = None # Rutas compartidas entre personas (enable_path_cache)
+        self.hpa: Optional[ClusterGraph] = None # Rutas jerarquicas para viajes largos (enable_hierarchical_paths)
+        self.flows: Optional[FlowFields] = None # Campos de flujo hacia destinos comunes (enable_flow_fields)
+
+    # Las caches derivadas no se guardan: se regeneran al cargar la partida
+    _TRANSIENT = ("terrain_cache", "_terrain", "_terrain_for", "decorations", "poi_indexes", "occupancy", "spatial",
+                  "people", "wolves", "shops", "others", "homes")
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self._TRANSIENT}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault("built_structures", {}) # Partidas anteriores a las construcciones
+        self.__dict__.setdefault("population", None)
+        self.__dict__.setdefault("paths", None)
+        self.__dict__.setdefault("hpa", None)
+        self.__dict__.setdefault("flows", None)
+        if "rng" not in self.__dict__: self.rng = WorldRng(getattr(self.scenario, "seed", 0))
+        self.entities = {entity.id: entity for entity in self.entities.values()} # uuid4 -> ids enteros
+        self.terrain_cache = TerrainCache()
+        self._terrain = self._terrain_for = None
+        self.decorations = DecorationLayer(self)
+        self.poi_indexes = {}
+        for town in self.towns: town.world = self
+        self.occupancy = OccupancyGrid(self)
+        self.occupancy.rebuild()
+        self.spatial = SpatialHash()
+        self.spatial.rebuild(self.entities.values())
+        self._init_registries()
+        for entity in self.entities.values():
+            if entity.rng is None: entity.rng = self.rng.spawn()
+            self._register(entity)
+        if self.flows is not None: self._register_flow_goals()
+
+    def _init_registries(self):
+        # Vistas por tipo de entities (mismo orden de insercion), para no filtrar con isinstance cada frame
+        self.people: Dict[int, Person] = {}
+        self.wolves: Dict[int, Wolf] = {}
+        self.shops: Dict[int, Shop] = {}
+        self.others: Dict[int, Entity] = {} # Todo lo que no es Person ni Wolf (tiendas, casas...)
+        self.homes: Dict[str, List[Town]] = {} # Nombre -> Towns de los que es dueño o residente
+
+    @property
+    def terrain(self) -> ChunkCache:
+        """Cache de chunks del escenario activo (cambia sola al entrar/salir de una cueva)."""
+        if self._terrain_for is not self.scenario:
+            self._terrain = self.terrain_cache.for_scenario(self.scenario)
+            self._terrain_for = self.scenario
+        return self._terrain
+
+    @property
+    def pois(self) -> PoiIndex:
+        """Indice de ruinas, entradas de cueva y portales del escenario activo."""
+        key = self.scenario.cache_key()
+        index = self.poi_indexes.get(key)
+        if index is None: index = self.poi_indexes[key] = PoiIndex(self.scenario)
+        return index
+
+    def enable_path_cache(self, quantum: Optional[int] = None) -> PathCache:
+        """Activa las rutas compartidas (ver path_cache.py; con quantum>1 cambia el resultado)."""
+        if self.paths is None: self.paths = PathCache() if quantum is None else PathCache(quantum)
+        return self.paths
+
+    def enable_hierarchical_paths(self) -> ClusterGraph:
+        """Activa HPA* para viajes largos (ver hpa.py; cambia el resultado: llegan rutas que antes fallaban)."""
+        if self.hpa is None: self.hpa = ClusterGraph()
+        return self.hpa
+
+    def enable_flow_fields(self) -> FlowFields:
+        """Activa los campos de flujo hacia casas y origen (ver flow.py; cambia el resultado: rutas minimas distintas del A*)."""
+        if self.flows is None:
+            self.flows = FlowFields()
+            self._register_flow_goals()
+        return self.flows
+
+    def _register_flow_goals(self):
+        # Adonde va la gente que vuelve: el centro de cada Town y el origen si no tiene casa
+        self.flows.add_goal(0, 0)
+        for town in self.towns: self.flows.add_goal(int(town.x), int(town.y))
+
+    def set_scenario(self, scenario: BaseScenario):
+        """Cambia el escenario activo (entrar o salir de una cueva): las rutas guardadas ya no valen."""
+        self.scenario = scenario
+        if self.paths is not None: self.paths.clear()
+        if self.hpa is not None: self.hpa.clear()
+        if self.flows is not None: self.flows.clear()
+
+    def _walkable_before(self, cells) -> Optional[Dict[Tuple[int, int], bool]]:
+        """Paso de unas celdas antes de cambiarlas (solo si hay alguien que avisar: rutas, HPA*, campos)."""
+        if self.paths is None and self.hpa is None and self.flows is None: return None
+        return {(x, y): self.is_walkable(x, y) for x, y in cells}
+
+    def _walkable_changed(self, before: Optional[Dict[Tuple[int, int], bool]]):
+        """Avisa a la cache de rutas, a HPA* y a los campos de flujo de las celdas que se han cerrado o abierto."""
+        if before is None: return
+        now = {cell: self.is_walkable(*cell) for cell in before}
+        blocked = [c for c, was in before.items() if was and not now[c]]
+        opened = [c for c, was in before.items() if now[c] and not was]
+        if self.paths is not None: self.paths.cells_changed(blocked=blocked, opened=opened)
+        if self.hpa is not None and (blocked or opened): self.hpa.cells_changed(blocked + opened)
+        if self.flows is not None and (blocked or opened): self.flows.cells_changed(blocked, opened)
+
+    def _town_cells(self, town: Town, *tiles):
+        tx, ty = int(town.x), int(town.y)
+        return {(tx + dx, ty + dy) for layout in tiles for dx, dy in layout}
 
     def add_structure(self, x: int, y: int, struct_type: str):
+        before = self._walkable_before([(x, y)])
         if struct_type == "BRIDGE":
             self.built_structures[(x, y)] = {"char": "=", "solid": False, "type": "BRIDGE"}
         elif struct_type == "ROAD":
             self.built_structures[(x, y)] = {"char": ":", "solid": False, "type": "ROAD"}
         elif struct_type == "FENCE":
             self.built_structures[(x, y)] = {"char": "#", "solid": True, "type": "FENCE"}
+        else:
+            return
+        self.occupancy.refresh_tile(x, y)
+        self._walkable_changed(before)
+
+    def on_resident_added(self, town: Town, name: str):
+        """Town.add_resident avisa aqui para mantener el indice de hogares."""
+        self._add_home(name, town)
+
+    def _add_home(self, name: str, town: Town):
+        towns = self.homes.setdefault(name, [])
+        if town not in towns:
+            towns.append(town)
+            towns.sort(key=self.towns.index) # El primer Town de la lista manda, como antes
+
+    def home_of(self, name: str) -> Optional[Town]:
+        """Primer Town del que name es dueño o residente."""
+        towns = self.homes.get(name)
+        return towns[0] if towns else None
+
+    def on_town_changed(self, town: Town, old_tiles: Dict):
+        """Town.upgrade avisa aqui cuando cambia su huella."""
+        before = self._walkable_before(self._town_cells(town, town.tiles, old_tiles))
+        self.occupancy.update_town(town, old_tiles)
+        self._walkable_changed(before)
 
     def is_walkable(self, x: float, y: float) -> bool:
         bx, by = int(x), int(y)
+        if profiler.enabled: profiler.count("world.is_walkable")
         
-        # 1. Comprobar si hay un edificio (Town) en esa posición (USANDO CACHE)
-        for town in self.towns:
-            tile = town.get_tile_at(bx, by)
-            if tile: return not tile["solid"]
-
-        # 2. Construcciones manuales
-        if (bx, by) in self.built_structures:
-            return not self.built_structures[(bx, by)]["solid"]
+        # 1-2. Edificios (Town) y construcciones manuales, ya estampados en la capa de ocupacion
+        code = self.occupancy.code_at(bx, by)
+        if code != FREE: return code != SOLID
         
-        # 3. Escenario base
-        return self.scenario.is_walkable(x, y)
+        # 3. Escenario base (cacheado por chunks)
+        return not self.terrain.is_solid(bx, by)
 
     def get_ground_char(self, x: int, y: int) -> str:
-        # 1. Prioridad: Edificios complejos (Town)
-        for town in self.towns:
-            tile = town.get_tile_at(x, y)
-            if tile: return tile["char"]
-
-        # 2. Construcciones manuales
-        if (x, y) in self.built_structures:
-            return self.built_structures[(x, y)]["char"]
+        # 1-2. Prioridad: Edificios complejos (Town) y construcciones manuales
+        code, char = self.occupancy.get(x, y)
+        if code != FREE: return char
         
-        # 3. Escenario base
-        biome_id = self.scenario.get_biome_id(x, y)
-        return self.scenario.get_ground_char(biome_id)
+        # 3. Escenario base (cacheado por chunks)
+        return self.terrain.get_ground_char(x, y)
+
+    def get_walkable_window(self, x0: int, y0: int, width: int, height: int) -> bytearray:
+        """Mascara de paso (1 = transitable) de un rectangulo de celdas enteras, en una sola consulta."""
+        walkable = self.terrain.get_solid_mask(x0, y0, width, height).translate(_SOLID_TO_WALKABLE)
+        self.occupancy.apply_walkable(walkable, x0, y0, width, height)
+        return walkable
 
     def get_biome_at(self, x: float, y: float) -> str:
         # Si está dentro de un edificio, el bioma es INTERIOR para recuperar energía
-        for town in self.towns:
-            if town.is_inside(x, y):
-                return "INTERIOR"
-        return self.scenario.get_biome_id(x, y)
+        if profiler.enabled: profiler.count("world.biome")
+        if self.occupancy.code_at(int(x), int(y)) == INTERIOR:
+            return "INTERIOR"
+        return self.terrain.get_biome_id(x, y)
+
+    def get_terrain_biome(self, x: float, y: float) -> str:
+        """Bioma del escenario en la celda, sin tener en cuenta edificios."""
+        return self.terrain.get_biome_id(x, y)
+
+    def get_terrain_window(self, x0: float, y0: float, width: int, height: int, step: float = 1.0):
+        """Ventana de terreno para pintar (ver terrain_window)."""
+        return terrain_window(self.terrain, x0, y0, width, height, step)
 
     def update_time(self, dt: float):
         self.time_of_day += (dt * 0.1)
@@ -66,14 +227,66 @@ class WorldState:
     def is_night(self) -> bool:
         return self.time_of_day > 20.0 or self.time_of_day < 6.0
 
-    def add_entity(self, entity: Entity):
-        # Evitar spawn en muros de Town
-        if not self.is_walkable(entity.x, entity.y):
+    def add_entity(self, entity: Entity, snap: bool = True):
+        # Evitar spawn en muros de Town (snap=False: entra tal cual, p.ej. traspasada desde otra region)
+        if snap and not self.is_walkable(entity.x, entity.y):
             entity.x += 2.0; entity.y += 2.0
             
+        if entity.rng is None: entity.rng = self.rng.spawn()
         self.entities[entity.id] = entity
         if isinstance(entity, Town):
             self.towns.append(entity)
+            entity.world = self
+            before = self._walkable_before(self._town_cells(entity, entity.tiles))
+            self.occupancy.add_town(entity)
+            self._walkable_changed(before)
+            if self.flows is not None: self.flows.add_goal(int(entity.x), int(entity.y))
+        self._register(entity)
+        self.spatial.insert(entity)
+
+    def spawn_person(self, name: str, x: float = 0.0, y: float = 0.0, **kwargs) -> Person:
+        """Crea y añade una persona: en la Population si la hay, si no una Person normal."""
+        kwargs.setdefault("rng", self.rng.spawn()) # Su stream ya en el constructor (riqueza inicial)
+        if self.population is not None: person = self.population.spawn(name, x, y, **kwargs)
+        else: person = Person(name, x, y, **kwargs)
+        self.add_entity(person)
+        return person
+
+    def spawn_wolf(self, name: str, x: float, y: float) -> Wolf:
+        """Crea y añade un lobo con su stream del mundo (su primer objetivo sale de él)."""
+        wolf = Wolf(name, x, y, rng=self.rng.spawn())
+        self.add_entity(wolf)
+        return wolf
+
+    def _register(self, entity: Entity):
+        if isinstance(entity, Person): self.people[entity.id] = entity
+        elif isinstance(entity, Wolf): self.wolves[entity.id] = entity
+        else: self.others[entity.id] = entity
+        if isinstance(entity, Shop): self.shops[entity.id] = entity
+        if isinstance(entity, Town):
+            for name in [entity.owner_name] + entity.residents: self._add_home(name, entity)
+
+    def remove_entity(self, entity: Entity) -> bool:
+        if self.entities.pop(entity.id, None) is None: return False
+        for registry in (self.people, self.wolves, self.shops, self.others):
+            registry.pop(entity.id, None)
+        self.spatial.remove(entity)
+        if getattr(entity, "pooled", False): entity._pop.release(entity)
+        if isinstance(entity, Town):
+            before = self._walkable_before(self._town_cells(entity, entity.tiles))
+            self.occupancy.remove_town(entity)
+            self._walkable_changed(before)
+            for name, towns in list(self.homes.items()):
+                if entity in towns: towns.remove(entity)
+                if not towns: del self.homes[name]
+            self.towns.remove(entity)
+            entity.world = None
+            center = (int(entity.x), int(entity.y))
+            if self.flows is not None and center != (0, 0) and all((int(t.x), int(t.y)) != center for t in self.towns):
+                self.flows.remove_goal(*center)
+            for person in self.people.values():
+                if person.home_reference is entity: person.home_reference = None
+        return True
 
     def get_all_entities(self) -> List[Entity]:
         return list(self.entities.values())
@@ -82,3 +295,4 @@ class WorldState:
         self.update_time(delta_time)
         for entity in self.entities.values():
             entity.update(delta_time)
+            self.spatial.move(entity)
@@ -2,6 +2,9 @@ import random
 
 class Storyteller:
     """Transforma eventos crudos en narrativa profunda."""
+
+    def __init__(self, rng=random):
+        self.rng = rng # El motor le da el stream "storyteller" de su mundo
     
     def narrate(self, raw_message: str) -> str:
         # Si no tiene prefijo, lo devolvemos tal cual (o lo embellecemos levemente)
@@ -17,7 +20,7 @@ class Storyteller:
                 f"Un destello en el suelo revela que {content}.",
                 f"El destino ha querido que {content}."
             ]
-            return random.choice(templates)
+            return self.rng.choice(templates)
             
         elif prefix == "ALARM" or prefix == "CRISIS":
             templates = [
@@ -25,7 +28,7 @@ class Storyteller:
                 f"El corazón se acelera: {content}",
                 f"En un giro dramático, {content}"
             ]
-            return random.choice(templates)
+            return self.rng.choice(templates)
             
         elif prefix == "ZEN" or prefix == "TALK":
             templates = [
@@ -33,7 +36,7 @@ class Storyteller:
                 f"Las palabras fluyen: {content}",
                 f"{content} (La conexión se fortalece)."
             ]
-            return random.choice(templates)
+            return self.rng.choice(templates)
             
         elif prefix == "BUILD":
             return f"El progreso continúa: {content}"
@@ -0,0 +1,146 @@
+"""Terreno horneado en disco: chunks pre-generados de una semilla, leidos con mmap.
+
+Formato (little endian, version 1):
+    cabecera  HEADER (magic, version, tamaño de chunk, semilla, nivel, radio en chunks, bytes de tabla)
+    tabla     "Tipo de escenario\\nBIOMA_0\\nBIOMA_1..." en UTF-8
+    datos     alineados a 4096 bytes; un bloque por chunk (fila a fila, cy y luego cx en
+              [-radio, radio)) con codes | chars | solid | shade de CHUNK_SIZE^2 bytes cada uno.
+
+Uso: python -m src.core.terrain_bake --seed 1234 --radius 1024 saves/terrain_1234.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Optional, Tuple
+
+from .scenarios.base import BaseScenario
+from .scenarios.nature import NatureScenario
+from .scenarios.urban import UrbanScenario
+from .scenarios.cave import CaveScenario
+from .terrain_cache import TerrainChunk, CHUNK_SIZE
+
+MAGIC = b"ASCTERR\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqiiI")
+PAGE = 4096
+FIELD_BYTES = CHUNK_SIZE * CHUNK_SIZE
+CHUNK_BYTES = 4 * FIELD_BYTES
+NO_VALUE = -1 # Semilla/nivel ausentes (p.ej. UrbanScenario)
+
+SCENARIOS = {"nature": NatureScenario, "urban": UrbanScenario, "cave": CaveScenario}
+
+def make_scenario(kind: str, seed: Optional[int], level: Optional[int]) -> BaseScenario:
+    """Crea el escenario a partir de su nombre de clase o de su alias de linea de comandos."""
+    cls = SCENARIOS.get(kind) or {c.__name__: c for c in SCENARIOS.values()}[kind]
+    if cls is CaveScenario: return CaveScenario(seed=seed, level=level)
+    return cls(seed=seed)
+
+def _data_offset(table_len: int) -> int:
+    return -(-(HEADER.size + table_len) // PAGE) * PAGE
+
+def bake(scenario: BaseScenario, radius: int, path: str) -> int:
+    """Escribe los chunks que cubren [-radius, radius) en ambos ejes. Devuelve el radio en chunks."""
+    kind, seed, level = scenario.cache_key()
+    radius_chunks = max(1, -(-radius // CHUNK_SIZE))
+    table = "\n".join((kind,) + scenario.biome_table()).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, CHUNK_SIZE,
+                         NO_VALUE if seed is None else seed, NO_VALUE if level is None else level,
+                         radius_chunks, len(table))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(table)
+        f.write(b"\x00" * (_data_offset(len(table)) - HEADER.size - len(table)))
+        for cy in range(-radius_chunks, radius_chunks):
+            for cx in range(-radius_chunks, radius_chunks):
+                chunk = TerrainChunk.generate(scenario, cx, cy)
+                for field in (chunk.codes, chunk.chars, chunk.solid, chunk.shade):
+                    f.write(bytes(field))
+    os.replace(tmp_path, path) # Nunca dejar un fichero a medias con el nombre final
+    return radius_chunks
+
+class BakedTerrain:
+    """Fichero horneado mapeado en memoria: los chunks son vistas sin copia."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._map)
+
+        if len(self._map) < HEADER.size:
+            self.close(); raise ValueError(f"{path}: no es un fichero de terreno horneado")
+        magic, version, chunk_size, seed, level, radius_chunks, table_len = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close(); raise ValueError(f"{path}: no es un fichero de terreno horneado")
+        if version != VERSION or chunk_size != CHUNK_SIZE:
+            self.close(); raise ValueError(f"{path}: version {version}/chunk {chunk_size} no soportada")
+
+        table = bytes(self._map[HEADER.size:HEADER.size + table_len]).decode("utf-8").split("\n")
+        self.scenario_type = table[0]
+        self.biome_names: Tuple[str, ...] = tuple(table[1:])
+        self.seed = None if seed == NO_VALUE else seed
+        self.level = None if level == NO_VALUE else level
+        self.cache_key = (self.scenario_type, self.seed, self.level)
+        self.radius_chunks = radius_chunks
+        self._side = 2 * radius_chunks
+        self._data_offset = _data_offset(table_len)
+
+        expected = self._data_offset + self._side * self._side * CHUNK_BYTES
+        if len(self._map) < expected:
+            self.close(); raise ValueError(f"{path}: fichero truncado ({len(self._map)} < {expected} bytes)")
+
+    def covers(self, cx: int, cy: int) -> bool:
+        r = self.radius_chunks
+        return -r <= cx < r and -r <= cy < r
+
+    def get_chunk(self, cx: int, cy: int) -> Optional[TerrainChunk]:
+        if not self.covers(cx, cy): return None
+        r = self.radius_chunks
+        start = self._data_offset + ((cy + r) * self._side + (cx + r)) * CHUNK_BYTES
+        view = self._view
+        return TerrainChunk(view[start:start + FIELD_BYTES],
+                            view[start + FIELD_BYTES:start + 2 * FIELD_BYTES],
+                            view[start + 2 * FIELD_BYTES:start + 3 * FIELD_BYTES],
+                            view[start + 3 * FIELD_BYTES:start + CHUNK_BYTES])
+
+    def make_scenario(self) -> BaseScenario:
+        """Escenario procedural equivalente, para lo que quede fuera del area horneada."""
+        return make_scenario(self.scenario_type, self.seed, self.level)
+
+    def close(self):
+        # Las vistas entregadas deben soltarse antes de cerrar el mmap
+        try:
+            self._view.release()
+            self._map.close()
+        except (BufferError, ValueError):
+            pass
+        self._file.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Hornea chunks de terreno a un fichero binario.")
+    parser.add_argument("output")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="nature")
+    parser.add_argument("--seed", type=int, required=True)
+    parser.add_argument("--level", type=int, default=1, help="Nivel de la cueva")
+    parser.add_argument("--radius", type=int, default=512, help="Radio en celdas alrededor del origen")
+    args = parser.parse_args(argv)
+
+    scenario = make_scenario(args.scenario, args.seed, args.level)
+    start = time.perf_counter()
+    radius_chunks = bake(scenario, args.radius, args.output)
+    side = 2 * radius_chunks
+    print(f"BAKE: {side}x{side} chunks ({side * CHUNK_SIZE} celdas de lado) en {args.output} "
+          f"[{os.path.getsize(args.output) // (1024 * 1024)} MB, {time.perf_counter() - start:.1f}s]")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
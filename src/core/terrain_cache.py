@@ -0,0 +1,178 @@
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Tuple
+from .scenarios.base import BaseScenario, TerrainWindow
+from .profiler import profiler
+
+CHUNK_BITS = 6 # Chunks de 64x64 celdas
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+class TerrainChunk:
+    """Terreno pre-calculado de un chunk (arrays de bytes, fila a fila).
+
+    Los campos pueden ser arrays propios o vistas (memoryview) de un fichero horneado.
+    """
+    __slots__ = ("codes", "chars", "solid", "shade")
+
+    def __init__(self, codes, chars, solid, shade):
+        self.codes = codes
+        self.chars = chars
+        self.solid = solid
+        self.shade = shade
+
+    @classmethod
+    def generate(cls, scenario: BaseScenario, cx: int, cy: int) -> "TerrainChunk":
+        x0, y0 = cx << CHUNK_BITS, cy << CHUNK_BITS
+        window = scenario.get_window(x0, y0, CHUNK_SIZE, CHUNK_SIZE)
+        return cls(window.codes, window.chars.encode("latin-1"), window.solid, window.shade)
+
+    def nbytes(self) -> int:
+        return len(self.codes) + len(self.chars) + len(self.solid) + len(self.shade)
+
+class ChunkCache:
+    """Cache LRU de chunks de terreno de UN escenario, con tope de memoria."""
+
+    def __init__(self, scenario: BaseScenario, max_bytes: int, baked=None):
+        self.scenario = scenario
+        self.max_bytes = max_bytes
+        self.biome_names = scenario.biome_table()
+        self.chunks: "OrderedDict[Tuple[int, int], TerrainChunk]" = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Terreno horneado en disco (BakedTerrain): sus chunks son vistas del mmap y no cuentan para el tope
+        if baked is not None: self._check_baked(baked)
+        self.baked = baked
+        self.baked_views: Dict[Tuple[int, int], TerrainChunk] = {}
+        self.baked_hits = 0
+
+    def _check_baked(self, baked):
+        if tuple(baked.biome_names) != self.biome_names:
+            raise ValueError(f"{baked.path}: la tabla de biomas no coincide con {self.scenario.name}")
+
+    def get_chunk(self, cx: int, cy: int) -> TerrainChunk:
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+            return chunk
+
+        if self.baked is not None:
+            chunk = self.baked_views.get(key)
+            if chunk is None:
+                chunk = self.baked.get_chunk(cx, cy)
+                if chunk is not None: self.baked_views[key] = chunk
+            if chunk is not None:
+                self.baked_hits += 1
+                return chunk
+
+        self.misses += 1
+        if profiler.enabled: start = time.perf_counter()
+        chunk = self._load_chunk(cx, cy)
+        if profiler.enabled: profiler.record("terrain.chunk", time.perf_counter() - start)
+        self.chunks[key] = chunk
+        self.bytes_used += chunk.nbytes()
+        while self.bytes_used > self.max_bytes and len(self.chunks) > 1:
+            _, old = self.chunks.popitem(last=False)
+            self.bytes_used -= old.nbytes()
+            self.evictions += 1
+        return chunk
+
+    def _load_chunk(self, cx: int, cy: int) -> TerrainChunk:
+        return TerrainChunk.generate(self.scenario, cx, cy)
+
+    # --- CONSULTAS POR CELDA (coordenadas truncadas con int(), como el resto del mundo) ---
+    def _locate(self, x: float, y: float) -> Tuple[TerrainChunk, int]:
+        bx, by = int(x), int(y)
+        chunk = self.get_chunk(bx >> CHUNK_BITS, by >> CHUNK_BITS)
+        return chunk, ((by & CHUNK_MASK) << CHUNK_BITS) | (bx & CHUNK_MASK)
+
+    def get_biome_id(self, x: float, y: float) -> str:
+        chunk, i = self._locate(x, y)
+        return self.biome_names[chunk.codes[i]]
+
+    def get_ground_char(self, x: float, y: float) -> str:
+        chunk, i = self._locate(x, y)
+        return chr(chunk.chars[i])
+
+    def is_solid(self, x: float, y: float) -> bool:
+        chunk, i = self._locate(x, y)
+        return chunk.solid[i] == 1
+
+    # --- CONSULTAS POR RECTANGULO (se recortan de los chunks) ---
+    def _gather(self, field: str, x0: int, y0: int, width: int, height: int, out):
+        for y in range(y0, y0 + height):
+            cy, row = y >> CHUNK_BITS, (y & CHUNK_MASK) << CHUNK_BITS
+            x = x0
+            while x < x0 + width:
+                cx, col = x >> CHUNK_BITS, x & CHUNK_MASK
+                span = min(CHUNK_SIZE - col, x0 + width - x)
+                data = getattr(self.get_chunk(cx, cy), field)
+                out += data[row + col:row + col + span]
+                x += span
+        return out
+
+    def get_solid_mask(self, x0: int, y0: int, width: int, height: int) -> bytearray:
+        return self._gather("solid", x0, y0, width, height, bytearray())
+
+    def get_window(self, x0: int, y0: int, width: int, height: int) -> TerrainWindow:
+        chars = self._gather("chars", x0, y0, width, height, bytearray()).decode("latin-1")
+        return TerrainWindow(
+            x0, y0, width, height, 1.0, self.biome_names,
+            array('B', self._gather("codes", x0, y0, width, height, bytearray())), chars,
+            self.get_solid_mask(x0, y0, width, height),
+            self._gather("shade", x0, y0, width, height, bytearray()))
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "chunks": len(self.chunks), "bytes": self.bytes_used, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "baked_hits": self.baked_hits, "baked_chunks": len(self.baked_views),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+class TerrainCache:
+    """Una ChunkCache por escenario (superficie y cada cueva por semilla/nivel)."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_scenarios: int = 4):
+        self.max_bytes = max_bytes         # Tope de memoria de CADA escenario
+        self.max_scenarios = max_scenarios # Escenarios con cache viva (los más recientes)
+        self.caches: "OrderedDict[Tuple, ChunkCache]" = OrderedDict()
+        self.baked: Dict[Tuple, object] = {} # cache_key -> BakedTerrain
+
+    def attach_baked(self, baked):
+        """Usa un fichero horneado (BakedTerrain) para el escenario con su misma cache_key."""
+        self.baked[baked.cache_key] = baked
+        cache = self.caches.get(baked.cache_key)
+        if cache is not None:
+            cache._check_baked(baked)
+            cache.baked, cache.baked_views = baked, {}
+
+    def for_scenario(self, scenario: BaseScenario) -> ChunkCache:
+        key = scenario.cache_key()
+        cache = self.caches.get(key)
+        if cache is None:
+            cache = self.caches[key] = self._new_cache(scenario)
+            while len(self.caches) > self.max_scenarios:
+                self.caches.popitem(last=False)
+        self.caches.move_to_end(key)
+        return cache
+
+    def _new_cache(self, scenario: BaseScenario) -> ChunkCache:
+        return ChunkCache(scenario, self.max_bytes, self.baked.get(scenario.cache_key()))
+
+    def stats(self) -> Dict[Tuple, Dict[str, float]]:
+        return {key: cache.stats() for key, cache in self.caches.items()}
+
+def terrain_window(chunks: ChunkCache, x0: float, y0: float, width: int, height: int,
+                   step: float = 1.0) -> TerrainWindow:
+    """Ventana de terreno para pintar: a escala 1 sale de la cache (celdas enteras, redondeando hacia abajo)."""
+    if step == 1.0:
+        return chunks.get_window(math.floor(x0), math.floor(y0), width, height)
+    return chunks.scenario.get_window(x0, y0, width, height, step)
@@ -1,8 +1,7 @@
 import curses
-from ...core.state import WorldState
-from ...core.logger import logger
-from ...core.entities.person import Person
-from ...core.entities.town import Town
+from ...core.poi import PoiIndex
+from ...core.snapshot import WorldSnapshot
+from ...core.terrain_cache import TerrainCache, terrain_window
 
 class CursesRenderer:
     def __init__(self, stdscr):
@@ -13,6 +12,8 @@ class CursesRenderer:
         self.camera_focus = None
         self.show_legend = False
         self.zoom = 1.0 # 1.0: Normal, >1: Zoom Out, <1: Zoom In
+        self.terrain = TerrainCache() # Propia: el pintor puede ir en otro hilo que el simulador
+        self.poi_indexes = {}
         
         if curses.has_colors():
             curses.start_color()
@@ -41,77 +42,54 @@ class CursesRenderer:
         self.log_win = curses.newwin(log_h, sw, top_h, 0)
         self.stdscr.refresh()
 
-    def render(self, world_state: WorldState):
+    def render(self, view):
+        """Pinta una WorldSnapshot (o un WorldState, del que saca la foto aqui mismo)."""
+        if not isinstance(view, WorldSnapshot): view = WorldSnapshot.capture(view, self.camera_focus)
         sh, sw = self.stdscr.getmaxyx()
         if not self.map_win: self._init_windows(); return
 
         self.map_win.erase()
         self.stat_win.erase()
         self.log_win.erase()
-        
-        all_entities = world_state.get_all_entities()
-        if not self.camera_focus and all_entities: self.camera_focus = all_entities[0]
 
-        cam_x, cam_y = float(self.camera_focus.x), float(self.camera_focus.y)
+        cam_x, cam_y = view.camera
         mh, mw = self.map_win.getmaxyx()
         mid_x, mid_y = mw // 2, mh // 2
-        scenario = world_state.scenario
-        is_night = world_state.is_night()
+        scenario = view.scenario
         
-        # 1. MAPA Y CONSTRUCCIONES (CON ZOOM)
-        for screen_y in range(1, mh - 1):
-            for screen_x in range(1, mw - 1):
-                # Coordenadas del mundo basadas en zoom
-                wx = cam_x + (screen_x - mid_x) * self.zoom
-                wy = cam_y + (screen_y - mid_y) * self.zoom
-                
-                # 1. TERRENO Y ESTRUCTURAS
-                biome_id = scenario.get_biome_id(wx, wy)
-                char = scenario.get_ground_char(int(wx), int(wy), biome_id)
-                stats = scenario.get_biome_stats(biome_id)
-                pair_id = stats.get("pair_id", 10)
-                
-                # 2. SOMBREADO DINÁMICO (Relieve)
-                local_noise = scenario._noise(wx * 0.1, wy * 0.1)
-                attr = curses.A_BOLD if local_noise > 0 else curses.A_DIM
-                
-                # 3. COLORES ESPECIALES (Ruinas/Cuevas)
-                if char in ["#", "X"]: pair_id = 5; attr = curses.A_BOLD # Muros
-                elif char == "0": pair_id = 3; attr = curses.A_BOLD # Entrada oscura
-                
-                try: self.map_win.addch(screen_y, screen_x, char, attr | curses.color_pair(pair_id))
-                except: pass
+        # 1. MAPA Y CONSTRUCCIONES (CON ZOOM): una sola consulta por lotes para toda la ventana
+        # El terreno sale de la cache propia del pintor: no comparte estructuras con el hilo del simulador
+        view_w, view_h = mw - 2, mh - 2
+        window = terrain_window(self.terrain.for_scenario(scenario), cam_x + (1 - mid_x) * self.zoom,
+                                cam_y + (1 - mid_y) * self.zoom, view_w, view_h, self.zoom)
+        self._draw_terrain(window, scenario)
 
         # 2. ENTIDADES (CON ZOOM)
-        from ...core.entities.wolf import Wolf
-        from ...core.entities.shop import Shop
-        
-        for entity in all_entities:
-            ex = mid_x + (entity.x - cam_x) / self.zoom
-            ey = mid_y + (entity.y - cam_y) / self.zoom
+        xs, ys, glyphs, pairs = view.xs, view.ys, view.glyphs, view.pairs
+        for i in range(len(view)):
+            ex = mid_x + (xs[i] - cam_x) / self.zoom
+            ey = mid_y + (ys[i] - cam_y) / self.zoom
             
             if 1 <= ex < mw - 1 and 1 <= ey < mh - 1:
-                if isinstance(entity, Wolf): char, cp, attr = "W", 3, curses.A_BOLD
-                elif isinstance(entity, Shop): char, cp, attr = "S", 2, curses.A_BOLD
-                elif isinstance(entity, Person):
-                    char = entity.name[0].upper()
-                    cp, attr = 1, curses.A_BOLD
-                else: char, cp, attr = "H", 2, curses.A_BOLD
-                try: self.map_win.addch(int(ey), int(ex), char, curses.color_pair(cp) | attr)
+                try: self.map_win.addch(int(ey), int(ex), glyphs[i], curses.color_pair(pairs[i]) | curses.A_BOLD)
                 except: pass
 
         # 4. STATUS Y RELOJ
         self.stat_win.box()
-        h_int = int(world_state.time_of_day)
+        h_int = int(view.time_of_day)
         time_str = f"{h_int:02d}:00"
-        self.stat_win.addstr(0, 2, f" {time_str} {'NIGHT' if is_night else 'DAY'} ", curses.A_REVERSE)
+        self.stat_win.addstr(0, 2, f" {time_str} {'NIGHT' if view.is_night else 'DAY'} ", curses.A_REVERSE)
         self.stat_win.addstr(2, 2, f" ZOOM: x{1.0/self.zoom:.2f} ", curses.A_BOLD)
         self.stat_win.addstr(4, 2, f" POS: {int(cam_x)},{int(cam_y)} ", curses.color_pair(1))
+        portal = self._pois(scenario).nearest(cam_x, cam_y, ("CAVE", "EXIT"), max_cells=16)
+        if portal:
+            label = "CUEVA" if portal.kind == "CAVE" else "SALIDA"
+            self.stat_win.addstr(5, 2, f" {label}: {portal.x},{portal.y} ", curses.color_pair(3))
+        if view.sim_fps: self.stat_win.addstr(7, 2, f" SIM: {view.sim_fps:4.1f} fps  tick {view.tick} ")
 
         # 5. LOGS
         self.log_win.box()
-        logs = logger.get_logs()
-        for i, entry in enumerate(reversed(logs)):
+        for i, entry in enumerate(reversed(view.logs)):
             if i < (sh - mh - 4):
                 try:
                     msg = entry
@@ -125,26 +103,58 @@ class CursesRenderer:
         self.log_win.noutrefresh()
         curses.doupdate()
         if self.show_legend: self._render_legend_modal(scenario)
+        if view.profile: self._render_profiler_overlay(*view.profile)
 
-        # 5. LOGS
-        self.log_win.box()
-        logs = logger.get_logs()
-        for i, entry in enumerate(reversed(logs)):
-            if i < (sh - mh - 4):
-                try:
-                    msg = entry
-                    self.log_win.addstr(i + 1, 1, msg[:sw-2])
-                except: pass
+    def _pois(self, scenario) -> PoiIndex:
+        key = scenario.cache_key()
+        index = self.poi_indexes.get(key)
+        if index is None: index = self.poi_indexes[key] = PoiIndex(scenario)
+        return index
 
-        self.map_win.box()
-        self.map_win.addstr(0, 2, f" MUNDO: {scenario.name} ", curses.A_BOLD)
-        self.map_win.noutrefresh()
-        self.stat_win.noutrefresh()
-        self.log_win.noutrefresh()
-        curses.doupdate()
-        if self.show_legend: self._render_legend_modal(scenario)
+    def _draw_terrain(self, window, scenario):
+        """Pinta la ventana de terreno agrupando celdas contiguas con el mismo atributo."""
+        # Atributos por codigo de bioma: SOMBREADO DINÁMICO (Relieve) en negrita o tenue
+        pairs = [curses.color_pair(scenario.get_biome_stats(name).get("pair_id", 10)) for name in window.biome_names]
+        lit = [curses.A_BOLD | cp for cp in pairs]
+        dim = [curses.A_DIM | cp for cp in pairs]
+        # COLORES ESPECIALES (Ruinas/Cuevas)
+        wall_attr = curses.A_BOLD | curses.color_pair(5) # Muros
+        cave_attr = curses.A_BOLD | curses.color_pair(3) # Entrada oscura
+        codes, shade, width = window.codes, window.shade, window.width
+
+        for row in range(window.height):
+            base = row * width
+            chars = window.row_chars(row)
+            run_start, run_attr = 0, None
+            for col in range(width):
+                char = chars[col]
+                if char == "#" or char == "X": attr = wall_attr
+                elif char == "0": attr = cave_attr
+                else:
+                    i = base + col
+                    attr = lit[codes[i]] if shade[i] else dim[codes[i]]
+                if attr != run_attr:
+                    if run_attr is not None:
+                        try: self.map_win.addstr(row + 1, run_start + 1, chars[run_start:col], run_attr)
+                        except: pass
+                    run_start, run_attr = col, attr
+            if run_attr is not None:
+                try: self.map_win.addstr(row + 1, run_start + 1, chars[run_start:], run_attr)
+                except: pass
 
     def toggle_legend(self): self.show_legend = not self.show_legend
+    def _render_profiler_overlay(self, frames, lines):
+        """Tiempos por fase (media, p95 y máximo en ms) y contadores por frame, arriba a la derecha."""
+        sh, sw = self.stdscr.getmaxyx()
+        w = min(46, sw - 2)
+        h = min(len(lines) + 3, sh - 2)
+        if h < 4 or w < 20: return
+        pw = curses.newwin(h, w, 1, sw - w - 1); pw.box()
+        pw.addstr(0, 2, f" PERFIL {frames} frames  avg/p95/max ms ", curses.A_BOLD)
+        for i, line in enumerate(lines[:h - 2]):
+            try: pw.addstr(i + 1, 1, line[:w - 2])
+            except: pass
+        pw.refresh()
     def _render_legend_modal(self, scenario):
         sh, sw = self.stdscr.getmaxyx()
         h, w = 18, 55
@@ -2,6 +2,9 @@ import sys
 import os
 import curses
 import random
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Asegurar path para importaciones relativas
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -12,9 +15,14 @@ from src.core.entities.wolf import Wolf
 from src.core.entities.shop import Shop
 from src.core.state import WorldState
 from src.core.engine import SimulationEngine
+from src.core.lod import LevelOfDetail
+from src.core.snapshot import SnapshotBuffer
 from src.interfaces.cli.curses_renderer import CursesRenderer
 from src.core.persistence import PersistenceManager
 from src.core.logger import logger
+from src.core.profiler import profiler
+from src.core.terrain_bake import BakedTerrain
+from src.core import aio
 
 # ESCENARIOS
 from src.core.scenarios.nature import NatureScenario
@@ -24,11 +32,15 @@ from src.core.scenarios.nature import NatureScenario
 from src.core.scenarios.urban import UrbanScenario
 from src.core.scenarios.cave import CaveScenario
 
-def main(stdscr):
-    """Bucle principal gestionado por curses."""
+def main(stdscr, use_asyncio: bool = False, baked: BakedTerrain = None):
+    """Bucle principal gestionado por curses (con use_asyncio, un solo hilo con tareas de asyncio).
+
+    baked: terreno horneado (python -m src.core.terrain_bake); la superficie es su escenario (tipo,
+    semilla y nivel) y sus chunks se leen del fichero en vez de generarse.
+    """
     
     # 1. ESTADO DE ESCENARIOS
-    surface_scenario = NatureScenario()
+    surface_scenario = baked.make_scenario() if baked is not None else NatureScenario()
     cave_scenario = None # Se generará al entrar
     active_scenario = surface_scenario
     
@@ -41,69 +53,167 @@ def main(stdscr):
     focus_point = Shop(0, 0)
     world.add_entity(focus_point)
 
-    # 3. Motor y Renderer
+    # 3. Motor y Renderer: el simulador corre en su hilo y publica fotos; este hilo pinta y lee el teclado
     engine = SimulationEngine(world, fps=15)
     renderer = CursesRenderer(stdscr)
+    if baked is not None: # El mundo y el pintor tienen caches separadas: las dos leen del fichero
+        world.terrain_cache.attach_baked(baked)
+        renderer.terrain.attach_baked(baked)
     renderer.camera_focus = focus_point
-    
-    def wrapped_renderer(ws):
+    engine.camera = focus_point
+    if not use_asyncio: engine.snapshots = SnapshotBuffer() # Con asyncio la foto la saca aio.render
+    engine.lod = LevelOfDetail(focus_point) # Detalle completo solo alrededor de la camara
+    engine.enable_sleep() # Quien está quieto no se visita hasta que le toque
+    world.enable_path_cache() # Viajes parecidos (a casa, al origen) comparten ruta
+    world.enable_hierarchical_paths() # Viajes largos por el grafo de clusters, sin agotar el A*
+
+    # COMANDOS: todo lo que toca el mundo se encola y lo aplica el hilo del simulador entre frames
+    def move_focus(dx, dy):
+        def command(ws):
+            focus_point.x += dx
+            focus_point.y += dy
+        engine.post(command)
+
+    def use_portal(ws):
         nonlocal active_scenario, cave_scenario, surface_pos
-        renderer.render(ws)
-        stdscr.nodelay(True)
-        key = stdscr.getch()
+        # Comprobar qué hay bajo los pies (entrada de cueva o portal de vuelta)
+        portal = ws.pois.at(focus_point.x, focus_point.y, ("CAVE", "EXIT"))
         
+        if portal:
+            if active_scenario == surface_scenario:
+                # ENTRAR A CUEVA
+                logger.log("DESCEND: Entrando a las profundidades...")
+                surface_pos = (focus_point.x, focus_point.y)
+                cave_scenario = CaveScenario(seed=surface_scenario.seed + int(focus_point.x + focus_point.y))
+                active_scenario = cave_scenario
+                ws.set_scenario(active_scenario)
+                focus_point.x, focus_point.y = 0, 0 # Empezar en el centro del submundo
+            else:
+                # SALIR A SUPERFICIE
+                logger.log("ASCEND: Volviendo a la superficie...")
+                active_scenario = surface_scenario
+                ws.set_scenario(active_scenario)
+                focus_point.x, focus_point.y = surface_pos[0], surface_pos[1]
+
+    def save(ws):
+        if use_asyncio: # Estamos dentro del bucle: guardar sin parar el mundo
+            asyncio.ensure_future(save_async(ws))
+            return
+        PersistenceManager.save_game(ws)
+        logger.log("SYS: Partida guardada correctamente.")
+
+    async def save_async(ws):
+        if await aio.save(ws): logger.log("SYS: Partida guardada correctamente.")
+
+    def toggle_profiler(ws):
+        logger.log(f"SYS: Profiler {'activado' if profiler.toggle() else 'desactivado'}.")
+
+    def dump_profile(ws):
+        path = profiler.dump()
+        if path: logger.log(f"SYS: Perfil volcado en {path}.")
+
+    def set_zoom(zoom, message):
+        renderer.zoom = zoom # El zoom es del pintor; al mundo solo le llega el radio del LOD
+        scale = max(1.0, zoom) # Alejando se ve más mundo a detalle completo
+        def command(ws):
+            engine.lod.scale = scale
+            logger.log(message)
+        engine.post(command)
+
+    def handle_key(key):
         # MOVIMIENTO DE CÁMARA
         move_speed = 5.0 * renderer.zoom
         if key in [ord('w'), ord('W'), curses.KEY_UP]:
-            focus_point.y -= move_speed
+            move_focus(0, -move_speed)
         elif key in [ord('s'), ord('S'), curses.KEY_DOWN]:
-            focus_point.y += move_speed
+            move_focus(0, move_speed)
         elif key in [ord('a'), ord('A'), curses.KEY_LEFT]:
-            focus_point.x -= move_speed
+            move_focus(-move_speed, 0)
         elif key in [ord('d'), ord('D'), curses.KEY_RIGHT]:
-            focus_point.x += move_speed
+            move_focus(move_speed, 0)
             
         # ACCIÓN ESPECIAL: ENTRAR / SALIR (E)
         if key in [ord('e'), ord('E')]:
-            # Comprobar qué hay bajo los pies
-            char = active_scenario.get_ground_char(int(focus_point.x), int(focus_point.y), 
-                                                active_scenario.get_biome_id(focus_point.x, focus_point.y))
-            
-            if char == "0":
-                if active_scenario == surface_scenario:
-                    # ENTRAR A CUEVA
-                    logger.log("DESCEND: Entrando a las profundidades...")
-                    surface_pos = (focus_point.x, focus_point.y)
-                    cave_scenario = CaveScenario(seed=surface_scenario.seed + int(focus_point.x + focus_point.y))
-                    active_scenario = cave_scenario
-                    ws.scenario = active_scenario
-                    focus_point.x, focus_point.y = 0, 0 # Empezar en el centro del submundo
-                else:
-                    # SALIR A SUPERFICIE
-                    logger.log("ASCEND: Volviendo a la superficie...")
-                    active_scenario = surface_scenario
-                    ws.scenario = active_scenario
-                    focus_point.x, focus_point.y = surface_pos[0], surface_pos[1]
+            engine.post(use_portal)
 
         if key == ord('q') or key == ord('Q'):
             engine.stop()
         elif key == ord('s') or key == ord('S'):
-            PersistenceManager.save_game(world)
-            logger.log("SYS: Partida guardada correctamente.")
+            engine.post(save)
         elif key in [ord('+'), ord('=')]:
-            renderer.zoom = max(0.1, renderer.zoom * 0.8)
-            logger.log(f"ZOOM: Acercando (x{1.0/renderer.zoom:.1f})")
+            zoom = max(0.1, renderer.zoom * 0.8)
+            set_zoom(zoom, f"ZOOM: Acercando (x{1.0/zoom:.1f})")
         elif key in [ord('-'), ord('_')]:
-            renderer.zoom = min(50.0, renderer.zoom * 1.2)
-            logger.log(f"ZOOM: Alejando (x{1.0/renderer.zoom:.1f})")
+            zoom = min(50.0, renderer.zoom * 1.2)
+            set_zoom(zoom, f"ZOOM: Alejando (x{1.0/zoom:.1f})")
         elif key == ord('h') or key == ord('H'):
             renderer.toggle_legend()
+        elif key == ord('p') or key == ord('P'):
+            engine.post(toggle_profiler)
+        elif key == ord('o') or key == ord('O'):
+            engine.post(dump_profile)
+
+    # 4a. Variante asyncio: simulador, pintor, teclado, autoguardado y métricas como tareas
+    if use_asyncio:
+        stdscr.nodelay(True)
+        terminal = ThreadPoolExecutor(max_workers=1) # curses, de uno en uno
+        try:
+            asyncio.run(engine.run_async(aio.render(engine, renderer.render, executor=terminal),
+                                         aio.keyboard(engine, stdscr.getch, handle_key, executor=terminal),
+                                         aio.autosave(engine), aio.export_metrics(engine)))
+        finally:
+            terminal.shutdown(wait=True)
+        return
 
-    engine.register_render_callback(wrapped_renderer)
-    engine.run()
+    # 4. Bucle del pintor: la última foto publicada, a su ritmo; un terminal lento no frena el mundo
+    sim_thread = engine.start()
+    stdscr.nodelay(True)
+    seq = 0
+    try:
+        while engine.is_running:
+            snapshot = engine.snapshots.latest(after=seq, timeout=engine.frame_time)
+            if snapshot is not None:
+                renderer.render(snapshot)
+                seq = snapshot.seq
+            key = stdscr.getch()
+            while key != -1:
+                handle_key(key)
+                key = stdscr.getch()
+    finally:
+        engine.stop()
+        sim_thread.join(timeout=1.0)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulacion ASCII.")
+    parser.add_argument("--asyncio", action="store_true", help="Un solo hilo con tareas de asyncio")
+    parser.add_argument("--baked", metavar="FICHERO", help="Terreno horneado con python -m src.core.terrain_bake")
+    args = parser.parse_args(argv)
+    if args.baked:
+        try:
+            args.baked = open_baked(args.baked)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"--baked: {e}")
+    return args
+
+def open_baked(path: str) -> BakedTerrain:
+    """Abre el fichero horneado; ValueError si su escenario no se puede rehacer igual (el fichero no se usaria)."""
+    baked = BakedTerrain(path)
+    try:
+        key = baked.make_scenario().cache_key()
+    except Exception:
+        baked.close()
+        raise
+    if key != baked.cache_key:
+        baked.close()
+        raise ValueError(f"escenario {baked.cache_key} no reproducible (sale {key})")
+    return baked
 
 if __name__ == "__main__":
+    args = parse_args()
+    baked = args.baked
     try:
-        curses.wrapper(main)
+        curses.wrapper(main, args.asyncio, baked)
     except KeyboardInterrupt:
         pass
+    finally:
+        if baked is not None: baked.close()
@@ -0,0 +1,17 @@
+import pytest
+
+from src.core.scenarios.nature import NatureScenario
+from src.core.state import WorldState
+
+@pytest.fixture
+def world():
+    return WorldState(NatureScenario(seed=11), seed=11)
+
+@pytest.fixture
+def open_spot(world):
+    """Centro de un cuadro de 25x25 celdas transitables (para plantar casas y vallas sin agua)."""
+    for cy in range(0, 400, 7):
+        for cx in range(0, 400, 7):
+            if all(world.is_walkable(cx + dx, cy + dy) for dx in range(-12, 13) for dy in range(-12, 13)):
+                return cx, cy
+    pytest.fail("no hay sitio despejado cerca del origen")
@@ -0,0 +1,15 @@
+"""Ayudas compartidas por los tests (no son fixtures: se importan)."""
+from src.core.entities.town import Town
+
+def valid(world, path, start) -> bool:
+    """La ruta sale de start, va de celda en celda vecina y solo pisa celdas transitables."""
+    if path[0] != start: return False
+    if any(abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1 for a, b in zip(path, path[1:])): return False
+    return all(world.is_walkable(x, y) for x, y in path[1:])
+
+def big_town(x: int, y: int) -> Town:
+    """Casa de nivel 3 (7x7, puerta abajo) sin pasar por la madera."""
+    town = Town("Casa", x, y)
+    town.level = 3
+    town._update_structure()
+    return town
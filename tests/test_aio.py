@@ -0,0 +1,63 @@
+"""Bucle asyncio: tareas entre frames y guardado sin parar el bucle."""
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.core import aio, persistence
+from src.core.engine import SimulationEngine
+from src.core.logger import logger
+from src.core.persistence import PersistenceManager
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence, "SAVE_DIR", str(tmp_path))
+    return tmp_path
+
+def populated(world, people: int = 5):
+    for i in range(people): world.spawn_person(f"P{i}", float(i), 0.0)
+    return world
+
+def test_save_defaults_to_executor_without_fork(world, save_dir, monkeypatch):
+    assert aio.FORK_SAVE is False
+    def no_fork(): raise AssertionError("no debe hacer fork")
+    monkeypatch.setattr(os, "fork", no_fork, raising=False)
+    path = asyncio.run(aio.save(populated(world), "partida.dat"))
+    assert path == str(save_dir / "partida.dat")
+    assert len(PersistenceManager.load_game("partida.dat").people) == 5
+
+@pytest.mark.skipif(not aio.CAN_FORK, reason="sin os.fork")
+def test_fork_save_when_asked(world, save_dir):
+    assert asyncio.run(aio.save(populated(world), "hijo.dat", fork=True))
+    assert len(PersistenceManager.load_game("hijo.dat").people) == 5
+
+@pytest.mark.skipif(not aio.CAN_FORK, reason="sin os.fork")
+def test_hung_fork_save_is_killed(world, save_dir, monkeypatch):
+    monkeypatch.setattr(aio, "FORK_TIMEOUT", 0.2)
+    monkeypatch.setattr(PersistenceManager, "write", staticmethod(lambda *args: time.sleep(30)))
+    start = time.perf_counter()
+    assert asyncio.run(aio.save(world, "colgado.dat", fork=True)) is None
+    assert time.perf_counter() - start < 5
+    assert "SAVE ERROR" in logger.logs[-1]
+
+def test_run_async_runs_tasks_between_frames_and_cancels_them(world):
+    engine = SimulationEngine(world)
+    seen, cancelled = [], []
+    async def stopper():
+        while len(seen) < 5:
+            seen.append(engine.sim_time)
+            await asyncio.sleep(engine.frame_time)
+        engine.stop()
+    async def forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+    async def broken():
+        raise ValueError("tarea rota")
+    asyncio.run(engine.run_async(stopper(), forever(), broken()))
+    assert seen[-1] > seen[0] # El motor avanza mientras las tareas esperan
+    assert cancelled == [True] and not engine.is_running
+    assert any("TASK ERROR" in line for line in logger.logs) # La rota se anota y las demás siguen
@@ -0,0 +1,39 @@
+"""Lotes de mundos sin ventana: resumenes reproducibles y estados de timeout, cancelacion y error."""
+import threading
+
+from src.core import batch
+from src.core.batch import BatchRunner, WorldConfig, run_world
+
+def small(seed: int, hours: float = 0.2, **kwargs) -> WorldConfig:
+    return WorldConfig(seed, people=10, wolves=1, hours=hours, **kwargs)
+
+def test_run_world_is_reproducible():
+    first, second = run_world(small(3)), run_world(small(3))
+    assert first["status"] == "ok" and first["frames"] == 30 and first["people"] == 10
+    assert first["hash"] == second["hash"]
+    assert run_world(small(4))["hash"] != first["hash"]
+
+def test_world_timeout_returns_partial_summary():
+    result = run_world(small(3, hours=1000.0, timeout=0.2))
+    assert result["status"] == "timeout" and 0 < result["frames"] < 150000
+
+def test_cancel_event_stops_the_world(monkeypatch):
+    event = threading.Event()
+    event.set()
+    monkeypatch.setattr(batch, "_cancel_event", event)
+    result = run_world(small(3))
+    assert result["status"] == "cancelled" and result["frames"] == 0
+
+def test_runner_matches_in_process_runs():
+    configs = [small(seed) for seed in (3, 4)] + [WorldConfig(5, scenario="NoExiste")]
+    results = {r["label"]: r for r in BatchRunner(workers=2).run(configs)}
+    assert results["NoExiste:5:100"]["status"] == "error"
+    for config in configs[:2]:
+        assert results[config.label]["hash"] == run_world(config)["hash"]
+
+def test_batch_timeout_cancels_running_and_queued_worlds():
+    configs = [small(seed, hours=1000.0, label=f"largo{seed}") for seed in (3, 4)]
+    results = {r["label"]: r for r in BatchRunner(workers=1).run(configs, timeout=1.0)}
+    assert results["largo3"]["status"] == "cancelled" and results["largo3"]["frames"] > 0 # Parcial
+    # El de la cola no llega a simular: o no arranca o para en su primer bloque
+    assert results["largo4"]["status"] == "cancelled" and results["largo4"].get("frames", 0) == 0
@@ -0,0 +1,60 @@
+"""Campos de flujo: solo para casas y origen, rutas tan cortas como el A* y reparacion igual a montar de cero."""
+from src.core.flow import FlowField
+from src.core.pathfinding import Pathfinder
+from tests.helpers import big_town, valid
+
+def starts_around(x: int, y: int):
+    return [(x - 10, y), (x + 10, y + 3), (x - 4, y - 11), (x + 7, y - 9), (x, y + 12)]
+
+def warm(world, goal):
+    """Pide el destino desde varias salidas hasta que tenga campo."""
+    pathfinder = Pathfinder(world)
+    for start in starts_around(*goal): pathfinder.get_path(start, goal)
+    assert goal in world.flows.fields
+    return pathfinder
+
+def test_field_paths_are_valid_and_as_short_as_astar(world, open_spot):
+    flows = world.enable_flow_fields()
+    flows.add_goal(*open_spot)
+    pathfinder = warm(world, open_spot)
+    served = flows.served
+    for start in starts_around(*open_spot):
+        path = pathfinder.get_path(start, open_spot)
+        assert valid(world, path, start) and path[-1] == open_spot
+        assert len(path) == len(pathfinder.search(start, open_spot, 20000)[0])
+    assert flows.served == served + 5
+
+def test_unregistered_destination_is_not_tracked(world, open_spot):
+    flows = world.enable_flow_fields()
+    x, y = open_spot
+    pathfinder = Pathfinder(world)
+    for start in starts_around(x, y): assert pathfinder.get_path(start, (x + 3, y))
+    assert flows.lookups == 0 and not flows.demand and not flows.fields
+
+def test_origin_and_towns_are_goals(world, open_spot):
+    flows = world.enable_flow_fields()
+    assert flows.goals == {(0, 0)}
+    town = big_town(*open_spot)
+    world.add_entity(town)
+    assert open_spot in flows.goals
+    warm(world, open_spot)
+    world.remove_entity(town)
+    assert open_spot not in flows.goals and open_spot not in flows.fields
+
+def test_repaired_field_matches_fresh(world, open_spot):
+    world.enable_flow_fields().add_goal(*open_spot)
+    warm(world, open_spot)
+    x, y = open_spot
+    # Una pared que corta el paso directo, un hueco en ella y una casa que se pone y se quita
+    for dx in range(-6, 7): world.add_structure(x + dx, y - 3, "FENCE")
+    world.add_structure(x + 2, y - 3, "ROAD")
+    world.add_structure(x - 5, y + 2, "FENCE")
+    gone = big_town(x - 6, y + 7)
+    world.add_entity(gone)
+    world.add_entity(big_town(x + 7, y + 6))
+    world.remove_entity(gone)
+    field = world.flows.fields[open_spot]
+    assert world.flows.repaired > 0
+    fresh = FlowField(world, field.goal, world.flows.radius)
+    assert bytes(field.walkable) == bytes(fresh.walkable)
+    assert field.dist == fresh.dist
@@ -0,0 +1,64 @@
+"""HPA*: viajes largos que el A* acotado no resuelve, y el grafo actualizado por celdas."""
+import pytest
+
+from src.core.hpa import ClusterGraph
+from src.core.pathfinding import Pathfinder
+from src.core.scenarios.nature import NatureScenario
+from src.core.state import WorldState
+from tests.helpers import big_town, valid
+
+def make_pairs(world, count: int):
+    rng = world.rng.stream("test")
+    pairs = []
+    while len(pairs) < count:
+        sx, sy = rng.randint(-150, 150), rng.randint(-150, 150)
+        if world.is_walkable(sx, sy): pairs.append(((sx, sy), (sx + rng.randint(-100, 100), sy + rng.randint(-100, 100))))
+    return pairs
+
+@pytest.fixture(scope="module")
+def trips():
+    world = WorldState(NatureScenario(seed=3), seed=3)
+    pathfinder = Pathfinder(world)
+    pairs = make_pairs(world, 30)
+    plain = [pathfinder.get_path(a, b) for a, b in pairs]
+    truth = [pathfinder.search(a, b, 20000)[0] for a, b in pairs]
+    world.enable_hierarchical_paths()
+    hierarchical = [pathfinder.get_path(a, b) for a, b in pairs]
+    return world, pairs, plain, truth, hierarchical
+
+def test_hpa_reaches_what_bounded_astar_misses(trips):
+    _, _, plain, truth, hierarchical = trips
+    assert sum(map(bool, hierarchical)) > sum(map(bool, plain))
+    assert all(h for h, t in zip(hierarchical, truth) if t) # Todo lo alcanzable llega
+
+def test_hpa_paths_are_valid_and_near_optimal(trips):
+    world, pairs, _, truth, hierarchical = trips
+    for path, (start, _), best in zip(hierarchical, pairs, truth):
+        if not path: continue
+        assert valid(world, path, start)
+        assert len(path) <= 1.25 * len(best)
+
+def graph_edges(world, graph, keys):
+    return {key: (graph.cluster(world, key).nodes, graph.cluster(world, key).edges) for key in keys}
+
+def test_incremental_graph_matches_fresh_after_edits(world, open_spot):
+    graph = world.enable_hierarchical_paths()
+    pathfinder = Pathfinder(world)
+    x, y = open_spot
+    trips = [((x - 12, y), (x + 60, y + 20)), ((x, y - 12), (x - 40, y + 50))]
+    for a, b in trips: pathfinder.get_path(a, b)
+    # Vallas en fronteras y dentro de clusters, una casa que se pone y otra que se quita
+    left, top = (x >> 4) << 4, (y >> 4) << 4 # Esquina del cluster del centro
+    for cell in [(x, y), (x - 1, y + 3), (left, y + 2), (left + 15, y + 1), (x + 2, top), (x - 3, top + 15)]:
+        world.add_structure(*cell, "FENCE")
+    world.add_entity(big_town(x + 5, y + 5))
+    gone = big_town(x - 6, y - 6)
+    world.add_entity(gone)
+    for a, b in trips: pathfinder.get_path(a, b)
+    world.remove_entity(gone)
+    keys = set(graph.clusters)
+    updated = [pathfinder.get_path(a, b) for a, b in trips]
+    fresh = ClusterGraph()
+    assert graph_edges(world, graph, keys) == graph_edges(world, fresh, keys)
+    world.hpa = fresh
+    assert [pathfinder.get_path(a, b) for a, b in trips] == updated
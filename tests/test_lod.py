@@ -0,0 +1,62 @@
+"""Nivel de detalle: turnos por nivel, dt acumulado y entidades que cambian de nivel."""
+from types import SimpleNamespace
+
+from src.core.engine import SimulationEngine
+from src.core.entities.wolf import Wolf
+from src.core.lod import AGGREGATE, AGGREGATE_EVERY, FULL, REDUCED, REDUCED_EVERY, LevelOfDetail
+
+def wolf_at(world, x: float, y: float, tx: float, ty: float) -> Wolf:
+    wolf = world.spawn_wolf("Lobo", x, y)
+    wolf.target_x, wolf.target_y = tx, ty
+    return wolf
+
+def test_tiers_by_distance_and_pending_dt_is_kept(world):
+    near = world.spawn_person("Cerca", 0.0, 0.0)
+    mid = world.spawn_person("Medio", 150.0, 0.0)
+    far = world.spawn_person("Lejos", 500.0, 0.0)
+    lod = LevelOfDetail(SimpleNamespace(x=0.0, y=0.0))
+    simulated = {near.id: 0.0, mid.id: 0.0, far.id: 0.0}
+    runs = {near.id: 0, mid.id: 0, far.id: 0}
+    for _ in range(AGGREGATE_EVERY * 2):
+        lod.begin_frame(world)
+        for person in (near, mid, far):
+            dt = lod.advance(person, 0.1)[0]
+            if dt is not None: simulated[person.id] += dt; runs[person.id] += 1
+    assert [lod.tier(p) for p in (near, mid, far)] == [FULL, REDUCED, AGGREGATE]
+    assert runs == {near.id: AGGREGATE_EVERY * 2, mid.id: AGGREGATE_EVERY * 2 // REDUCED_EVERY, far.id: 2}
+    for person in (near, mid, far): # Ni se pierde ni se repite tiempo
+        assert abs(simulated[person.id] + lod.pending.get(person.id, 0.0) - AGGREGATE_EVERY * 0.2) < 1e-9
+
+def test_wolf_with_aggregate_dt_stops_at_target(world, open_spot):
+    x, y = open_spot
+    wolf = wolf_at(world, x, y, x + 4.0, y)
+    wolf.update(AGGREGATE_EVERY / 15, False, world)
+    assert abs(wolf.x - (x + 4.0)) <= 0.5 and abs(wolf.y - y) < 1e-9
+    assert wolf.sleep_time() > 0 # Parado en su objetivo: puede dormir
+    target = (wolf.target_x, wolf.target_y)
+    wolf.update(AGGREGATE_EVERY / 15, False, world)
+    wolf.update(AGGREGATE_EVERY / 15, False, world)
+    assert (wolf.target_x, wolf.target_y) != target # Y vuelve a patrullar
+
+def test_wolf_with_aggregate_dt_does_not_cross_walls(world, open_spot):
+    x, y = open_spot
+    for dy in range(-10, 11): world.add_structure(x + 2, y + dy, "FENCE")
+    wolf = wolf_at(world, x + 0.5, y + 0.5, x + 8.5, y + 0.5)
+    wolf.update(AGGREGATE_EVERY / 15, True, world) # De noche: 15 celdas en un update
+    assert wolf.x < x + 2
+
+def test_far_wolf_keeps_patrolling_and_rejoins_full(world, open_spot):
+    x, y = open_spot
+    focus = SimpleNamespace(x=x + 2000.0, y=y)
+    engine = SimulationEngine(world)
+    engine.lod = LevelOfDetail(focus)
+    wolf = wolf_at(world, x, y, x + 4.0, y)
+    reached = set()
+    for _ in range(AGGREGATE_EVERY * 20):
+        engine.step(1)
+        if (wolf.target_x - wolf.x) ** 2 + (wolf.target_y - wolf.y) ** 2 <= 0.25: reached.add((wolf.target_x, wolf.target_y))
+    assert engine.lod.tier(wolf) == AGGREGATE
+    assert len(reached) >= 2 # Llega, decide y sigue, en vez de ir y volver sin tocar el objetivo
+    focus.x, focus.y = wolf.x, wolf.y
+    engine.step(4)
+    assert engine.lod.tier(wolf) == FULL and world.is_walkable(wolf.x, wolf.y)
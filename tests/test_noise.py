@@ -0,0 +1,42 @@
+"""Biomas por lotes (rejilla en Python y NumPy) frente a get_biome_id celda a celda."""
+from array import array
+
+import pytest
+
+from src.core.scenarios import nature
+from src.core.scenarios.nature import NatureScenario
+
+SIZE = 48
+ORIGINS = [(-1000, -300), (0, 0), (517, 263), (-75, 1200)]
+
+def scalar_codes(scenario, x0, y0, width, height, step=1.0):
+    index = {name: i for i, name in enumerate(scenario.biome_table())}
+    return array('B', (index[scenario.get_biome_id(x0 + col * step, y0 + row * step)]
+                       for row in range(height) for col in range(width)))
+
+@pytest.fixture
+def scenario():
+    return NatureScenario(seed=1234)
+
+@pytest.fixture
+def without_numpy(monkeypatch):
+    monkeypatch.setattr(nature, "np", None)
+
+@pytest.mark.parametrize("x0, y0", ORIGINS)
+def test_python_grid_matches_scalar(scenario, without_numpy, x0, y0):
+    assert scenario.get_biome_ids(x0, y0, SIZE, SIZE) == scalar_codes(scenario, x0, y0, SIZE, SIZE)
+
+@pytest.mark.skipif(nature.np is None, reason="NumPy no instalado")
+@pytest.mark.parametrize("x0, y0", ORIGINS)
+def test_numpy_grid_matches_scalar(scenario, x0, y0):
+    assert scenario.get_biome_ids(x0, y0, SIZE, SIZE) == scalar_codes(scenario, x0, y0, SIZE, SIZE)
+
+@pytest.mark.parametrize("step", [0.5, 2.0])
+def test_grid_with_zoom_step_matches_scalar(scenario, step):
+    assert scenario.get_biome_ids(-4.5, 8.5, 20, 12, step) == scalar_codes(scenario, -4.5, 8.5, 20, 12, step)
+
+def test_python_and_numpy_shading_agree(scenario, monkeypatch):
+    if nature.np is None: pytest.skip("NumPy no instalado")
+    fast = scenario.get_shading(-40, 25, SIZE, SIZE)
+    monkeypatch.setattr(nature, "np", None)
+    assert scenario.get_shading(-40, 25, SIZE, SIZE) == fast
@@ -0,0 +1,58 @@
+"""Cache de rutas: aciertos exactos e invalidacion precisa con vallas y casas."""
+import pickle
+
+from src.core.pathfinding import Pathfinder
+from tests.helpers import big_town
+
+def test_exact_hit_returns_the_astar_path(world, open_spot):
+    cache = world.enable_path_cache(1)
+    pathfinder = Pathfinder(world)
+    x, y = open_spot
+    first = pathfinder.get_path((x - 10, y), (x + 10, y + 5))
+    assert first == pathfinder.search((x - 10, y), (x + 10, y + 5))[0]
+    assert pathfinder.get_path((x - 10, y), (x + 10, y + 5)) == first
+    assert cache.hits == 1
+
+def test_fence_on_cached_route_evicts_only_that_route(world, open_spot):
+    cache = world.enable_path_cache(1)
+    pathfinder = Pathfinder(world)
+    x, y = open_spot
+    route = pathfinder.get_path((x - 10, y), (x + 10, y))
+    other = pathfinder.get_path((x - 10, y + 10), (x + 10, y + 10))
+    assert route and other and len(cache) == 2
+    fx, fy = route[len(route) // 2]
+    world.add_structure(fx, fy, "FENCE")
+    assert len(cache) == 1
+    detour = pathfinder.get_path((x - 10, y), (x + 10, y))
+    assert detour and (fx, fy) not in detour
+    assert pathfinder.get_path((x - 10, y + 10), (x + 10, y + 10)) == other
+
+def test_new_town_evicts_routes_through_its_walls(world, open_spot):
+    cache = world.enable_path_cache(1)
+    pathfinder = Pathfinder(world)
+    x, y = open_spot
+    assert pathfinder.get_path((x - 10, y), (x + 10, y))
+    world.add_entity(big_town(x, y))
+    assert len(cache) == 0
+    route = pathfinder.get_path((x - 10, y), (x + 10, y))
+    assert route and all(world.is_walkable(*cell) for cell in route)
+
+def test_removed_town_reopens_failed_searches(world, open_spot):
+    cache = world.enable_path_cache(1)
+    pathfinder = Pathfinder(world)
+    x, y = open_spot
+    town = big_town(x, y)
+    world.add_entity(town)
+    # Desde dentro hacia el norte: con las paredes, 15 expansiones no dan para salir por la puerta
+    assert pathfinder.get_path((x, y), (x, y - 10), 15) == []
+    assert len(cache.failures) == 1
+    world.remove_entity(town)
+    assert len(cache.failures) == 0
+    assert len(pathfinder.get_path((x, y), (x, y - 10), 15)) == 11
+
+def test_pickle_keeps_configuration_only(world, open_spot):
+    cache = world.enable_path_cache(4)
+    x, y = open_spot
+    Pathfinder(world).get_path((x - 10, y), (x + 10, y))
+    loaded = pickle.loads(pickle.dumps(cache))
+    assert loaded.quantum == 4 and len(loaded) == 0
@@ -0,0 +1,55 @@
+"""Repeticion determinista: misma semilla y mismas entradas dan el mismo state_hash."""
+import random
+
+import pytest
+
+from src.core import population
+from src.core.replay import Recorder, Recording, replay
+
+def record(seed: int = 7, pooled: bool = False, people: int = 40, frames: int = 200) -> Recording:
+    recorder = Recorder("NatureScenario", seed, pooled=pooled)
+    rng = random.Random(seed)
+    for i in range(people):
+        recorder.apply("spawn_person", f"P{i}", rng.uniform(-20, 20), rng.uniform(-20, 20))
+    recorder.apply("spawn_wolf", "W0", rng.uniform(-20, 20), rng.uniform(-20, 20))
+    recorder.apply("add_shop", 0.0, 0.0)
+    recorder.apply("add_town", "Casa0", 10, 10, "P0")
+    recorder.checkpoint()
+    for _ in range(0, frames, 50):
+        recorder.step(50)
+        recorder.apply("move", "Tienda General", rng.uniform(-20, 20), rng.uniform(-20, 20))
+        recorder.apply("build", rng.randint(-20, 20), rng.randint(-20, 20), "FENCE")
+        recorder.checkpoint()
+    return recorder.recording
+
+@pytest.fixture(scope="module")
+def recording():
+    return record()
+
+def test_replay_matches_every_checkpoint(recording):
+    random.seed() # El random global no debe influir
+    engine, mismatches = replay(recording)
+    assert mismatches == []
+    assert engine.world_state.tick_count == recording.checkpoints[-1][2]
+
+def test_replay_from_saved_file(recording, tmp_path):
+    path = str(tmp_path / "partida.json")
+    recording.save(path)
+    assert replay(Recording.load(path))[1] == []
+
+def test_replay_detects_divergence(recording):
+    tampered = Recording.from_dict(recording.to_dict())
+    frame, seq, tick, _ = tampered.checkpoints[-1]
+    tampered.checkpoints[-1] = (frame, seq, tick, "0" * 32)
+    mismatches = replay(tampered)[1]
+    assert [m[0] for m in mismatches] == [frame]
+
+def test_seed_changes_the_world(recording):
+    other = record(seed=8)
+    assert other.checkpoints[-1][3] != recording.checkpoints[-1][3]
+
+@pytest.mark.skipif(population.np is None, reason="NumPy no instalado")
+def test_pooled_population_replays_and_matches_objects(recording):
+    pooled = record(pooled=True)
+    assert replay(pooled)[1] == []
+    assert [c[3] for c in pooled.checkpoints] == [c[3] for c in recording.checkpoints]
@@ -0,0 +1,96 @@
+"""Scheduler y sistemas troceables del motor."""
+from collections import Counter
+
+from src.core.engine import SimulationEngine
+from src.core.entities.person import Person
+from src.core.entities.shop import Shop
+from src.core.entities.town import Town
+from src.core.logger import logger
+from src.core.scenarios.nature import NatureScenario
+from src.core.scheduler import Scheduler
+from src.core.state import WorldState
+
+def make_engine(people: int = 40) -> SimulationEngine:
+    world = WorldState(NatureScenario(seed=11), seed=11)
+    for i in range(people): world.spawn_person(f"P{i}", (i % 8) * 3.0, (i // 8) * 3.0)
+    return SimulationEngine(world)
+
+def count_updates(monkeypatch) -> Counter:
+    calls = Counter()
+    original = Person.update
+    def update(self, dt, *args, **kwargs):
+        calls[self.id] += 1
+        return original(self, dt, *args, **kwargs)
+    monkeypatch.setattr(Person, "update", update)
+    return calls
+
+def test_pending_system_resumes_with_elapsed_kept():
+    seen = []
+    def work(elapsed, deadline):
+        seen.append(elapsed)
+        return len(seen) == 1 # La primera llamada deja trabajo a medias
+    scheduler = Scheduler()
+    scheduler.add("work", work, budget=0.001)
+    for _ in range(3): scheduler.tick(0.1)
+    assert seen == [0.1, 0.0, 0.2] # La continuacion no recibe tiempo; la pasada siguiente, todo el acumulado
+    assert scheduler["work"].carried == 1 and scheduler["work"].runs == 2
+
+def test_physics_pass_is_sliced_and_each_person_updated_once(monkeypatch):
+    engine = make_engine()
+    engine.scheduler["physics"].budget = 0.0 # Deadline vencido: unas pocas entidades por frame
+    calls = count_updates(monkeypatch)
+    start_hour = engine.world_state.time_of_day
+    frames = 0
+    while True:
+        engine.scheduler.tick(engine.fixed_dt, exclude=("render", "interactions", "events", "contextual"))
+        frames += 1
+        if not engine.scheduler["physics"].pending: break
+    assert frames > 1
+    assert sorted(calls) == sorted(engine.world_state.people) and set(calls.values()) == {1}
+    # El reloj del mundo solo avanza con el dt de la pasada, al empezarla
+    assert abs(engine.world_state.time_of_day - start_hour - engine.fixed_dt * 0.1) < 1e-9
+
+def test_sliced_physics_skips_removed_entities(monkeypatch):
+    engine = make_engine()
+    engine.scheduler["physics"].budget = 0.0
+    calls = count_updates(monkeypatch)
+    engine.scheduler.tick(engine.fixed_dt, exclude=("render",))
+    assert engine.scheduler["physics"].pending
+    removed = [p for p in engine.world_state.people.values() if p.id not in calls][-1]
+    engine.world_state.remove_entity(removed)
+    while engine.scheduler["physics"].pending: engine.scheduler.tick(engine.fixed_dt, exclude=("render",))
+    assert removed.id not in calls
+
+def test_unbudgeted_step_runs_whole_passes(monkeypatch):
+    engine = make_engine()
+    calls = count_updates(monkeypatch)
+    engine.step(3)
+    assert not engine.scheduler["physics"].pending
+    assert set(calls.values()) == {3}
+
+def test_sliced_interactions_skip_removed_entities():
+    engine = make_engine()
+    ws = engine.world_state
+    tick = ws.tick_count
+    assert engine._interactions_system(0.1, 0.0) # Deadline vencido: se para en el bucle social
+    removed = list(ws.people.values())[-1]
+    ws.remove_entity(removed)
+    while engine._interactions_system(0.0, 0.0): pass
+    assert ws.tick_count == tick + 1
+    assert not any("LOGIC ERROR" in line for line in logger.logs[-5:])
+
+def test_interaction_error_keeps_the_pass_and_the_tick(monkeypatch):
+    engine = make_engine()
+    ws = engine.world_state
+    ws.add_entity(Shop(0.0, 0.0))
+    town = Town("Casa0", 12, 12, owner_name="P0")
+    ws.add_entity(town)
+    carrier = ws.spawn_person("Leñador", 12.0, 12.0)
+    carrier.inventory["wood"] = 3
+    def broken(self, buyer): raise ValueError("sin cambio")
+    monkeypatch.setattr(Shop, "interact", broken)
+    tick = ws.tick_count
+    assert not engine._interactions_system(0.1, None)
+    assert ws.tick_count == tick + 1
+    assert carrier.inventory["wood"] == 0 # Las Town de después de la tienda siguen recibiendo
+    assert any("LOGIC ERROR (Tienda General)" in line for line in logger.logs)
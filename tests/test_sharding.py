@@ -0,0 +1,67 @@
+"""Motor por regiones: el mundo unido conserva a todos y se repite con la misma semilla."""
+import pickle
+
+import pytest
+
+from src.core.engine import SimulationEngine
+from src.core.entities.shop import Shop
+from src.core.entities.town import Town
+from src.core.replay import state_hash
+from src.core.scenarios.nature import NatureScenario
+from src.core.sharding import ShardedEngine, owner_of, pack, unpack
+from src.core.state import WorldState
+
+WORKERS, REGION, FRAMES = 2, 32, 120
+
+def build(seed: int = 3, people: int = 60) -> WorldState:
+    world = WorldState(NatureScenario(seed=seed), seed=seed)
+    rng = world.rng.stream("setup")
+    half = REGION * WORKERS
+    for i in range(people):
+        world.spawn_person(f"P{i}", rng.uniform(-half, half), rng.uniform(-20, 20))
+    world.spawn_wolf("W0", rng.uniform(-half, half), rng.uniform(-20, 20))
+    world.add_entity(Town("Casa0", 5, 5, owner_name="P0"))
+    world.add_entity(Shop(0.0, 0.0))
+    return world
+
+def run_sharded(seed: int = 3):
+    world = build(seed)
+    ids = sorted(world.entities)
+    with ShardedEngine(world, workers=WORKERS, region_size=REGION) as engine:
+        engine.step(FRAMES)
+        return ids, engine.snapshot(), dict(engine.stats)
+
+@pytest.fixture(scope="module")
+def sharded():
+    return run_sharded()
+
+def test_pack_roundtrip_keeps_id_and_fields():
+    person = build().spawn_person("Viajero", 12.5, -3.0)
+    copy = unpack(pack(person))
+    assert copy.id == person.id and copy.name == "Viajero" and (copy.x, copy.y) == (12.5, -3.0)
+    assert copy.pathfinder is None # Se rehace en el mundo que lo recibe
+
+def test_owner_wraps_regions_across_workers():
+    assert [owner_of(x, REGION, WORKERS) for x in (0, 31.9, 32, 64, -0.1, -33)] == [0, 0, 1, 0, 1, 0]
+
+def test_snapshot_conserves_every_entity(sharded):
+    ids, merged, stats = sharded
+    assert sorted(merged.entities) == ids
+    assert len(merged.people) == 60 and len(merged.wolves) == 1 and len(merged.towns) == 1
+    assert sum(stats["people"]) == 60
+
+def test_snapshot_clock_matches_single_process(sharded):
+    merged = sharded[1]
+    single = SimulationEngine(build())
+    single.step(FRAMES)
+    assert merged.tick_count == single.world_state.tick_count
+    assert merged.time_of_day == pytest.approx(single.world_state.time_of_day)
+
+def test_same_seed_gives_same_snapshot(sharded):
+    assert state_hash(run_sharded()[1]) == state_hash(sharded[1])
+
+def test_snapshot_is_a_normal_world(sharded):
+    merged = sharded[1]
+    loaded = pickle.loads(pickle.dumps(merged))
+    assert state_hash(loaded) == state_hash(merged)
+    assert all(loaded.spatial.order.get(e.id) is not None for e in loaded.people.values())
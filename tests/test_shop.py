@@ -0,0 +1,41 @@
+"""Tienda: cada necesidad compra lo suyo y cobra su precio."""
+import pytest
+
+from src.core.entities.shop import Shop
+from src.core.population import Population
+from src.core import population
+
+def buyer(world, pooled: bool = False):
+    if pooled: world.population = Population()
+    person = world.spawn_person("Cliente", 1.0, 1.0)
+    person.wealth, person.stress, person.energy = 80, 0, 100
+    return person
+
+@pytest.mark.parametrize("pooled", [False, pytest.param(True, marks=pytest.mark.skipif(population.np is None, reason="NumPy no instalado"))])
+def test_rich_buyer_gets_shoes(world, pooled):
+    person = buyer(world, pooled)
+    shop = Shop(0.0, 0.0)
+    speed = person.base_speed
+    shop.interact(person)
+    assert person.wealth == 30 and person.base_speed == speed + 1.0
+    assert shop.stock["shoes"] == 9
+
+def test_needs_come_before_luxury(world):
+    person = buyer(world)
+    shop = Shop(0.0, 0.0)
+    person.disease = "gripe"
+    shop.interact(person)
+    assert person.disease is None and person.wealth == 65
+    person.stress = 50
+    shop.interact(person)
+    assert person.stress == 0 and person.wealth == 45 and shop.stock["medkit"] == 49
+    person.energy = 30
+    shop.interact(person)
+    assert person.energy == 100 and person.wealth == 40 and shop.stock["food"] == 99
+
+def test_poor_buyer_buys_nothing(world):
+    person = buyer(world)
+    person.wealth = 10
+    shop = Shop(0.0, 0.0)
+    shop.interact(person)
+    assert person.wealth == 10 and shop.stock == {"food": 100, "medkit": 50, "shoes": 10}
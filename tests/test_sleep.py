@@ -0,0 +1,61 @@
+"""Entidades dormidas: la rueda de temporizadores y la puesta al dia al despertar."""
+import pytest
+
+from src.core.engine import SimulationEngine
+from src.core.entities.components import PersonState
+from src.core.sleep import Sleepers, TimerWheel
+from src.core.state import WorldState
+
+def test_wheel_fires_in_order_across_wraps():
+    wheel = TimerWheel(1.0, slots=4)
+    for key, when in ((1, 2.0), (2, 6.0), (3, 11.0), (4, 3.0)): # 1 y 2 comparten hueco
+        wheel.schedule(key, when)
+    assert wheel.advance(3.0) == [1, 4]
+    assert wheel.advance(5.5) == []
+    assert wheel.advance(20.0) == [2, 3]
+    assert len(wheel) == 0
+
+def test_wheel_cancel_reschedule_and_past_times():
+    wheel = TimerWheel(1.0, slots=4)
+    wheel.schedule(1, 5.0)
+    wheel.cancel(1)
+    wheel.schedule(2, 3.0)
+    wheel.schedule(2, 9.0) # La nueva hora sustituye a la vieja
+    assert wheel.advance(8.0) == []
+    wheel.schedule(3, 1.0) # Ya pasado: vence en el tick siguiente
+    assert wheel.advance(9.0) == [2, 3] # Mismo tick: en el orden en que se programaron
+    assert wheel.advance(100.0) == [] and wheel.current == 100
+
+def resting_engine(world, sleep: bool):
+    person = world.spawn_person("Dormilon", 35.0, 0.0)
+    person.target_x, person.target_y = 35.0, 0.0
+    person.state, person.energy, person.stress = PersonState.RESTING, 40.0, 30.0
+    engine = SimulationEngine(world)
+    if sleep: engine.enable_sleep()
+    return engine, person
+
+@pytest.mark.parametrize("frames", [21, 40])
+def test_early_wake_catches_up_like_full_updates(world, frames):
+    engine, person = resting_engine(world, sleep=True)
+    engine.step(5)
+    assert person in engine.sleepers
+    engine.step(frames - 6)
+    engine._wake(person) # Algo la toca antes de su hora
+    engine.step(1)
+    awake_engine, awake = resting_engine(WorldState(world.scenario, seed=11), sleep=False)
+    awake_engine.step(frames)
+    assert (person.energy, person.stress) == pytest.approx((awake.energy, awake.stress))
+
+def test_sleeper_wakes_on_time_rested(world):
+    engine, person = resting_engine(world, sleep=True)
+    engine.step(70) # Descansar de 40 a 100 son 4 s
+    assert person.state == PersonState.IDLE and person.energy >= 99.5 and person.stress == 0
+
+def test_removed_sleeper_is_dropped(world):
+    sleepers = Sleepers(1.0 / 15)
+    engine, person = resting_engine(world, sleep=False)
+    sleepers.consider(person, 0.0)
+    world.remove_entity(person)
+    energy = person.energy
+    sleepers.wake_due(10.0, 1.0 / 15, world)
+    assert len(sleepers) == 0 and person.energy == energy
@@ -0,0 +1,43 @@
+"""Fotos del mundo para el pintor y comandos que vuelven al simulador."""
+import threading
+
+from src.core.engine import SimulationEngine
+from src.core.snapshot import SnapshotBuffer, WorldSnapshot
+
+def snap(world, seq: int) -> WorldSnapshot:
+    return WorldSnapshot.capture(world, seq=seq)
+
+def test_latest_counts_dropped_frames(world):
+    buffer = SnapshotBuffer()
+    assert buffer.latest(timeout=0.01) is None
+    buffer.publish(snap(world, 1))
+    assert buffer.latest().seq == 1
+    for seq in (2, 3, 4): buffer.publish(snap(world, seq)) # El pintor no llega a ver 2 ni 3
+    assert buffer.latest(after=1).seq == 4
+    assert buffer.published == 4 and buffer.dropped == 2
+    assert buffer.latest(after=4, timeout=0.01) is None # Nada nuevo
+
+def test_latest_waits_for_a_newer_frame(world):
+    buffer = SnapshotBuffer()
+    buffer.publish(snap(world, 1))
+    timer = threading.Timer(0.05, lambda: buffer.publish(snap(world, 2)))
+    timer.start()
+    assert buffer.latest(after=1, timeout=5.0).seq == 2
+    timer.join()
+
+def test_snapshot_does_not_follow_live_entities(world):
+    person = world.spawn_person("Ana", 3.0, 4.0)
+    wolf = world.spawn_wolf("Lobo", 10.0, 10.0)
+    photo = WorldSnapshot.capture(world, camera=person, seq=7)
+    person.x = wolf.x = 99.0
+    assert len(photo) == 2 and photo.camera == (3.0, 4.0)
+    assert list(photo.xs) == [3.0, 10.0] and photo.glyphs == "AW" and photo.people == 1
+
+def test_engine_publishes_and_applies_posted_commands(world):
+    engine = SimulationEngine(world)
+    engine.snapshots = SnapshotBuffer()
+    engine.post(lambda ws: ws.spawn_person("Nuevo", 1.0, 1.0))
+    engine.post(lambda ws: 1 / 0) # Un comando roto se anota y no para el frame
+    engine._frame(engine.frame_time)
+    photo = engine.snapshots.latest(timeout=1.0)
+    assert photo.seq == 1 and photo.people == 1 and photo.glyphs == "N"
@@ -0,0 +1,65 @@
+"""Terreno horneado: los chunks del fichero son los mismos que generandolos."""
+import pytest
+
+from src.core.scenarios.nature import NatureScenario
+from src.core.scenarios.urban import UrbanScenario
+from src.core.state import WorldState
+from src.core.terrain_bake import BakedTerrain, bake
+from src.core.terrain_cache import CHUNK_SIZE, TerrainCache, TerrainChunk
+from src.main import parse_args
+
+FIELDS = ("codes", "chars", "solid", "shade")
+
+@pytest.fixture
+def baked(tmp_path):
+    path = str(tmp_path / "terrain.bin")
+    bake(NatureScenario(seed=42), CHUNK_SIZE, path) # 2x2 chunks alrededor del origen
+    baked = BakedTerrain(path)
+    yield baked
+    baked.close()
+
+def test_baked_chunks_match_generated(baked):
+    scenario = baked.make_scenario()
+    for cy in range(-1, 1):
+        for cx in range(-1, 1):
+            chunk, fresh = baked.get_chunk(cx, cy), TerrainChunk.generate(scenario, cx, cy)
+            for field in FIELDS:
+                assert bytes(getattr(chunk, field)) == bytes(getattr(fresh, field)), (cx, cy, field)
+    assert baked.get_chunk(1, 0) is None
+
+def test_world_reads_attached_baked_file(baked):
+    scenario = NatureScenario(seed=baked.seed)
+    world = WorldState(scenario)
+    world.terrain_cache.attach_baked(baked)
+    window = world.get_terrain_window(-70, -20, 140, 40) # Medio dentro, medio fuera del fichero
+    expected = scenario.get_window(-70, -20, 140, 40)
+    assert window.chars == expected.chars
+    assert bytes(window.codes) == bytes(expected.codes)
+    assert bytes(window.solid) == bytes(expected.solid)
+    stats = world.terrain.stats()
+    assert stats["baked_hits"] > 0 and stats["misses"] > 0
+
+def test_attach_after_cache_exists(baked):
+    cache = TerrainCache()
+    chunks = cache.for_scenario(NatureScenario(seed=baked.seed))
+    cache.attach_baked(baked)
+    chunks.get_chunk(0, 0)
+    assert chunks.baked_hits == 1 and chunks.misses == 0
+
+def test_startup_uses_the_baked_scenario(tmp_path):
+    path = str(tmp_path / "ciudad.bin")
+    bake(UrbanScenario(seed=9), CHUNK_SIZE, path)
+    baked = parse_args(["--baked", path]).baked
+    try:
+        scenario = baked.make_scenario()
+        assert isinstance(scenario, UrbanScenario) and scenario.cache_key() == baked.cache_key
+    finally:
+        baked.close()
+
+def test_startup_rejects_unknown_baked_scenario(tmp_path, capsys):
+    class Desconocido(NatureScenario): pass
+    path = str(tmp_path / "raro.bin")
+    bake(Desconocido(seed=9), CHUNK_SIZE, path)
+    with pytest.raises(SystemExit):
+        parse_args(["--baked", path])
+    assert "--baked" in capsys.readouterr().err
@@ -0,0 +1,29 @@
+"""Cache de chunks de terreno: ventanas del pintor y coincidencia con el escenario."""
+from src.core.scenarios.nature import NatureScenario
+from src.core.terrain_cache import TerrainCache, terrain_window
+
+def window_fields(window):
+    return window.x0, window.y0, bytes(window.codes), window.chars, bytes(window.solid), bytes(window.shade)
+
+def test_fractional_camera_at_zoom_1_uses_cache():
+    scenario = NatureScenario(seed=7)
+    chunks = TerrainCache().for_scenario(scenario)
+    first = terrain_window(chunks, -4.94, 8.59, 40, 20)
+    misses = chunks.misses
+    assert misses > 0
+    second = terrain_window(chunks, -4.94, 8.59, 40, 20)
+    assert chunks.misses == misses
+    assert chunks.hits > 0
+    assert window_fields(first) == window_fields(second)
+
+def test_fractional_camera_reads_floored_cells():
+    scenario = NatureScenario(seed=7)
+    window = terrain_window(TerrainCache().for_scenario(scenario), -4.94, 8.59, 40, 20)
+    assert window_fields(window) == window_fields(scenario.get_window(-5, 8, 40, 20))
+
+def test_zoomed_window_goes_to_scenario():
+    scenario = NatureScenario(seed=7)
+    chunks = TerrainCache().for_scenario(scenario)
+    window = terrain_window(chunks, -4.94, 8.59, 40, 20, 2.0)
+    assert chunks.hits == chunks.misses == 0
+    assert window_fields(window) == window_fields(scenario.get_window(-4.94, 8.59, 40, 20, 2.0))